@@ -1,5 +1,6 @@
 import streamlit as st
-from auth_utils import login_user, logout_user, get_current_user, check_authentication, AuthManager, User
+from auth_utils import login_user, logout_user, get_current_user, check_authentication, get_auth_manager, User
+from password_hasher import HashQueueFull
 import re
 
 def validate_email(email: str) -> bool:
@@ -36,7 +37,13 @@ def login_form():
                 st.error("Please enter both username and password")
                 return False
             
-            if login_user(username, password):
+            try:
+                logged_in = login_user(username, password)
+            except HashQueueFull:
+                st.error("The login service is busy right now. Please try again in a moment.")
+                return False
+            
+            if logged_in:
                 st.success("Login successful!")
                 st.rerun()
                 return True
@@ -93,8 +100,14 @@ def register_form():
                 return False
             
             # Create user
-            auth_manager = AuthManager()
-            if auth_manager.create_user(username, email, password, role, full_name, department):
+            auth_manager = get_auth_manager()
+            try:
+                created = auth_manager.create_user(username, email, password, role, full_name, department)
+            except HashQueueFull:
+                st.error("The registration service is busy right now. Please try again in a moment.")
+                return False
+            
+            if created:
                 st.success("Registration successful! You can now log in.")
                 st.balloons()
                 return True
@@ -149,8 +162,7 @@ def authentication_page():
     """, unsafe_allow_html=True)
     
     # Check if database is available
-    from auth_utils import AuthManager
-    auth_manager = AuthManager()
+    auth_manager = get_auth_manager()
     if not auth_manager.db.use_database:
         st.info("🔧 **Demo Mode**: Database not configured. Using mock authentication for demonstration purposes.")
     
@@ -1,11 +1,58 @@
-import psycopg2
-import bcrypt
 import streamlit as st
 import os
 from datetime import datetime, timedelta
 import secrets
-from typing import Optional, Dict, Any
+import time
+from typing import Optional, Dict, Any, Iterator
 from dataclasses import dataclass
+from contextlib import contextmanager
+from db_pool import DB_PREPARED_STATEMENTS, ConnectionPool, PoolStats, PreparedStatement, get_pool
+from session_cache import SessionCache
+from session_touch import SessionTouchBuffer
+from password_hasher import get_password_hasher
+from session_tokens import create_session_signer, is_signed_token
+from instrumentation import timed
+from query_stats import get_query_stats
+
+SESSION_CLEANUP_INTERVAL = float(os.environ.get('SESSION_CLEANUP_INTERVAL', '900'))
+SESSION_CLEANUP_BATCH_SIZE = int(os.environ.get('SESSION_CLEANUP_BATCH_SIZE', '5000'))
+SESSION_CLEANUP_MAX_SECONDS = float(os.environ.get('SESSION_CLEANUP_MAX_SECONDS', '60'))
+SESSION_CLEANUP_LOCK_ID = 7317001
+DB_STREAM_ITERSIZE = int(os.environ.get('DB_STREAM_ITERSIZE', '2000'))
+
+# The two queries behind every login and every uncached page load, planned once per pooled connection
+LOGIN_USER_STATEMENT = PreparedStatement("auth_login_user", """
+    SELECT id, username, email, password_hash, role, full_name, department, is_active
+    FROM users
+    WHERE (username = %s OR email = %s) AND is_active = true
+""")
+SESSION_USER_STATEMENT = PreparedStatement("auth_session_user", """
+    SELECT u.id, u.username, u.email, u.role, u.full_name, u.department, u.is_active, s.expires_at
+    FROM users u
+    JOIN user_sessions s ON u.id = s.user_id
+    WHERE s.session_token = %s AND s.expires_at > NOW() AND u.is_active = true
+""")
+
+# The covering token index lets get_user_by_session read the session side from the index alone;
+# the expires_at index keeps each cleanup batch from scanning live sessions
+SESSION_INDEXES = """
+    CREATE INDEX IF NOT EXISTS idx_user_sessions_token_covering
+        ON user_sessions (session_token) INCLUDE (user_id, expires_at);
+    CREATE INDEX IF NOT EXISTS idx_user_sessions_expires_at ON user_sessions (expires_at);
+"""
+
+# Short batches keep row locks and WAL bursts small; SKIP LOCKED steps around sessions being touched.
+# Keyed on session_token rather than ctid so it also works on a partitioned table.
+PURGE_EXPIRED_SESSIONS_QUERY = """
+    DELETE FROM user_sessions
+    WHERE session_token = ANY(ARRAY(
+        SELECT session_token FROM user_sessions
+        WHERE expires_at < NOW()
+        ORDER BY expires_at
+        LIMIT %s
+        FOR UPDATE SKIP LOCKED
+    )) AND expires_at < NOW()
+"""
 
 @dataclass
 class User:
@@ -17,48 +64,161 @@ class User:
     department: Optional[str]
     is_active: bool
 
+@dataclass
+class SessionCleanupReport:
+    rows_purged: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+    complete: bool = False  # False when the time budget ran out with expired sessions left
+    skipped: bool = False  # True when another process was already cleaning up
+
 class DatabaseManager:
     def __init__(self):
         self.connection_string = os.environ.get('DATABASE_URL')
         self.use_database = bool(self.connection_string)
+        self.query_stats = get_query_stats()
     
-    def get_connection(self):
+    @property
+    def pool(self) -> ConnectionPool:
+        """Process-wide connection pool for this database"""
         if not self.use_database:
             raise Exception("Database not configured")
-        return psycopg2.connect(self.connection_string)
+        return get_pool(self.connection_string)
+
+    @contextmanager
+    def get_connection(self):
+        """Borrow a pooled connection, committing on success and rolling back on error"""
+        with self.pool.connection() as conn:
+            with conn:
+                yield conn
+
+    def pool_stats(self) -> Optional[PoolStats]:
+        """Get connection pool metrics, or None in mock mode"""
+        if not self.use_database:
+            return None
+        return self.pool.stats()
     
+    @timed("db.execute_query")
     def execute_query(self, query: str, params: Optional[tuple] = None, fetch: bool = False):
         """Execute a database query"""
         if not self.use_database:
             return 0  # Return 0 rows affected for mock mode
+        started = time.perf_counter()
+        rows, failed = 0, False
         try:
             with self.get_connection() as conn:
                 with conn.cursor() as cursor:
                     cursor.execute(query, params)
                     if fetch:
-                        return cursor.fetchall()
+                        result = cursor.fetchall()
+                        rows = len(result)
+                        return result
                     conn.commit()
-                    return cursor.rowcount
+                    rows = cursor.rowcount
+                    return rows
         except Exception as e:
+            failed = True
             st.error(f"Database error: {str(e)}")
             return 0
+        finally:
+            self.query_stats.record(query, time.perf_counter() - started, params, rows, failed)
 
+    @timed("db.fetch_one")
     def fetch_one(self, query: str, params: Optional[tuple] = None):
         """Fetch a single row"""
         if not self.use_database:
             return None  # Return None for mock mode
+        started = time.perf_counter()
+        row, failed = None, False
         try:
             with self.get_connection() as conn:
                 with conn.cursor() as cursor:
                     cursor.execute(query, params)
-                    return cursor.fetchone()
+                    row = cursor.fetchone()
+                    return row
+        except Exception as e:
+            failed = True
+            st.error(f"Database error: {str(e)}")
+            return None
+        finally:
+            self.query_stats.record(query, time.perf_counter() - started, params, int(row is not None), failed)
+
+    def _execute_prepared(self, conn, cursor, statement: PreparedStatement, params: tuple):
+        if not self.pool.is_prepared(conn, statement.name):
+            cursor.execute(statement.prepare_sql)
+            self.pool.mark_prepared(conn, statement.name)
+        cursor.execute(statement.execute_sql, params)
+
+    @timed("db.fetch_one_prepared")
+    def fetch_one_prepared(self, statement: PreparedStatement, params: tuple):
+        """fetch_one for a hot query, sent as EXECUTE of a statement PREPAREd once per pooled connection"""
+        if not DB_PREPARED_STATEMENTS:
+            return self.fetch_one(statement.query, params)
+        if not self.use_database:
+            return None
+        from psycopg2.errors import DuplicatePreparedStatement, InvalidSqlStatementName
+        started = time.perf_counter()
+        row, failed = None, False
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor() as cursor:
+                    try:
+                        self._execute_prepared(conn, cursor, statement, params)
+                    except (DuplicatePreparedStatement, InvalidSqlStatementName) as e:
+                        # The session's statements changed behind our back (e.g. DISCARD ALL); resync and retry once
+                        conn.rollback()
+                        self.pool.mark_prepared(conn, statement.name, isinstance(e, DuplicatePreparedStatement))
+                        self._execute_prepared(conn, cursor, statement, params)
+                    row = cursor.fetchone()
+                    return row
         except Exception as e:
+            failed = True
             st.error(f"Database error: {str(e)}")
             return None
+        finally:
+            self.query_stats.record(statement.query, time.perf_counter() - started, params, int(row is not None), failed)
+
+    def iter_query(self, query: str, params: Optional[tuple] = None, itersize: int = DB_STREAM_ITERSIZE) -> Iterator[tuple]:
+        """Stream rows through a named server-side cursor, itersize rows per round trip
+
+        Memory stays bounded by itersize whatever the result size. The pooled
+        connection is held until the iterator is exhausted or closed. Unlike
+        execute_query, errors are raised to the caller.
+        """
+        if not self.use_database:
+            return
+        started = time.perf_counter()
+        fetching, rows, failed = 0.0, 0, True
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor(name=f"stream_{secrets.token_hex(6)}") as cursor:
+                    cursor.itersize = itersize
+                    cursor.execute(query, params)
+                    fetching = time.perf_counter() - started
+                    while True:
+                        fetch_started = time.perf_counter()
+                        batch = cursor.fetchmany(itersize)
+                        fetching += time.perf_counter() - fetch_started
+                        if not batch:
+                            break
+                        rows += len(batch)
+                        yield from batch
+            failed = False
+        except GeneratorExit:
+            # The caller stopped early; that is not a database error
+            failed = False
+            raise
+        finally:
+            # Only time spent in the database counts; the caller's processing between batches does not
+            self.query_stats.record(query, fetching, params, rows, failed)
 
 class AuthManager:
     def __init__(self):
         self.db = DatabaseManager()
+        self.session_cache = SessionCache()
+        self.touch_buffer = SessionTouchBuffer(self.db)
+        self.hasher = get_password_hasher()
+        self.token_signer = create_session_signer(self.db)
         # Mock users for demo purposes when database is not available
         self.mock_users = {
             'admin': User(
@@ -89,17 +249,24 @@ class AuthManager:
         }
     
     def hash_password(self, password: str) -> str:
-        """Hash a password using bcrypt"""
-        salt = bcrypt.gensalt()
-        hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
-        return hashed.decode('utf-8')
+        """Hash a password using bcrypt on the shared hashing pool"""
+        return self.hasher.hash(password)
     
     def verify_password(self, password: str, hashed: str) -> bool:
-        """Verify a password against its hash"""
-        return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+        """Verify a password against its hash on the shared hashing pool"""
+        return self.hasher.verify(password, hashed)
+    
+    def rehash_password_if_needed(self, user_id: int, password: str, hashed: str):
+        """Upgrade a stored hash whose cost differs from the configured work factor"""
+        if self.hasher.needs_rehash(hashed):
+            self.db.execute_query(
+                "UPDATE users SET password_hash = %s WHERE id = %s",
+                (self.hash_password(password), user_id)
+            )
     
     def create_user(self, username: str, email: str, password: str, role: str, full_name: str, department: Optional[str] = None) -> bool:
         """Create a new user"""
+        import psycopg2
         try:
             hashed_password = self.hash_password(password)
             query = """
@@ -115,14 +282,10 @@ class AuthManager:
         """Authenticate a user with username/password"""
         # If database is available, try database authentication first
         if self.db.use_database:
-            query = """
-                SELECT id, username, email, password_hash, role, full_name, department, is_active
-                FROM users 
-                WHERE (username = %s OR email = %s) AND is_active = true
-            """
-            result = self.db.fetch_one(query, (username, username))
+            result = self.db.fetch_one_prepared(LOGIN_USER_STATEMENT, (username, username))
             
             if result and self.verify_password(password, result[3]):
+                self.rehash_password_if_needed(result[0], password, result[3])
                 return User(
                     id=result[0],
                     username=result[1],
@@ -140,8 +303,25 @@ class AuthManager:
         
         return None
     
-    def create_session(self, user_id: int, user_agent: Optional[str] = None, ip_address: Optional[str] = None) -> str:
+    def get_user_by_id(self, user_id: int) -> Optional[User]:
+        """Get an active user by ID"""
+        if self.db.use_database:
+            result = self.db.fetch_one(
+                "SELECT id, username, email, role, full_name, department, is_active FROM users WHERE id = %s AND is_active = true",
+                (user_id,)
+            )
+            return User(*result) if result else None
+        return next((user for user in self.mock_users.values() if user.id == user_id and user.is_active), None)
+    
+    def create_session(self, user_id: int, user_agent: Optional[str] = None, ip_address: Optional[str] = None,
+                       user: Optional[User] = None) -> str:
         """Create a new user session"""
+        if self.token_signer:
+            # Signed tokens carry the user's identity, so nothing is stored per session
+            user = user or self.get_user_by_id(user_id)
+            if user is None:
+                raise ValueError(f"Unknown user {user_id}")
+            return self.token_signer.issue(user)
         session_token = secrets.token_urlsafe(32)
         refresh_token = secrets.token_urlsafe(32)
         
@@ -157,22 +337,26 @@ class AuthManager:
     
     def get_user_by_session(self, session_token: str) -> Optional[User]:
         """Get user by session token"""
+        if self.token_signer and is_signed_token(session_token):
+            claims = self.token_signer.verify(session_token)
+            if claims is None:
+                return None
+            return User(
+                id=claims.user_id, username=claims.username, email=claims.email, role=claims.role,
+                full_name=claims.full_name, department=claims.department, is_active=True
+            )
         if self.db.use_database:
-            query = """
-                SELECT u.id, u.username, u.email, u.role, u.full_name, u.department, u.is_active
-                FROM users u
-                JOIN user_sessions s ON u.id = s.user_id
-                WHERE s.session_token = %s AND s.expires_at > NOW() AND u.is_active = true
-            """
-            result = self.db.fetch_one(query, (session_token,))
+            cached_user = self.session_cache.get(session_token)
+            if cached_user:
+                self.touch_buffer.touch(session_token)
+                return cached_user
+            
+            result = self.db.fetch_one_prepared(SESSION_USER_STATEMENT, (session_token,))
             
             if result:
-                # Update last accessed time
-                self.db.execute_query(
-                    "UPDATE user_sessions SET last_accessed = NOW() WHERE session_token = %s",
-                    (session_token,)
-                )
-                return User(
+                # Update last accessed time on the next batched flush
+                self.touch_buffer.touch(session_token)
+                user = User(
                     id=result[0],
                     username=result[1],
                     email=result[2],
@@ -181,6 +365,8 @@ class AuthManager:
                     department=result[5],
                     is_active=result[6]
                 )
+                self.session_cache.put(session_token, user, expires_at=result[7])
+                return user
         
         # In mock mode, we can't validate sessions properly, so return None
         # This will force re-authentication
@@ -188,29 +374,91 @@ class AuthManager:
     
     def invalidate_session(self, session_token: str):
         """Invalidate a user session"""
+        if self.token_signer and is_signed_token(session_token):
+            self.token_signer.revoke(session_token)
+            return
+        self.session_cache.invalidate(session_token)
+        self.touch_buffer.discard(session_token)
         if self.db.use_database:
             self.db.execute_query(
                 "DELETE FROM user_sessions WHERE session_token = %s",
                 (session_token,)
             )
     
-    def cleanup_expired_sessions(self):
-        """Remove expired sessions"""
+    def set_user_active(self, user_id: int, is_active: bool):
+        """Activate or deactivate a user, dropping their cached sessions"""
         if self.db.use_database:
-            self.db.execute_query("DELETE FROM user_sessions WHERE expires_at < NOW()")
+            self.db.execute_query(
+                "UPDATE users SET is_active = %s WHERE id = %s",
+                (is_active, user_id)
+            )
+        if not is_active:
+            self.session_cache.invalidate_user(user_id)
+            if self.token_signer:
+                self.token_signer.revocations.revoke(user_id=user_id)
+    
+    def list_support_agents(self) -> list:
+        """Get the full names of active IT Support users"""
+        if self.db.use_database:
+            rows = self.db.execute_query(
+                "SELECT full_name FROM users WHERE role = 'IT Support' AND is_active = true ORDER BY full_name",
+                fetch=True
+            )
+            return [row[0] for row in rows or []]
+        return sorted(user.full_name for user in self.mock_users.values() if user.role == 'IT Support' and user.is_active)
+    
+    def create_session_indexes(self):
+        """Create the indexes behind session lookups and expiry cleanup if missing"""
+        if self.db.use_database:
+            with self.db.get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(SESSION_INDEXES)
+    
+    def cleanup_expired_sessions(self, batch_size: int = SESSION_CLEANUP_BATCH_SIZE,
+                                 max_seconds: float = SESSION_CLEANUP_MAX_SECONDS) -> SessionCleanupReport:
+        """Delete expired sessions in short batches, each in its own transaction, within a time budget"""
+        if not self.db.use_database:
+            return SessionCleanupReport(complete=True)
+        report = SessionCleanupReport()
+        started = time.perf_counter()
+        with self.db.pool.connection() as conn:
+            with conn.cursor() as cursor:
+                # Only one cleanup runs at a time however many workers schedule it
+                cursor.execute("SELECT pg_try_advisory_lock(%s)", (SESSION_CLEANUP_LOCK_ID,))
+                if not cursor.fetchone()[0]:
+                    conn.rollback()
+                    report.skipped = True
+                    return report
+                try:
+                    while True:
+                        cursor.execute(PURGE_EXPIRED_SESSIONS_QUERY, (batch_size,))
+                        deleted = cursor.rowcount
+                        conn.commit()
+                        report.rows_purged += deleted
+                        report.batches += 1
+                        if deleted < batch_size:
+                            report.complete = True
+                            break
+                        if time.perf_counter() - started >= max_seconds:
+                            break
+                finally:
+                    conn.rollback()
+                    cursor.execute("SELECT pg_advisory_unlock(%s)", (SESSION_CLEANUP_LOCK_ID,))
+                    conn.commit()
+        report.seconds = time.perf_counter() - started
+        return report
+
+ROLE_LEVELS = {
+    'Employee': 1,
+    'IT Support': 2,
+    'Admin': 3
+}
 
 class RoleManager:
     @staticmethod
     def has_permission(user: User, required_role: str) -> bool:
-        """Check if user has required role or higher"""
-        role_hierarchy = {
-            'Employee': 1,
-            'IT Support': 2,
-            'Admin': 3
-        }
-        user_level = role_hierarchy.get(user.role, 0)
-        required_level = role_hierarchy.get(required_role, 0)
-        return user_level >= required_level
+        """Check if user has required role or higher; see permissions.py for per-feature checks"""
+        return ROLE_LEVELS.get(user.role, 0) >= ROLE_LEVELS.get(required_role, 0)
     
     @staticmethod
     def require_role(required_role: str):
@@ -230,6 +478,11 @@ class RoleManager:
         return decorator
 
 # Session management for Streamlit
+@st.cache_resource
+def get_auth_manager() -> AuthManager:
+    """Get the AuthManager shared by every session in this process"""
+    return AuthManager()
+
 def init_session_state():
     """Initialize session state variables"""
     if 'user' not in st.session_state:
@@ -237,7 +490,7 @@ def init_session_state():
     if 'session_token' not in st.session_state:
         st.session_state.session_token = None
     if 'auth_manager' not in st.session_state:
-        st.session_state.auth_manager = AuthManager()
+        st.session_state.auth_manager = get_auth_manager()
 
 def check_authentication():
     """Check if user is authenticated and update session"""
@@ -264,7 +517,7 @@ def login_user(username: str, password: str) -> bool:
     
     user = st.session_state.auth_manager.authenticate_user(username, password)
     if user:
-        session_token = st.session_state.auth_manager.create_session(user.id)
+        session_token = st.session_state.auth_manager.create_session(user.id, user=user)
         st.session_state.user = user
         st.session_state.session_token = session_token
         return True
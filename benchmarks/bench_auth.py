@@ -0,0 +1,111 @@
+"""Login and session-validation throughput benchmark for AuthManager
+
+Usage:
+    python benchmarks/bench_auth.py                       # mock-user path only
+    python benchmarks/bench_auth.py --database-url postgresql://...  # mock + Postgres
+    python benchmarks/bench_auth.py --concurrency 1 8 64 --ops 50 --output results/auth.json
+    python benchmarks/bench_auth.py --signed-tokens       # also signed-token sessions
+
+Each scenario runs at every concurrency level with that many simulated clients.
+The "login" scenario covers authenticate_user -> create_session, the
+"validate" scenario covers get_user_by_session on an existing token. With
+--signed-tokens every mode is repeated with SESSION_TOKEN_MODE=signed sessions,
+which validate without touching the database.
+"""
+import argparse
+import os
+import secrets
+
+from bench_utils import DEFAULT_CONCURRENCY, run_concurrent, write_results, print_table
+
+BENCH_PASSWORD = "BenchPass123"
+MOCK_PASSWORD = "password123"
+
+def make_auth_manager(database_url):
+    """Build an AuthManager bound to a database, or to the mock users when None"""
+    if database_url:
+        os.environ['DATABASE_URL'] = database_url
+    else:
+        os.environ.pop('DATABASE_URL', None)
+    from auth_utils import AuthManager
+    return AuthManager()
+
+def ensure_bench_users(auth, count: int):
+    """Create bench users in the database if they do not exist yet"""
+    usernames = []
+    for i in range(count):
+        username = f"bench_user_{i}"
+        if not auth.db.fetch_one("SELECT id FROM users WHERE username = %s", (username,)):
+            auth.create_user(username, f"{username}@bench.local", BENCH_PASSWORD, "Employee", f"Bench User {i}", "Benchmark")
+        usernames.append(username)
+    return usernames
+
+def bench_mode(mode: str, database_url, levels, ops: int, user_count: int, signed: bool = False):
+    auth = make_auth_manager(database_url)
+    if signed:
+        from session_tokens import RevocationList, SessionTokenSigner
+        revocations = RevocationList(auth.db)
+        revocations.create_schema()
+        auth.token_signer = SessionTokenSigner(secrets.token_bytes(32), revocations)
+        mode += "+signed"
+    if database_url:
+        usernames = ensure_bench_users(auth, user_count)
+        password = BENCH_PASSWORD
+    else:
+        usernames = list(auth.mock_users)
+        password = MOCK_PASSWORD
+
+    def login(client_id: int, iteration: int):
+        username = usernames[(client_id + iteration) % len(usernames)]
+        user = auth.authenticate_user(username, password)
+        if user is None:
+            raise RuntimeError(f"Login failed for {username}")
+        auth.create_session(user.id, user=user)
+
+    # One session per simulated client; validation then hits the hot path repeatedly
+    tokens = []
+    for i in range(max(levels)):
+        user = auth.authenticate_user(usernames[i % len(usernames)], password)
+        tokens.append(auth.create_session(user.id, user=user))
+
+    def validate(client_id: int, iteration: int):
+        auth.get_user_by_session(tokens[client_id])
+
+    results = []
+    for scenario, operation in (("login", login), ("validate", validate)):
+        for concurrency in levels:
+            row = {"mode": mode, "scenario": scenario, "concurrency": concurrency}
+            row.update(run_concurrent(operation, concurrency, ops))
+            results.append(row)
+            print(f"{mode:>15} {scenario:>8} c={concurrency:<4} {row['ops_per_sec']:>10.1f} ops/s  p99={row['p99_ms']} ms")
+    auth.touch_buffer.close()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None, help="Postgres URL; also benchmarks the database path when set")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=DEFAULT_CONCURRENCY, help="Simulated client counts")
+    parser.add_argument("--ops", type=int, default=20, help="Operations per client at each level")
+    parser.add_argument("--users", type=int, default=16, help="Distinct bench users created in Postgres")
+    parser.add_argument("--signed-tokens", action="store_true", help="Also benchmark signed-token sessions")
+    parser.add_argument("--output", default="bench_results/auth.json", help="Where to write the JSON results")
+    args = parser.parse_args()
+
+    modes = [("mock", None)] + ([("postgres", args.database_url)] if args.database_url else [])
+    results = []
+    for signed in ([False, True] if args.signed_tokens else [False]):
+        for mode, database_url in modes:
+            results += bench_mode(mode, database_url, args.concurrency, args.ops, args.users, signed)
+
+    print()
+    print_table(results, ["mode", "scenario", "concurrency", "ops_per_sec", "p50_ms", "p95_ms", "p99_ms", "errors"])
+    write_results(args.output, "auth", {
+        "concurrency": args.concurrency,
+        "ops_per_client": args.ops,
+        "bench_users": args.users,
+        "database": bool(args.database_url),
+        "signed_tokens": args.signed_tokens,
+    }, results)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Ticket classifier accuracy and throughput benchmark
+
+Usage:
+    python benchmarks/bench_classifier.py
+    python benchmarks/bench_classifier.py --test-fraction 0.25 --repeat 2000 --output bench_results/classifier.json
+
+Trains on a shuffled split of the labelled CSV, reports category and urgency
+accuracy on the held-out rows, then measures tickets/sec for one-at-a-time,
+micro-batched and memoized (repeated text) inference.
+"""
+import argparse
+import random
+import time
+from collections import defaultdict
+
+from bench_utils import write_results, print_table
+
+from ticket_classifier import TicketClassifier, load_training_examples, TRAINING_DATA_PATH
+
+def stratified_split(examples, test_fraction: float, seed: int):
+    """Hold out the same fraction of every category"""
+    by_category = defaultdict(list)
+    for example in examples:
+        by_category[example[2]].append(example)
+    rng = random.Random(seed)
+    train, test = [], []
+    for rows in by_category.values():
+        rng.shuffle(rows)
+        cut = max(1, int(len(rows) * test_fraction))
+        test.extend(rows[:cut])
+        train.extend(rows[cut:])
+    return train, test
+
+def throughput(label: str, count: int, run) -> dict:
+    started = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - started
+    return {"mode": label, "tickets": count, "elapsed_s": round(elapsed, 4),
+            "tickets_per_sec": round(count / elapsed, 1) if elapsed > 0 else 0.0}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default=TRAINING_DATA_PATH, help="Labelled CSV with title,description,category,urgency")
+    parser.add_argument("--test-fraction", type=float, default=0.25)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--repeat", type=int, default=2000, help="Synthetic tickets classified per throughput run")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--output", default="bench_results/classifier.json")
+    args = parser.parse_args()
+
+    examples = load_training_examples(args.data)
+    train, test = stratified_split(examples, args.test_fraction, args.seed)
+    started = time.perf_counter()
+    classifier = TicketClassifier(cache_size=0).fit(train)
+    train_seconds = time.perf_counter() - started
+
+    predictions = classifier.classify_batch([(title, description) for title, description, _, _ in test])
+    category_accuracy = sum(p.category == row[2] for p, row in zip(predictions, test)) / len(test)
+    urgency_accuracy = sum(p.urgency == row[3] for p, row in zip(predictions, test)) / len(test)
+    print(f"Trained on {len(train)} tickets in {train_seconds * 1000:.1f} ms, evaluated on {len(test)}")
+    print(f"Category accuracy: {category_accuracy:.1%}  Urgency accuracy: {urgency_accuracy:.1%}")
+
+    # Distinct texts so neither path benefits from memoization
+    rng = random.Random(args.seed)
+    unique = [(f"{title} {rng.randrange(10 ** 9)}", description) for title, description, _, _ in
+              (examples[i % len(examples)] for i in range(args.repeat))]
+    repeated = [(title, description) for title, description, _, _ in
+                (examples[i % len(examples)] for i in range(args.repeat))]
+
+    single = classifier
+    batched = TicketClassifier(cache_size=0).fit(train)
+    memoized = TicketClassifier(cache_size=len(examples)).fit(train)
+    results = [
+        throughput("single", len(unique), lambda: [single.classify(t, d) for t, d in unique]),
+        throughput("micro-batch", len(unique), lambda: list(batched.classify_stream(unique, args.batch_size))),
+        throughput("memoized", len(repeated), lambda: list(memoized.classify_stream(repeated, args.batch_size))),
+    ]
+    print()
+    print_table(results, ["mode", "tickets", "elapsed_s", "tickets_per_sec"])
+
+    write_results(args.output, "classifier", {
+        "data": args.data,
+        "train_size": len(train),
+        "test_size": len(test),
+        "test_fraction": args.test_fraction,
+        "seed": args.seed,
+        "batch_size": args.batch_size,
+    }, [
+        {"metric": "category_accuracy", "value": round(category_accuracy, 4)},
+        {"metric": "urgency_accuracy", "value": round(urgency_accuracy, 4)},
+        {"metric": "train_ms", "value": round(train_seconds * 1000, 2)},
+    ] + results)
+
+if __name__ == "__main__":
+    main()
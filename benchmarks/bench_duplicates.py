@@ -0,0 +1,118 @@
+"""Near-duplicate detection benchmark
+
+Usage:
+    python benchmarks/bench_duplicates.py
+    python benchmarks/bench_duplicates.py --sizes 1000 10000 100000 --queries 2000 --output bench_results/duplicates.json
+
+Fills the MinHash/LSH index with synthetic incident clusters (reworded copies of
+the labelled training tickets), then measures lookup latency, candidates compared
+per query and recall of a held-out reworded copy. A brute-force scan over every
+signature is timed at each size for comparison, showing LSH lookup cost stays flat
+as the index grows.
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from bench_utils import summarize, write_results, print_table
+
+from duplicate_detection import DuplicateIndex, shingles
+from ticket_classifier import load_training_examples
+from ticket_store import Ticket
+
+FILLER = ["please", "urgent", "again", "today", "since", "morning", "help", "still", "team", "asap", "issue", "now"]
+
+def reword(rng: random.Random, text: str) -> str:
+    """Drop one word and append a couple of filler words, like a colleague reporting the same problem"""
+    words = text.split()
+    if len(words) > 4:
+        del words[rng.randrange(len(words))]
+    return " ".join(words + rng.sample(FILLER, 2))
+
+def synthetic_tickets(count: int, rng: random.Random, examples, start: datetime):
+    """Clusters of near-duplicates around unique incident texts"""
+    tickets = []
+    cluster = 0
+    while len(tickets) < count:
+        title, description, category, urgency = rng.choice(examples)
+        # Unique tokens keep clusters apart even when they reuse the same template
+        base = f"{description} site{cluster} ref{rng.randrange(10 ** 9)}"
+        for _ in range(rng.randint(1, 5)):
+            tickets.append(Ticket(
+                ticket_id=f"TK-BENCH-{len(tickets)}", title=title, description=reword(rng, base),
+                category=category, urgency=urgency, priority=urgency,
+                created_at=start + timedelta(seconds=len(tickets))
+            ))
+        cluster += 1
+    return tickets[:count]
+
+def brute_force(index: DuplicateIndex, signature, threshold: float):
+    """Compare against every indexed signature"""
+    matches = []
+    for entry in index._entries.values():
+        similarity = sum(a == b for a, b in zip(signature, entry.signature)) / len(signature)
+        if similarity >= threshold:
+            matches.append((similarity, entry.ticket_id))
+    return sorted(matches, reverse=True)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--brute-force-queries", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", default="bench_results/duplicates.json")
+    args = parser.parse_args()
+
+    examples = load_training_examples()
+    results = []
+    for size in args.sizes:
+        rng = random.Random(args.seed)
+        start = datetime.now() - timedelta(seconds=size)
+        tickets = synthetic_tickets(size, rng, examples, start)
+        index = DuplicateIndex(window_days=3650, max_size=size)
+        started = time.perf_counter()
+        for ticket in tickets:
+            index.add(ticket)
+        build_seconds = time.perf_counter() - started
+
+        probes = [rng.choice(tickets) for _ in range(args.queries)]
+        queries = [(probe, reword(rng, probe.description)) for probe in probes]
+        index.queries = index.candidates = 0
+        latencies = []
+        found = 0
+        for probe, text in queries:
+            began = time.perf_counter()
+            matches = index.find(probe.title, text, around=probe.created_at)
+            latencies.append(time.perf_counter() - began)
+            found += any(match.ticket_id == probe.ticket_id for match in matches)
+        lsh = summarize(latencies, sum(latencies))
+
+        brute_latencies = []
+        for probe, text in queries[:args.brute_force_queries]:
+            signature = index.hasher.signature(shingles(probe.title, text))
+            began = time.perf_counter()
+            brute_force(index, signature, index.threshold)
+            brute_latencies.append(time.perf_counter() - began)
+        brute = summarize(brute_latencies, sum(brute_latencies))
+
+        results.append({
+            "index_size": size,
+            "build_s": round(build_seconds, 3),
+            "lsh_p50_ms": lsh["p50_ms"],
+            "lsh_p99_ms": lsh["p99_ms"],
+            "avg_candidates": round(index.candidates / max(1, index.queries), 1),
+            "recall": round(found / len(queries), 3),
+            "brute_p50_ms": brute["p50_ms"],
+        })
+
+    print_table(results, ["index_size", "build_s", "lsh_p50_ms", "lsh_p99_ms", "avg_candidates", "recall", "brute_p50_ms"])
+    write_results(args.output, "duplicates", {
+        "sizes": args.sizes,
+        "queries": args.queries,
+        "seed": args.seed,
+    }, results)
+
+if __name__ == "__main__":
+    main()
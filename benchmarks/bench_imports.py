@@ -0,0 +1,84 @@
+"""Cold-start import time and memory benchmark for the Streamlit pages
+
+Usage:
+    python benchmarks/bench_imports.py
+    python benchmarks/bench_imports.py --runs 10 --output bench_results/imports.json
+
+Imports what each page needs in a fresh interpreter: the login page (everything
+app.py loads before the authentication check) and each page module under
+views/ on top of it. Reports median import time, peak RSS, and which heavy
+libraries (pandas, plotly, psycopg2, bcrypt) each one pulled in. Runs in demo
+mode so no database is needed.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from bench_utils import REPO_ROOT, write_results, print_table
+
+LOGIN_MODULES = ["auth_ui", "auth_utils", "permissions"]
+
+TARGETS = {
+    "login": LOGIN_MODULES,
+    "dashboard": LOGIN_MODULES + ["views.dashboard"],
+    "overview": LOGIN_MODULES + ["views.overview"],
+    "submit": LOGIN_MODULES + ["views.submit"],
+    "support": LOGIN_MODULES + ["views.support"],
+    "admin": LOGIN_MODULES + ["views.admin"],
+}
+
+HEAVY_MODULES = ["pandas", "plotly", "psycopg2", "bcrypt"]
+
+# Streamlit is loaded by every page, so it is imported before the clock starts
+PROBE = """
+import importlib, json, resource, sys, time
+import streamlit
+base_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+started = time.perf_counter()
+for name in sys.argv[1:]:
+    importlib.import_module(name)
+elapsed = time.perf_counter() - started
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({"seconds": elapsed, "base_rss_kb": base_rss, "rss_kb": rss,
+                  "loaded": [name for name in %r if name in sys.modules]}))
+""" % (HEAVY_MODULES,)
+
+def probe(modules) -> dict:
+    env = dict(os.environ, PYTHONPATH=str(REPO_ROOT))
+    env.pop("DATABASE_URL", None)
+    output = subprocess.check_output([sys.executable, "-c", PROBE, *modules], cwd=REPO_ROOT, env=env, text=True)
+    return json.loads(output.strip().splitlines()[-1])
+
+def measure(target: str, modules, runs: int) -> dict:
+    samples = [probe(modules) for _ in range(runs)]
+    return {
+        "page": target,
+        "runs": runs,
+        "import_ms": round(statistics.median(s["seconds"] for s in samples) * 1000, 1),
+        "rss_mb": round(statistics.median(s["rss_kb"] for s in samples) / 1024, 1),
+        "added_rss_mb": round(statistics.median(s["rss_kb"] - s["base_rss_kb"] for s in samples) / 1024, 1),
+        "heavy_modules": ",".join(samples[-1]["loaded"]) or "-",
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per page; the median is reported")
+    parser.add_argument("--pages", nargs="+", choices=list(TARGETS), default=list(TARGETS), help="Pages to measure")
+    parser.add_argument("--output", default="bench_results/imports.json", help="Where to write JSON results")
+    args = parser.parse_args()
+
+    results = []
+    for target in args.pages:
+        result = measure(target, TARGETS[target], args.runs)
+        results.append(result)
+        print(f"{target}: {result['import_ms']} ms, {result['rss_mb']} MB RSS")
+
+    print()
+    print_table(results, ["page", "import_ms", "rss_mb", "added_rss_mb", "heavy_modules"])
+    write_results(args.output, "imports", {"runs": args.runs, "targets": {t: TARGETS[t] for t in args.pages}}, results)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Knowledge base search benchmark
+
+Usage:
+    python benchmarks/bench_knowledge_base.py
+    python benchmarks/bench_knowledge_base.py --sizes 10000 100000 --queries 1000 --output bench_results/knowledge_base.json
+
+Indexes synthetic resolved tickets (training tickets with generated resolution
+notes and random reference tokens) plus the bundled KB articles, then measures
+top-k query latency, incremental add/remove cost and how often the top result
+shares the query ticket's category.
+"""
+import argparse
+import random
+import time
+
+from bench_utils import summarize, write_results, print_table
+
+from knowledge_base import BM25Index, KnowledgeDocument, load_articles
+from ticket_classifier import load_training_examples
+
+FIX_WORDS = ["restarted", "reinstalled", "replaced", "updated", "reset", "cleared", "reconnected", "escalated",
+             "driver", "cache", "profile", "certificate", "cable", "adapter", "policy", "firmware", "queue"]
+
+def synthetic_documents(count: int, rng: random.Random, examples):
+    for number in range(count):
+        title, description, category, _ = rng.choice(examples)
+        fix = " ".join(rng.sample(FIX_WORDS, 4)) + f" ref{rng.randrange(10 ** 6)}"
+        yield KnowledgeDocument(doc_id=f"TK-BENCH-{number}", kind="ticket", title=title,
+                                body=f"{description}\n{fix}", category=category, fix=fix)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", default="bench_results/knowledge_base.json")
+    args = parser.parse_args()
+
+    examples = load_training_examples()
+    articles = load_articles()
+    results = []
+    for size in args.sizes:
+        rng = random.Random(args.seed)
+        index = BM25Index()
+        for article in articles:
+            index.add(article)
+        started = time.perf_counter()
+        for document in synthetic_documents(size, rng, examples):
+            index.add(document)
+        build_seconds = time.perf_counter() - started
+
+        latencies = []
+        same_category = 0
+        for _ in range(args.queries):
+            title, description, category, _ = rng.choice(examples)
+            began = time.perf_counter()
+            matches = index.search(f"{title} {description}", k=args.k)
+            latencies.append(time.perf_counter() - began)
+            same_category += bool(matches) and matches[0].document.category == category
+        search = summarize(latencies, sum(latencies))
+
+        # Resolving and reopening tickets: one add plus one remove each
+        updates = list(synthetic_documents(200, rng, examples))
+        began = time.perf_counter()
+        for document in updates:
+            index.add(KnowledgeDocument(**{**document.__dict__, "doc_id": f"NEW-{document.doc_id}"}))
+            index.remove(f"NEW-{document.doc_id}")
+        update_ms = (time.perf_counter() - began) / len(updates) * 1000
+
+        results.append({
+            "documents": len(index),
+            "build_s": round(build_seconds, 2),
+            "p50_ms": search["p50_ms"],
+            "p95_ms": search["p95_ms"],
+            "p99_ms": search["p99_ms"],
+            "update_ms": round(update_ms, 3),
+            "top1_same_category": round(same_category / args.queries, 3),
+        })
+
+    print_table(results, ["documents", "build_s", "p50_ms", "p95_ms", "p99_ms", "update_ms", "top1_same_category"])
+    write_results(args.output, "knowledge_base", {
+        "sizes": args.sizes,
+        "queries": args.queries,
+        "k": args.k,
+        "seed": args.seed,
+    }, results)
+
+if __name__ == "__main__":
+    main()
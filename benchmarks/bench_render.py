@@ -0,0 +1,82 @@
+"""System Overview render cost benchmark
+
+Usage:
+    python benchmarks/bench_render.py
+    python benchmarks/bench_render.py --reruns 2000 --output bench_results/render.json
+
+Compares what one rerun of the System Overview page costs the server when its
+static content is rebuilt every time (HTML fragments formatted in place, the
+KPI figure constructed, the stylesheet sent as written) against the render
+cache (compacted fragments, the figure and the minified stylesheet built once
+per process). Reports server CPU per rerun and the HTML/CSS payload bytes sent.
+The figure JSON that st.plotly_chart serializes on every rerun is reported
+separately, since it is the same size either way.
+
+The stylesheet is also reported on its own: app.py has to re-send it on every
+rerun of every page, because Streamlit drops any element a rerun doesn't emit
+again, so caching only saves the minification, not the bytes on the wire.
+"""
+import argparse
+import time
+
+import plotly.io
+
+from bench_utils import write_results, print_table
+
+from views.overview import build_kpi_figure, build_overview_html, get_kpi_figure, get_overview_html
+from views.static_content import STATIC_DIR, stylesheet
+
+def uncached_rerun():
+    html = build_overview_html()
+    css = "<style>" + (STATIC_DIR / "app.css").read_text(encoding="utf-8") + "</style>"
+    figure = build_kpi_figure()
+    return html, css, figure
+
+def cached_rerun():
+    return get_overview_html(), stylesheet("app.css"), get_kpi_figure()
+
+def measure(label: str, rerun, reruns: int) -> dict:
+    html, css, figure = rerun()
+    started = time.process_time()
+    for _ in range(reruns):
+        rerun()
+    cpu = time.process_time() - started
+    html_bytes = sum(len(markup.encode("utf-8")) for markup in html.values())
+    css_bytes = len(css.encode("utf-8"))
+    return {
+        "mode": label,
+        "reruns": reruns,
+        "cpu_us_per_rerun": round(cpu / reruns * 1e6, 1),
+        "html_blocks": len(html),
+        "html_bytes": html_bytes,
+        "css_bytes": css_bytes,
+        "payload_bytes": html_bytes + css_bytes,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reruns", type=int, default=500, help="Simulated page reruns per mode")
+    parser.add_argument("--output", default="bench_results/render.json", help="Where to write JSON results")
+    args = parser.parse_args()
+
+    results = [measure("uncached", uncached_rerun, args.reruns), measure("render cache", cached_rerun, args.reruns)]
+    baseline, cached = results
+    figure_json = plotly.io.to_json(get_kpi_figure(), validate=False)
+    started = time.process_time()
+    for _ in range(args.reruns):
+        plotly.io.to_json(get_kpi_figure(), validate=False)
+    serialize_us = (time.process_time() - started) / args.reruns * 1e6
+
+    print_table(results, ["mode", "reruns", "cpu_us_per_rerun", "html_blocks", "html_bytes", "css_bytes", "payload_bytes"])
+    print()
+    print(f"Saved per rerun: {baseline['cpu_us_per_rerun'] - cached['cpu_us_per_rerun']:.1f} us CPU, "
+          f"{baseline['payload_bytes'] - cached['payload_bytes']:,} bytes")
+    print(f"Figure JSON (serialized on every rerun either way): {len(figure_json):,} bytes, {serialize_us:.1f} us")
+    print(f"Stylesheet (re-sent on every rerun of every page): {cached['css_bytes']:,} bytes minified, "
+          f"{baseline['css_bytes']:,} as written")
+    write_results(args.output, "render", {"reruns": args.reruns},
+                  results + [{"mode": "figure json", "bytes": len(figure_json), "cpu_us_per_rerun": round(serialize_us, 1)},
+                             {"mode": "stylesheet per rerun", "bytes": cached["css_bytes"], "raw_bytes": baseline["css_bytes"]}])
+
+if __name__ == "__main__":
+    main()
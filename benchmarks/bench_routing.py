@@ -0,0 +1,111 @@
+"""Ticket routing throughput benchmark
+
+Usage:
+    python benchmarks/bench_routing.py
+    python benchmarks/bench_routing.py --rules 2000 --decisions 200000 --output bench_results/routing.json
+
+Generates a synthetic rule set (exact, category-wildcard, urgency-wildcard and
+catch-all rules), then measures routing decisions/sec for a linear rule scan
+(the baseline), the compiled decision table, and full routing with least-loaded
+agent selection, single-threaded and from concurrent clients. Runs in demo mode
+so no database is needed.
+"""
+import argparse
+import os
+import random
+import time
+
+from bench_utils import DEFAULT_CONCURRENCY, run_concurrent, write_results, print_table
+
+os.environ.pop('DATABASE_URL', None)
+
+from ticket_store import TICKET_PRIORITIES, TicketRepository
+from ticket_routing import WILDCARD, AgentLoad, CompiledRoutes, RoutingRule, TicketRouter
+
+def synthetic_rules(count: int, agents: int, seed: int):
+    """Roughly count rules over count // 4 categories, with wildcards mixed in"""
+    rng = random.Random(seed)
+    categories = [f"Category {i}" for i in range(max(1, count // 4))]
+    agent_names = [f"Agent {i}" for i in range(agents)]
+    rules = {}
+    for category in categories:
+        for urgency in rng.sample(TICKET_PRIORITIES + [WILDCARD], 3):
+            rules[(category, urgency)] = RoutingRule(
+                category, urgency, f"Team {len(rules) % 50}", tuple(rng.sample(agent_names, min(3, agents)))
+            )
+    for urgency in TICKET_PRIORITIES:
+        rules[(WILDCARD, urgency)] = RoutingRule(WILDCARD, urgency, f"{urgency} Desk", tuple(agent_names[:5]))
+    rules[(WILDCARD, WILDCARD)] = RoutingRule(WILDCARD, WILDCARD, "Service Desk", tuple(agent_names))
+    return list(rules.values()), categories
+
+def linear_lookup(rules, category: str, urgency: str):
+    """What routing costs without compilation: scan every rule, keep the most specific match"""
+    best = None
+    for rule in rules:
+        if rule.category in (category, WILDCARD) and rule.urgency in (urgency, WILDCARD):
+            if best is None or rule.specificity > best.specificity:
+                best = rule
+    return best
+
+def throughput(label: str, tickets, decide) -> dict:
+    started = time.perf_counter()
+    for category, urgency in tickets:
+        decide(category, urgency)
+    elapsed = time.perf_counter() - started
+    return {"mode": label, "decisions": len(tickets), "elapsed_s": round(elapsed, 4),
+            "decisions_per_sec": round(len(tickets) / elapsed, 1) if elapsed > 0 else 0.0}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rules", type=int, default=1000, help="Approximate number of routing rules")
+    parser.add_argument("--agents", type=int, default=40)
+    parser.add_argument("--decisions", type=int, default=100000, help="Routing decisions per single-threaded run")
+    parser.add_argument("--linear-decisions", type=int, default=5000, help="Decisions for the slow linear baseline")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=DEFAULT_CONCURRENCY[:6])
+    parser.add_argument("--ops", type=int, default=5000, help="Decisions per concurrent client")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", default="bench_results/routing.json")
+    args = parser.parse_args()
+
+    rules, categories = synthetic_rules(args.rules, args.agents, args.seed)
+    rng = random.Random(args.seed)
+    # A few unknown categories exercise the wildcard fallback path
+    pool = categories + [f"Unlisted {i}" for i in range(len(categories) // 10 + 1)]
+    tickets = [(rng.choice(pool), rng.choice(TICKET_PRIORITIES)) for _ in range(args.decisions)]
+
+    started = time.perf_counter()
+    routes = CompiledRoutes(rules)
+    compile_ms = (time.perf_counter() - started) * 1000
+    print(f"Compiled {len(routes)} rules in {compile_ms:.1f} ms")
+
+    repository = TicketRepository()
+    router = TicketRouter(repository=repository, load=AgentLoad(repository, refresh_interval=3600))
+    router.save_rules(rules)
+
+    results = [
+        throughput("linear scan", tickets[:args.linear_decisions], lambda c, u: linear_lookup(rules, c, u)),
+        throughput("compiled lookup", tickets, routes.lookup),
+        throughput("route + balance", tickets, router.route),
+    ]
+    print()
+    print_table(results, ["mode", "decisions", "elapsed_s", "decisions_per_sec"])
+
+    concurrent = []
+    for concurrency in args.concurrency:
+        def operation(client_id: int, iteration: int):
+            router.route(*tickets[(client_id * args.ops + iteration) % len(tickets)])
+        summary = run_concurrent(operation, concurrency, args.ops)
+        concurrent.append({"mode": "route + balance", "concurrency": concurrency, **summary})
+    print()
+    print_table(concurrent, ["concurrency", "ops", "ops_per_sec", "p50_ms", "p99_ms"])
+
+    write_results(args.output, "routing", {
+        "rules": len(routes),
+        "agents": args.agents,
+        "decisions": args.decisions,
+        "compile_ms": round(compile_ms, 2),
+        "seed": args.seed,
+    }, results + concurrent)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Shared helpers for the AITix benchmark scripts"""
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Any
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+DEFAULT_CONCURRENCY = [1, 2, 4, 8, 16, 32, 64, 128, 256]
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+def summarize(latencies: List[float], elapsed: float, errors: int = 0) -> Dict[str, Any]:
+    """Latency percentiles in milliseconds plus throughput for one run"""
+    ordered = sorted(latencies)
+    return {
+        "ops": len(ordered),
+        "errors": errors,
+        "elapsed_s": round(elapsed, 4),
+        "ops_per_sec": round(len(ordered) / elapsed, 2) if elapsed > 0 else 0.0,
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3) if ordered else 0.0,
+        "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3) if ordered else 0.0,
+    }
+
+def run_concurrent(operation: Callable[[int, int], None], concurrency: int, ops_per_client: int) -> Dict[str, Any]:
+    """Run operation(client_id, iteration) from concurrent threads and summarize latencies"""
+    latencies: List[float] = []
+    errors = 0
+    lock = threading.Lock()
+    start_barrier = threading.Barrier(concurrency + 1)
+
+    def client(client_id: int):
+        nonlocal errors
+        local_latencies = []
+        local_errors = 0
+        start_barrier.wait()
+        for iteration in range(ops_per_client):
+            started = time.perf_counter()
+            try:
+                operation(client_id, iteration)
+            except Exception:
+                local_errors += 1
+                continue
+            local_latencies.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(local_latencies)
+            errors += local_errors
+
+    threads = [threading.Thread(target=client, args=(i,), daemon=True) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    start_barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return summarize(latencies, time.perf_counter() - started, errors)
+
+def git_commit() -> str:
+    """Current commit hash, or 'unknown' outside a git checkout"""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return "unknown"
+
+def write_results(path: str, benchmark: str, config: Dict[str, Any], results: List[Dict[str, Any]]):
+    """Write benchmark results as JSON tagged with commit and environment"""
+    payload = {
+        "benchmark": benchmark,
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "config": config,
+        "results": results,
+    }
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(payload, f, indent=2)
+    print(f"Results written to {path}")
+
+def print_table(results: List[Dict[str, Any]], columns: List[str]):
+    """Print results as an aligned text table"""
+    widths = {col: max(len(col), *(len(str(row.get(col, ''))) for row in results)) for col in columns}
+    print("  ".join(col.rjust(widths[col]) for col in columns))
+    for row in results:
+        print("  ".join(str(row.get(col, '')).rjust(widths[col]) for col in columns))
@@ -0,0 +1,329 @@
+import os
+import threading
+import time
+import atexit
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import TYPE_CHECKING, Optional, Dict, List, Set
+
+# psycopg2 is imported on first connect, so importing the pool is free in demo mode
+if TYPE_CHECKING:
+    import psycopg2.extensions
+
+# Pool sizing and recycling can be tuned per deployment through the environment
+POOL_MIN_SIZE = int(os.environ.get('DB_POOL_MIN_SIZE', '1'))
+POOL_MAX_SIZE = int(os.environ.get('DB_POOL_MAX_SIZE', '20'))
+POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', '10'))
+POOL_MAX_LIFETIME = float(os.environ.get('DB_POOL_MAX_LIFETIME', '1800'))
+POOL_MAX_IDLE = float(os.environ.get('DB_POOL_MAX_IDLE', '300'))
+POOL_HEALTH_CHECK_AFTER = float(os.environ.get('DB_POOL_HEALTH_CHECK_AFTER', '30'))
+# Turn off behind a transaction-pooling PgBouncer, where session state such as PREPARE does not stick
+DB_PREPARED_STATEMENTS = int(os.environ.get('DB_PREPARED_STATEMENTS', '1')) > 0
+
+class PoolTimeout(Exception):
+    """Raised when no pooled connection becomes available in time"""
+
+@dataclass
+class PoolStats:
+    size: int
+    in_use: int
+    idle: int
+    max_size: int
+    waits: int
+    wait_time: float
+    max_wait_time: float
+    timeouts: int
+    created: int
+    recycled: int
+    failed_checks: int
+
+@dataclass(frozen=True)
+class PreparedStatement:
+    """A hot query written with %s placeholders, planned once per connection with PREPARE"""
+    name: str
+    query: str
+
+    @cached_property
+    def prepare_sql(self) -> str:
+        parts = self.query.split("%s")
+        body = parts[0] + "".join(f"${i}{part}" for i, part in enumerate(parts[1:], 1))
+        return f"PREPARE {self.name} AS {body}"
+
+    @cached_property
+    def execute_sql(self) -> str:
+        placeholders = ", ".join(["%s"] * self.query.count("%s"))
+        return f"EXECUTE {self.name} ({placeholders})" if placeholders else f"EXECUTE {self.name}"
+
+def create_trigger_sql(name: str, table: str, events: str, action: str) -> str:
+    """CREATE TRIGGER that does nothing when the trigger already exists
+
+    Dropping and recreating a trigger on every start takes an ACCESS EXCLUSIVE lock on the table,
+    and writes in between skip it. Its body lives in a function that CREATE OR REPLACE FUNCTION
+    updates in place; give the trigger a new name if its events ever change.
+    """
+    return f"""
+    DO $do$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = '{name}' AND tgrelid = '{table}'::regclass) THEN
+            CREATE TRIGGER {name} {events} ON {table} {action};
+        END IF;
+    END $do$;
+    """
+
+@dataclass
+class _PooledConnection:
+    conn: 'psycopg2.extensions.connection'
+    created_at: float
+    last_used: float
+    prepared: Set[str] = field(default_factory=set)  # Statement names PREPAREd on this session
+
+class ConnectionPool:
+    """Thread-safe PostgreSQL connection pool with health checks and recycling"""
+
+    def __init__(self, dsn: str, min_size: int = POOL_MIN_SIZE, max_size: int = POOL_MAX_SIZE,
+                 timeout: float = POOL_TIMEOUT, max_lifetime: float = POOL_MAX_LIFETIME,
+                 max_idle: float = POOL_MAX_IDLE, health_check_after: float = POOL_HEALTH_CHECK_AFTER):
+        self.dsn = dsn
+        self.min_size = max(0, min(min_size, max_size))
+        self.max_size = max(1, max_size)
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.max_idle = max_idle
+        self.health_check_after = health_check_after
+        self.pid = os.getpid()
+
+        self._cond = threading.Condition()
+        self._idle: List[_PooledConnection] = []
+        self._in_use: Dict[int, _PooledConnection] = {}
+        self._size = 0
+        self._closed = False
+
+        self._waits = 0
+        self._wait_time = 0.0
+        self._max_wait_time = 0.0
+        self._timeouts = 0
+        self._created = 0
+        self._recycled = 0
+        self._failed_checks = 0
+
+    def _connect(self) -> _PooledConnection:
+        import psycopg2
+        conn = psycopg2.connect(self.dsn)
+        now = time.monotonic()
+        with self._cond:
+            self._created += 1
+        return _PooledConnection(conn=conn, created_at=now, last_used=now)
+
+    def _is_expired(self, entry: _PooledConnection, now: float) -> bool:
+        if entry.conn.closed:
+            return True
+        if self.max_lifetime and now - entry.created_at > self.max_lifetime:
+            return True
+        # Idle expiry only trims connections above the warm minimum
+        if self.max_idle and now - entry.last_used > self.max_idle and self._size > self.min_size:
+            return True
+        return False
+
+    def _discard(self, entry: _PooledConnection):
+        """Close a connection and free its slot; caller must hold the lock"""
+        try:
+            entry.conn.close()
+        except Exception:
+            pass
+        self._size -= 1
+        self._recycled += 1
+        self._cond.notify()
+
+    def _is_healthy(self, entry: _PooledConnection) -> bool:
+        try:
+            with entry.conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            entry.conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def fill(self):
+        """Open connections until the pool holds at least min_size"""
+        while True:
+            with self._cond:
+                if self._closed or self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                entry = self._connect()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._idle.append(entry)
+                self._cond.notify()
+
+    def acquire(self, timeout: Optional[float] = None) -> 'psycopg2.extensions.connection':
+        """Check out a healthy connection, waiting up to timeout seconds"""
+        timeout = self.timeout if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout
+        waited = False
+
+        while True:
+            entry = None
+            create = False
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise PoolTimeout("Connection pool is closed")
+                    now = time.monotonic()
+                    while self._idle:
+                        candidate = self._idle.pop()  # LIFO keeps the hottest connections in use
+                        if self._is_expired(candidate, now):
+                            self._discard(candidate)
+                            continue
+                        entry = candidate
+                        break
+                    if entry:
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1  # reserve the slot before connecting outside the lock
+                        create = True
+                        break
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeout(f"No database connection available after {timeout:.1f}s")
+                    if not waited:
+                        self._waits += 1
+                        waited = True
+                    self._cond.wait(remaining)
+                if entry:
+                    self._in_use[id(entry.conn)] = entry
+
+            if create:
+                try:
+                    entry = self._connect()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+                with self._cond:
+                    self._in_use[id(entry.conn)] = entry
+            elif time.monotonic() - entry.last_used > self.health_check_after and not self._is_healthy(entry):
+                with self._cond:
+                    self._in_use.pop(id(entry.conn), None)
+                    self._failed_checks += 1
+                    self._discard(entry)
+                continue
+
+            if waited:
+                wait = time.monotonic() - start
+                with self._cond:
+                    self._wait_time += wait
+                    self._max_wait_time = max(self._max_wait_time, wait)
+            return entry.conn
+
+    def release(self, conn: 'psycopg2.extensions.connection', discard: bool = False):
+        """Return a connection to the pool, recycling it when broken or stale"""
+        from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+        with self._cond:
+            entry = self._in_use.pop(id(conn), None)
+            if entry is None:
+                return
+            if not discard and not conn.closed and not self._closed:
+                try:
+                    if conn.get_transaction_status() != TRANSACTION_STATUS_IDLE:
+                        conn.rollback()
+                except Exception:
+                    discard = True
+            now = time.monotonic()
+            if discard or self._closed or self._is_expired(entry, now):
+                self._discard(entry)
+                return
+            entry.last_used = now
+            self._idle.append(entry)
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None):
+        """Borrow a connection for the duration of a with-block"""
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        except BaseException:
+            # Includes GeneratorExit, so a streaming generator closed early still returns its connection
+            self.release(conn, discard=bool(conn.closed))
+            raise
+        else:
+            self.release(conn)
+
+    # Only the thread holding a connection touches its prepared set, so these need no lock
+    def is_prepared(self, conn: 'psycopg2.extensions.connection', name: str) -> bool:
+        entry = self._in_use.get(id(conn))
+        return entry is not None and name in entry.prepared
+
+    def mark_prepared(self, conn: 'psycopg2.extensions.connection', name: str, prepared: bool = True):
+        entry = self._in_use.get(id(conn))
+        if entry is not None:
+            if prepared:
+                entry.prepared.add(name)
+            else:
+                entry.prepared.discard(name)
+
+    def stats(self) -> PoolStats:
+        """Snapshot of pool usage counters"""
+        with self._cond:
+            return PoolStats(
+                size=self._size,
+                in_use=len(self._in_use),
+                idle=len(self._idle),
+                max_size=self.max_size,
+                waits=self._waits,
+                wait_time=self._wait_time,
+                max_wait_time=self._max_wait_time,
+                timeouts=self._timeouts,
+                created=self._created,
+                recycled=self._recycled,
+                failed_checks=self._failed_checks
+            )
+
+    def close(self):
+        """Close idle connections and refuse further checkouts"""
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                self._discard(self._idle.pop())
+            self._cond.notify_all()
+
+# Process-wide pools keyed by DSN so every DatabaseManager shares connections
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+def get_pool(dsn: str) -> ConnectionPool:
+    """Return the shared pool for a DSN, creating it on first use"""
+    created = False
+    with _pools_lock:
+        pool = _pools.get(dsn)
+        # A forked child must never reuse its parent's sockets
+        if pool is None or pool.pid != os.getpid():
+            pool = ConnectionPool(dsn)
+            _pools[dsn] = pool
+            created = True
+    if created:
+        try:
+            pool.fill()
+        except Exception:
+            pass  # Connection errors resurface on the first checkout
+    return pool
+
+def close_all_pools():
+    """Close every pool owned by this process"""
+    with _pools_lock:
+        for pool in _pools.values():
+            if pool.pid == os.getpid():
+                pool.close()
+        _pools.clear()
+
+atexit.register(close_all_pools)
@@ -0,0 +1,272 @@
+import os
+import logging
+import random
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+
+from ticket_classifier import normalize_text, tokenize
+from ticket_events import TicketEvent, get_ticket_event_bus
+from ticket_store import OPEN_STATUSES, Ticket, TicketChange, get_ticket_repository
+
+logger = logging.getLogger(__name__)
+
+DUPLICATE_THRESHOLD = float(os.environ.get('DUPLICATE_THRESHOLD', '0.5'))
+DUPLICATE_WINDOW_DAYS = float(os.environ.get('DUPLICATE_WINDOW_DAYS', '14'))
+DUPLICATE_INDEX_SIZE = int(os.environ.get('DUPLICATE_INDEX_SIZE', '100000'))
+DUPLICATE_SYNC_INTERVAL = float(os.environ.get('DUPLICATE_SYNC_INTERVAL', '30'))
+
+# 16 bands of 4 rows: pairs above ~0.5 Jaccard share a bucket with high probability
+MINHASH_PERMUTATIONS = 64
+LSH_BANDS = 16
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+def shingles(title: str, description: str = "") -> FrozenSet[int]:
+    """Hashed word and word-pair shingles of a ticket's text"""
+    tokens = tokenize(normalize_text(title, description))
+    grams = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    return frozenset(zlib.crc32(gram.encode('utf-8')) for gram in grams)
+
+class MinHasher:
+    """MinHash signatures from universal hash functions (a * x + b) mod p"""
+
+    def __init__(self, num_perm: int = MINHASH_PERMUTATIONS, seed: int = 1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self._params = [(rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME)) for _ in range(num_perm)]
+
+    def signature(self, shingle_set: FrozenSet[int]) -> Tuple[int, ...]:
+        if not shingle_set:
+            return ()
+        return tuple(
+            min(((a * x + b) % _MERSENNE_PRIME) & _MAX_HASH for x in shingle_set)
+            for a, b in self._params
+        )
+
+@dataclass
+class IndexedTicket:
+    ticket_id: str
+    title: str
+    status: str
+    created_at: datetime
+    parent_ticket_id: Optional[str]
+    signature: Tuple[int, ...]
+
+@dataclass(frozen=True)
+class DuplicateMatch:
+    ticket_id: str
+    title: str
+    status: str
+    similarity: float
+    parent_ticket_id: Optional[str] = None
+
+    @property
+    def incident_id(self) -> str:
+        """The ticket that opened the incident this match belongs to"""
+        return self.parent_ticket_id or self.ticket_id
+
+    @property
+    def is_open(self) -> bool:
+        return self.status in OPEN_STATUSES
+
+class DuplicateIndex:
+    """MinHash/LSH index over recent ticket text
+
+    A query only compares against tickets that share at least one LSH band bucket,
+    so lookup cost depends on the number of similar tickets, not the index size.
+    Entries older than the window, or beyond max_size, are evicted oldest first.
+    """
+
+    def __init__(self, threshold: float = DUPLICATE_THRESHOLD, window_days: float = DUPLICATE_WINDOW_DAYS,
+                 max_size: int = DUPLICATE_INDEX_SIZE, num_perm: int = MINHASH_PERMUTATIONS, bands: int = LSH_BANDS):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.window = timedelta(days=window_days)
+        self.max_size = max_size
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.hasher = MinHasher(num_perm)
+        self._lock = threading.RLock()
+        self._entries: 'OrderedDict[str, IndexedTicket]' = OrderedDict()
+        self._buckets: List[Dict[Tuple[int, ...], Set[str]]] = [{} for _ in range(bands)]
+        self.queries = 0
+        self.candidates = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, ticket_id: str) -> bool:
+        return ticket_id in self._entries
+
+    def _band_keys(self, signature: Tuple[int, ...]):
+        rows = self.rows
+        return [signature[band * rows:(band + 1) * rows] for band in range(self.bands)]
+
+    def add(self, ticket: Ticket, signature: Optional[Tuple[int, ...]] = None):
+        """Index a ticket, replacing any previous entry with the same ID"""
+        if signature is None:
+            signature = self.hasher.signature(shingles(ticket.title, ticket.description))
+        if not signature:
+            return
+        with self._lock:
+            self._remove(ticket.ticket_id)
+            self._entries[ticket.ticket_id] = IndexedTicket(
+                ticket_id=ticket.ticket_id, title=ticket.title, status=ticket.status,
+                created_at=ticket.created_at, parent_ticket_id=ticket.parent_ticket_id, signature=signature
+            )
+            for bucket, key in zip(self._buckets, self._band_keys(signature)):
+                bucket.setdefault(key, set()).add(ticket.ticket_id)
+            self._evict(ticket.created_at)
+
+    def _remove(self, ticket_id: str):
+        entry = self._entries.pop(ticket_id, None)
+        if entry is None:
+            return
+        for bucket, key in zip(self._buckets, self._band_keys(entry.signature)):
+            members = bucket.get(key)
+            if members is not None:
+                members.discard(ticket_id)
+                if not members:
+                    del bucket[key]
+
+    def _evict(self, newest: datetime):
+        # Entries arrive roughly in creation order, so the oldest sit at the front
+        cutoff = newest - self.window
+        while self._entries:
+            ticket_id, entry = next(iter(self._entries.items()))
+            if len(self._entries) <= self.max_size and entry.created_at >= cutoff:
+                break
+            self._remove(ticket_id)
+
+    def remove(self, ticket_id: str):
+        with self._lock:
+            self._remove(ticket_id)
+
+    def update_status(self, ticket_id: str, status: str, parent_ticket_id: Optional[str] = None):
+        with self._lock:
+            entry = self._entries.get(ticket_id)
+            if entry is not None:
+                entry.status = status
+                entry.parent_ticket_id = parent_ticket_id or entry.parent_ticket_id
+
+    def find(self, title: str, description: str = "", limit: int = 5, open_only: bool = False,
+             around: Optional[datetime] = None, signature: Optional[Tuple[int, ...]] = None) -> List[DuplicateMatch]:
+        """Indexed tickets whose estimated Jaccard similarity reaches the threshold, most similar first"""
+        if signature is None:
+            signature = self.hasher.signature(shingles(title, description))
+        if not signature:
+            return []
+        around = around or datetime.now()
+        num_perm = len(signature)
+        matches = []
+        with self._lock:
+            candidates: Set[str] = set()
+            for bucket, key in zip(self._buckets, self._band_keys(signature)):
+                members = bucket.get(key)
+                if members:
+                    candidates |= members
+            self.queries += 1
+            self.candidates += len(candidates)
+            for ticket_id in candidates:
+                entry = self._entries[ticket_id]
+                if open_only and entry.status not in OPEN_STATUSES:
+                    continue
+                if abs(entry.created_at - around) > self.window:
+                    continue
+                similarity = sum(a == b for a, b in zip(signature, entry.signature)) / num_perm
+                if similarity >= self.threshold:
+                    matches.append(DuplicateMatch(
+                        ticket_id=entry.ticket_id, title=entry.title, status=entry.status,
+                        similarity=similarity, parent_ticket_id=entry.parent_ticket_id
+                    ))
+        matches.sort(key=lambda match: (-match.similarity, match.ticket_id))
+        return matches[:limit]
+
+    def assign_parent(self, ticket: Ticket, open_only: bool = True) -> Optional[DuplicateMatch]:
+        """Link a ticket to the incident of its closest near-duplicate, then index it"""
+        signature = self.hasher.signature(shingles(ticket.title, ticket.description))
+        matches = self.find(ticket.title, ticket.description, limit=1, open_only=open_only,
+                            around=ticket.created_at, signature=signature)
+        if matches and matches[0].ticket_id != ticket.ticket_id:
+            ticket.parent_ticket_id = matches[0].incident_id
+        self.add(ticket, signature)
+        return matches[0] if matches else None
+
+class RecentTicketIndex(DuplicateIndex):
+    """Process-wide index of recent tickets, kept current from the ticket store"""
+
+    def __init__(self, repository=None, sync_interval: float = DUPLICATE_SYNC_INTERVAL, **kwargs):
+        super().__init__(**kwargs)
+        self.repository = repository or get_ticket_repository()
+        self.sync_interval = sync_interval
+        self._watermark: Optional[datetime] = None
+        self._synced_at = 0.0
+        self._sync_lock = threading.Lock()
+
+    def sync(self, force: bool = False):
+        """Index tickets created since the last sync, e.g. by other processes or bulk imports"""
+        if not force and time.monotonic() - self._synced_at < self.sync_interval:
+            return
+        with self._sync_lock:
+            if self.repository.db.use_database:
+                since = self._watermark or datetime.now() - self.window
+                cursor = None
+                while True:
+                    page = self.repository.list_tickets_page(
+                        sort_by="created_at", descending=False, cursor=cursor, limit=1000, created_after=since
+                    )
+                    for ticket in page.tickets:
+                        if ticket.ticket_id not in self:
+                            self.add(ticket)
+                        self._watermark = max(self._watermark or ticket.created_at, ticket.created_at)
+                    if not page.has_more:
+                        break
+                    cursor = page.next_cursor
+            else:
+                cutoff = datetime.now() - self.window
+                for ticket in sorted(self.repository.all_mock_tickets(), key=lambda t: t.created_at):
+                    if ticket.created_at >= cutoff and ticket.ticket_id not in self:
+                        self.add(ticket)
+            self._synced_at = time.monotonic()
+
+    def find(self, *args, **kwargs) -> List[DuplicateMatch]:
+        try:
+            self.sync()
+        except Exception as e:
+            logger.warning("Duplicate index sync failed: %s", e)
+        return super().find(*args, **kwargs)
+
+    def apply_change(self, change: TicketChange):
+        """Keep the index current with writes made by this process"""
+        if change.ticket is None:
+            self._synced_at = 0.0
+        elif change.action == "created":
+            self.add(change.ticket)
+        elif change.action == "updated":
+            self.update_status(change.ticket.ticket_id, change.ticket.status, change.ticket.parent_ticket_id)
+
+    def on_event(self, event: TicketEvent):
+        if event.action == "resync":
+            self._synced_at = 0.0
+
+_index: Optional[RecentTicketIndex] = None
+_index_lock = threading.Lock()
+
+def get_duplicate_index() -> RecentTicketIndex:
+    """Get the process-wide index of recent tickets, built on first use"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            index = RecentTicketIndex()
+            index.sync(force=True)
+            index.repository.add_listener(index.apply_change)
+            get_ticket_event_bus().subscribe(index.on_event)
+            _index = index
+        return _index
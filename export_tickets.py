@@ -0,0 +1,39 @@
+"""Streaming CSV export of tickets
+
+Usage:
+    python export_tickets.py tickets.csv
+    python export_tickets.py open.csv --status Open "In Progress" --since 2025-01-01
+    python export_tickets.py - --priority Critical | gzip > critical.csv.gz
+
+Rows are read through a server-side cursor DB_STREAM_ITERSIZE at a time and
+written as they arrive, so memory use does not grow with the number of tickets.
+"""
+import argparse
+import sys
+import time
+from datetime import datetime
+
+from ticket_store import TICKET_PRIORITIES, TICKET_STATUSES, get_ticket_repository
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="Output CSV file, or - for stdout")
+    parser.add_argument("--status", nargs="+", choices=TICKET_STATUSES, help="Only these statuses")
+    parser.add_argument("--priority", nargs="+", choices=TICKET_PRIORITIES, help="Only these priorities")
+    parser.add_argument("--assignee", help="Only tickets assigned to this agent (or 'Unassigned')")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="Created at or after this date")
+    parser.add_argument("--until", type=datetime.fromisoformat, help="Created before this date")
+    args = parser.parse_args()
+
+    filters = dict(status=args.status, priority=args.priority, assigned_to=args.assignee,
+                   created_after=args.since, created_before=args.until)
+    started = time.perf_counter()
+    if args.path == "-":
+        count = get_ticket_repository().export_csv(sys.stdout, **filters)
+    else:
+        with open(args.path, "w", newline="", encoding="utf-8") as out:
+            count = get_ticket_repository().export_csv(out, **filters)
+    print(f"Exported {count:,} tickets in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
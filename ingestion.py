@@ -0,0 +1,462 @@
+"""Streaming bulk import of tickets from email archives and GLPI / Solman exports
+
+Usage:
+    python ingestion.py mbox archive.mbox
+    python ingestion.py eml inbox/
+    python ingestion.py glpi-csv glpi_tickets.csv --chunk-size 5000
+    python ingestion.py glpi-json glpi_tickets.json
+    python ingestion.py solman solman_incidents.csv
+
+Records are read lazily and written in fixed-size chunks, so memory use does not
+grow with the size of the export.
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import re
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from email import policy
+from email.parser import BytesParser
+from email.utils import parseaddr, parsedate_to_datetime
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, TextIO
+
+from duplicate_detection import DuplicateIndex
+from ticket_store import TICKET_CATEGORIES, TICKET_PRIORITIES, RESOLVED_STATUSES, Ticket, get_ticket_repository
+
+logger = logging.getLogger(__name__)
+
+INGEST_CHUNK_SIZE = int(os.environ.get('INGEST_CHUNK_SIZE', '2000'))
+INGEST_INCIDENT_WINDOW_HOURS = float(os.environ.get('INGEST_INCIDENT_WINDOW_HOURS', '24'))
+INGEST_READ_SIZE = 1 << 16
+
+# Column limits from the tickets table
+MAX_TITLE_LENGTH = 255
+MAX_NAME_LENGTH = 255
+MAX_DEPARTMENT_LENGTH = 100
+MAX_ASSIGNEE_LENGTH = 100
+MAX_SOURCE_ID_LENGTH = 255
+
+def _clean(value: Optional[str], limit: Optional[int] = None) -> str:
+    """Strip NUL bytes (rejected by PostgreSQL) and surrounding whitespace, truncating to limit"""
+    text = (value or "").replace("\x00", "").strip()
+    return text[:limit] if limit else text
+
+_MBOXRD_QUOTED_FROM = re.compile(rb"^>(>*From )")
+
+def _local_naive(value: datetime) -> datetime:
+    """Convert an offset-aware time to naive server-local time, which is how tickets store timestamps"""
+    return value.astimezone().replace(tzinfo=None) if value.tzinfo else value
+
+def _parse_datetime(value: Optional[str]) -> Optional[datetime]:
+    value = _clean(value)
+    if not value:
+        return None
+    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%dT%H:%M:%S", "%d.%m.%Y %H:%M:%S",
+                "%d.%m.%Y", "%d/%m/%Y %H:%M", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    try:
+        return _local_naive(datetime.fromisoformat(value))
+    except ValueError:
+        return None
+
+def _match_label(value: Optional[str], mapping: Dict[str, str]) -> Optional[str]:
+    """Map a source system label to ours by exact match, then by keyword"""
+    key = _clean(value).lower()
+    if not key:
+        return None
+    if key in mapping:
+        return mapping[key]
+    for keyword, label in mapping.items():
+        if keyword in key:
+            return label
+    return None
+
+CATEGORY_KEYWORDS = {category.lower(): category for category in TICKET_CATEGORIES}
+# Checked in order, so more specific keywords come first
+CATEGORY_KEYWORDS.update({
+    "mobile": "Mobile & Remote Access", "vpn": "Mobile & Remote Access", "remote": "Mobile & Remote Access",
+    "email": "Email & Communication", "mail": "Email & Communication",
+    "printer": "Printer & Peripherals", "peripheral": "Printer & Peripherals",
+    "security": "Security & Compliance", "compliance": "Security & Compliance",
+    "network": "Network Connectivity", "wifi": "Network Connectivity",
+    "hardware": "Hardware Issues", "software": "Software Issues", "application": "Software Issues",
+    "account": "Account Access", "password": "Account Access", "access": "Account Access",
+})
+
+STATUS_KEYWORDS = {
+    "new": "Open", "open": "Open", "pending": "In Progress", "processing": "In Progress",
+    "in process": "In Progress", "in progress": "In Progress", "assigned": "In Progress",
+    "solved": "Resolved", "resolved": "Resolved", "confirmed": "Closed", "closed": "Closed",
+}
+
+URGENCY_KEYWORDS = {
+    "very low": "Low", "low": "Low", "medium": "Medium", "very high": "Critical", "major": "Critical",
+    "critical": "Critical", "high": "High",
+}
+
+class SourceAdapter:
+    """Reads one export format and yields normalized tickets
+
+    Tickets are yielded with an empty category or urgency when the source does not
+    carry one; the pipeline classifies those in micro-batches. Malformed records are
+    logged, counted in `errors` and skipped.
+    """
+
+    source = "Web"
+
+    def __init__(self):
+        self.errors = 0
+
+    def tickets(self, path: str) -> Iterator[Ticket]:
+        raise NotImplementedError
+
+    def _skip(self, where: str, error: Exception):
+        self.errors += 1
+        logger.warning("Skipping %s record %s: %s", self.source, where, error)
+
+    def _ticket(self, source_id: str, title: str, description: str, category: Optional[str] = None,
+                urgency: Optional[str] = None, status: Optional[str] = None, created_at: Optional[datetime] = None,
+                resolved_at: Optional[datetime] = None, requester: Optional[str] = None,
+                department: Optional[str] = None, assigned_to: Optional[str] = None) -> Ticket:
+        title = _clean(title, MAX_TITLE_LENGTH) or "(no subject)"
+        status = status or "Open"
+        created_at = created_at or datetime.now()
+        if status in RESOLVED_STATUSES:
+            resolved_at = resolved_at or created_at
+        else:
+            resolved_at = None
+        urgency = urgency or ""
+        return Ticket(
+            ticket_id="", title=title, description=_clean(description) or title,
+            category=category or "", urgency=urgency, priority=urgency, status=status,
+            source=self.source, source_id=_clean(source_id, MAX_SOURCE_ID_LENGTH) or None,
+            requester=_clean(requester, MAX_NAME_LENGTH) or None,
+            department=_clean(department, MAX_DEPARTMENT_LENGTH) or None,
+            assigned_to=_clean(assigned_to, MAX_ASSIGNEE_LENGTH) or None,
+            created_at=created_at, updated_at=resolved_at or created_at, resolved_at=resolved_at
+        )
+
+class EmailAdapter(SourceAdapter):
+    """RFC 822 messages from an mbox archive, a single .eml file or a directory of .eml files"""
+
+    source = "Email"
+
+    def __init__(self):
+        super().__init__()
+        self._parser = BytesParser(policy=policy.default)
+
+    def tickets(self, path: str) -> Iterator[Ticket]:
+        target = Path(path)
+        if target.is_dir():
+            for eml in sorted(target.rglob("*.eml")):
+                yield from self._message_tickets([eml.read_bytes()], str(eml))
+        elif target.suffix.lower() == ".eml":
+            yield from self._message_tickets([target.read_bytes()], str(target))
+        else:
+            yield from self._message_tickets(self._mbox_messages(target), str(target))
+
+    @staticmethod
+    def _mbox_messages(path: Path) -> Iterator[bytes]:
+        """Split an mbox file on "From " separator lines, holding one message at a time"""
+        lines: List[bytes] = []
+        with open(path, "rb") as f:
+            for line in f:
+                if line.startswith(b"From ") and lines:
+                    yield b"".join(lines)
+                    lines = []
+                if line.startswith(b"From ") and not lines:
+                    continue
+                # mboxrd escapes body lines that look like separators with one more ">" each time
+                lines.append(_MBOXRD_QUOTED_FROM.sub(rb"\1", line))
+        if lines:
+            yield b"".join(lines)
+
+    def _message_tickets(self, messages: Iterable[bytes], origin: str) -> Iterator[Ticket]:
+        for index, raw in enumerate(messages):
+            try:
+                message = self._parser.parsebytes(raw)
+                body = message.get_body(preferencelist=("plain", "html"))
+                text = body.get_content() if body is not None else ""
+                if body is not None and body.get_content_type() == "text/html":
+                    text = re.sub(r"<[^>]+>", " ", text)
+                name, address = parseaddr(str(message.get("From", "")))
+                date = message.get("Date")
+                created_at = _local_naive(parsedate_to_datetime(str(date))) if date else None
+                message_id = str(message.get("Message-ID", "")).strip("<> ") or f"{origin}#{index}"
+                urgency = _match_label(str(message.get("Importance", "")), {"high": "High", "low": "Low"})
+                yield self._ticket(
+                    source_id=message_id, title=str(message.get("Subject", "")), description=text,
+                    urgency=urgency, created_at=created_at, requester=name or address
+                )
+            except Exception as e:
+                self._skip(f"{origin}#{index}", e)
+
+class CsvExportAdapter(SourceAdapter):
+    """Tabular exports whose column names vary between versions and locales"""
+
+    delimiters = ",;\t"
+    # Ticket field -> candidate column headers (compared case-insensitively)
+    columns: Dict[str, Sequence[str]] = {}
+    urgency_labels: Dict[str, str] = URGENCY_KEYWORDS
+
+    def tickets(self, path: str) -> Iterator[Ticket]:
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            sample = f.read(INGEST_READ_SIZE)
+            f.seek(0)
+            try:
+                dialect = csv.Sniffer().sniff(sample, delimiters=self.delimiters)
+            except csv.Error:
+                dialect = csv.excel
+            reader = csv.DictReader(f, dialect=dialect)
+            headers = {(name or "").strip().lower(): name for name in reader.fieldnames or []}
+            mapping = {
+                field: next((headers[c.lower()] for c in candidates if c.lower() in headers), None)
+                for field, candidates in self.columns.items()
+            }
+            for line, row in enumerate(reader, start=2):
+                try:
+                    yield self._row_ticket({field: row.get(column) if column else None for field, column in mapping.items()})
+                except Exception as e:
+                    self._skip(f"{path}:{line}", e)
+
+    def _row_ticket(self, row: Dict[str, Optional[str]]) -> Ticket:
+        if not _clean(row.get("source_id")):
+            raise ValueError("missing ticket ID")
+        return self._ticket(
+            source_id=row["source_id"], title=row.get("title"), description=row.get("description"),
+            category=_match_label(row.get("category"), CATEGORY_KEYWORDS),
+            urgency=_match_label(row.get("urgency"), self.urgency_labels),
+            status=_match_label(row.get("status"), STATUS_KEYWORDS),
+            created_at=_parse_datetime(row.get("created_at")), resolved_at=_parse_datetime(row.get("resolved_at")),
+            requester=row.get("requester"), department=row.get("department"), assigned_to=row.get("assigned_to")
+        )
+
+class GlpiCsvAdapter(CsvExportAdapter):
+    """GLPI ticket list exported as CSV (Assistance > Tickets > Export)"""
+
+    source = "GLPI"
+    columns = {
+        "source_id": ["ID"],
+        "title": ["Title", "Titre", "Name"],
+        "description": ["Description", "Content"],
+        "category": ["Category", "Catégorie"],
+        "urgency": ["Urgency", "Priority", "Urgence", "Priorité"],
+        "status": ["Status", "Statut"],
+        "created_at": ["Opening date", "Date d'ouverture", "Date"],
+        "resolved_at": ["Resolution date", "Close date", "Date de résolution"],
+        "requester": ["Requester", "Requester - Requester", "Demandeur"],
+        "department": ["Entity", "Entité"],
+        "assigned_to": ["Assigned to", "Assigned to - Technician", "Technicien"],
+    }
+
+class SolmanAdapter(CsvExportAdapter):
+    """SAP Solution Manager incident list exported as CSV"""
+
+    source = "Solman"
+    columns = {
+        "source_id": ["Transaction ID", "Transaction Number", "ID", "Object ID"],
+        "title": ["Description", "Short Text"],
+        "description": ["Long Text", "Text", "Description"],
+        "category": ["Category", "Subject", "Component"],
+        "urgency": ["Priority"],
+        "status": ["Status", "User Status"],
+        "created_at": ["Created On", "Reported On", "Posting Date"],
+        "resolved_at": ["Completed On", "Closed On"],
+        "requester": ["Reported By", "Reporter", "Sold-To Party"],
+        "department": ["Organizational Unit", "Support Team"],
+        "assigned_to": ["Processor", "Message Processor"],
+    }
+    # Solman priorities are numbered 1 (very high) to 4 (low)
+    urgency_labels = {"1": "Critical", "2": "High", "3": "Medium", "4": "Low", **URGENCY_KEYWORDS}
+
+class GlpiJsonAdapter(SourceAdapter):
+    """GLPI REST API dumps: a JSON array of ticket objects, or one object per line"""
+
+    source = "GLPI"
+    # GLPI stores status and urgency as integers
+    statuses = {1: "Open", 2: "In Progress", 3: "In Progress", 4: "In Progress", 5: "Resolved", 6: "Closed"}
+    urgencies = {1: "Low", 2: "Low", 3: "Medium", 4: "High", 5: "Critical", 6: "Critical"}
+
+    def tickets(self, path: str) -> Iterator[Ticket]:
+        with open(path, encoding="utf-8-sig") as f:
+            for index, record in enumerate(iter_json_records(f)):
+                try:
+                    yield self._record_ticket(record)
+                except Exception as e:
+                    self._skip(f"{path}#{index}", e)
+
+    def _record_ticket(self, record: dict) -> Ticket:
+        if record.get("id") is None:
+            raise ValueError("missing ticket ID")
+        status = record.get("status")
+        urgency = record.get("urgency")
+        category = record.get("itilcategories_id")
+        return self._ticket(
+            source_id=str(record["id"]), title=record.get("name"),
+            description=re.sub(r"<[^>]+>", " ", record.get("content") or ""),
+            category=_match_label(category, CATEGORY_KEYWORDS) if isinstance(category, str) else None,
+            urgency=self.urgencies.get(urgency) if isinstance(urgency, int) else _match_label(urgency, URGENCY_KEYWORDS),
+            status=self.statuses.get(status) if isinstance(status, int) else _match_label(status, STATUS_KEYWORDS),
+            created_at=_parse_datetime(record.get("date")),
+            resolved_at=_parse_datetime(record.get("solvedate") or record.get("closedate")),
+            requester=str(record.get("users_id_recipient") or "") or None
+        )
+
+def iter_json_records(f: TextIO, read_size: int = INGEST_READ_SIZE) -> Iterator[dict]:
+    """Yield objects from a top-level JSON array or JSON Lines without reading the whole file"""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    eof = False
+    while True:
+        # Skip whitespace and the array punctuation between objects
+        while position < len(buffer) and buffer[position] in " \t\r\n,[]":
+            position += 1
+        if position >= len(buffer):
+            if eof:
+                return
+            buffer = f.read(read_size)
+            position = 0
+            eof = not buffer
+            continue
+        try:
+            record, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            # Object split across reads: keep the unparsed tail and read more
+            if eof:
+                raise
+            chunk = f.read(read_size)
+            eof = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+        position = end
+        if isinstance(record, dict):
+            yield record
+
+ADAPTERS = {
+    "mbox": EmailAdapter,
+    "eml": EmailAdapter,
+    "glpi-csv": GlpiCsvAdapter,
+    "glpi-json": GlpiJsonAdapter,
+    "solman": SolmanAdapter,
+}
+
+@dataclass
+class IngestionReport:
+    source: str
+    read: int = 0
+    inserted: int = 0
+    errors: int = 0
+    classified: int = 0
+    collapsed: int = 0
+    seconds: float = 0.0
+
+    @property
+    def duplicates(self) -> int:
+        return self.read - self.inserted
+
+    @property
+    def rate(self) -> float:
+        return self.read / self.seconds if self.seconds else 0.0
+
+class IngestionPipeline:
+    """Reads an adapter's tickets in bounded chunks, fills gaps with the classifier and bulk-inserts them
+
+    Near-duplicates reported within INGEST_INCIDENT_WINDOW_HOURS of each other are
+    collapsed into one incident: later tickets get the first one as their parent.
+    """
+
+    def __init__(self, repository=None, classifier=None, chunk_size: int = INGEST_CHUNK_SIZE,
+                 collapse_duplicates: bool = True):
+        self.repository = repository or get_ticket_repository()
+        self.classifier = classifier
+        self.chunk_size = chunk_size
+        self.incidents = DuplicateIndex(window_days=INGEST_INCIDENT_WINDOW_HOURS / 24) if collapse_duplicates else None
+
+    def _get_classifier(self):
+        if self.classifier is None:
+            from ticket_classifier import get_ticket_classifier
+            self.classifier = get_ticket_classifier()
+        return self.classifier
+
+    def _fill_labels(self, chunk: List[Ticket]) -> int:
+        """Predict category/urgency for tickets whose source didn't provide a usable one"""
+        unlabelled = [ticket for ticket in chunk if ticket.category not in TICKET_CATEGORIES
+                      or ticket.urgency not in TICKET_PRIORITIES]
+        if not unlabelled:
+            return 0
+        predictions = self._get_classifier().classify_batch([(t.title, t.description) for t in unlabelled])
+        for ticket, prediction in zip(unlabelled, predictions):
+            if ticket.category not in TICKET_CATEGORIES:
+                ticket.category = prediction.category
+            if ticket.urgency not in TICKET_PRIORITIES:
+                ticket.urgency = ticket.priority = prediction.urgency
+        return len(unlabelled)
+
+    def _collapse_incidents(self, chunk: List[Ticket]) -> int:
+        """Reserve ticket IDs and point near-duplicates at their incident's first ticket"""
+        for ticket, ticket_id in zip(chunk, self.repository.next_ticket_ids(len(chunk))):
+            ticket.ticket_id = ticket_id
+        for ticket in chunk:
+            self.incidents.assign_parent(ticket, open_only=False)
+        return sum(1 for ticket in chunk if ticket.parent_ticket_id)
+
+    def run(self, adapter: SourceAdapter, path: str, progress=None) -> IngestionReport:
+        """Import every ticket the adapter reads from path"""
+        report = IngestionReport(source=adapter.source)
+        started = time.perf_counter()
+        tickets = adapter.tickets(path)
+        while True:
+            chunk = list(islice(tickets, self.chunk_size))
+            if not chunk:
+                break
+            report.read += len(chunk)
+            # Tickets already imported are dropped before any classification or ID reservation
+            chunk = self.repository.filter_new_tickets(chunk)
+            if chunk:
+                report.classified += self._fill_labels(chunk)
+                if self.incidents is not None:
+                    report.collapsed += self._collapse_incidents(chunk)
+                report.inserted += self.repository.bulk_insert(chunk, batch_size=self.chunk_size)
+            report.errors = adapter.errors
+            report.seconds = time.perf_counter() - started
+            if progress:
+                progress(report)
+        report.errors = adapter.errors
+        report.seconds = time.perf_counter() - started
+        return report
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("format", choices=sorted(ADAPTERS))
+    parser.add_argument("path", help="Export file (or directory of .eml files)")
+    parser.add_argument("--chunk-size", type=int, default=INGEST_CHUNK_SIZE, help="Tickets per COPY batch")
+    parser.add_argument("--no-collapse", action="store_true", help="Don't link near-duplicate tickets into incidents")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+
+    def progress(report: IngestionReport):
+        print(f"\r{report.read:,} read, {report.inserted:,} inserted, {report.errors:,} errors "
+              f"({report.rate:,.0f}/s)", end="", file=sys.stderr, flush=True)
+
+    pipeline = IngestionPipeline(chunk_size=args.chunk_size, collapse_duplicates=not args.no_collapse)
+    report = pipeline.run(ADAPTERS[args.format](), args.path, progress)
+    print(file=sys.stderr)
+    print(f"{report.source}: {report.read:,} tickets read, {report.inserted:,} inserted, "
+          f"{report.duplicates:,} duplicates skipped, {report.errors:,} malformed, "
+          f"{report.classified:,} auto-classified, {report.collapsed:,} collapsed into incidents "
+          f"in {report.seconds:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+import os
+import bisect
+import heapq
+import logging
+import threading
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Off by default; when off, span() hands back a shared no-op context and timed() leaves functions untouched
+INSTRUMENTATION_ENABLED = int(os.environ.get('INSTRUMENTATION_ENABLED', '0')) > 0
+INSTRUMENTATION_METRICS_PORT = int(os.environ.get('INSTRUMENTATION_METRICS_PORT', '0'))
+INSTRUMENTATION_SLOWEST = int(os.environ.get('INSTRUMENTATION_SLOWEST', '50'))
+
+# Prometheus-style upper bounds in seconds, from sub-millisecond queries to multi-second pages
+SPAN_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+METRIC_NAME = "aitix_span_seconds"
+
+@dataclass
+class SpanStats:
+    name: str
+    count: int
+    total: float
+    max: float
+    p50: float
+    p95: float
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+@dataclass(frozen=True)
+class SlowSpan:
+    name: str
+    seconds: float
+    finished_at: float
+
+class SpanHistogram:
+    """Fixed-bucket latency histogram; percentiles are bucket upper bounds capped at the max seen"""
+
+    def __init__(self, buckets: Tuple[float, ...] = SPAN_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, fraction: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+class _Span:
+    __slots__ = ("recorder", "name", "started")
+
+    def __init__(self, recorder: "Instrumentation", name: str):
+        self.recorder = recorder
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.recorder.observe(self.name, time.perf_counter() - self.started)
+        return False
+
+class Instrumentation:
+    """Span timings aggregated into per-name histograms, plus the slowest individual spans"""
+
+    def __init__(self, slowest: int = INSTRUMENTATION_SLOWEST):
+        self.slowest_limit = slowest
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, SpanHistogram] = {}
+        self._slowest: List[Tuple[float, float, str]] = []
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def span(self, name: str) -> _Span:
+        return _Span(self, name)
+
+    def observe(self, name: str, seconds: float):
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = SpanHistogram()
+            histogram.observe(seconds)
+            entry = (seconds, time.time(), name)
+            if len(self._slowest) < self.slowest_limit:
+                heapq.heappush(self._slowest, entry)
+            elif seconds > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, entry)
+
+    def stats(self) -> List[SpanStats]:
+        """Per-span totals, slowest p95 first"""
+        with self._lock:
+            stats = [
+                SpanStats(name, h.count, h.total, h.max, h.percentile(0.5), h.percentile(0.95))
+                for name, h in self._histograms.items()
+            ]
+        return sorted(stats, key=lambda s: (s.p95, s.max), reverse=True)
+
+    def slowest(self) -> List[SlowSpan]:
+        with self._lock:
+            entries = sorted(self._slowest, reverse=True)
+        return [SlowSpan(name, seconds, finished_at) for seconds, finished_at, name in entries]
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._slowest.clear()
+
+    def prometheus_text(self) -> str:
+        """All histograms in the Prometheus text exposition format"""
+        with self._lock:
+            snapshot = [(name, list(h.buckets), list(h.counts), h.count, h.total) for name, h in sorted(self._histograms.items())]
+        lines = [f"# HELP {METRIC_NAME} Duration of instrumented AITix spans",
+                 f"# TYPE {METRIC_NAME} histogram"]
+        for name, buckets, counts, count, total in snapshot:
+            label = name.replace("\\", "\\\\").replace('"', '\\"')
+            cumulative = 0
+            for bound, bucket_count in zip(buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{METRIC_NAME}_bucket{{span="{label}",le="{bound}"}} {cumulative}')
+            lines.append(f'{METRIC_NAME}_bucket{{span="{label}",le="+Inf"}} {count}')
+            lines.append(f'{METRIC_NAME}_sum{{span="{label}"}} {total:.6f}')
+            lines.append(f'{METRIC_NAME}_count{{span="{label}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    def serve_metrics(self, port: int):
+        """Serve prometheus_text() at http://0.0.0.0:<port>/metrics from a daemon thread"""
+        recorder = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = recorder.prometheus_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        try:
+            self._server = ThreadingHTTPServer(("0.0.0.0", port), MetricsHandler)
+        except OSError as e:
+            # Usually another process on this host already serves the port
+            logger.warning("Metrics endpoint not started on port %d: %s", port, e)
+            return
+        threading.Thread(target=self._server.serve_forever, name="metrics-endpoint", daemon=True).start()
+        logger.info("Serving span metrics on port %d", port)
+
+_instrumentation: Optional[Instrumentation] = None
+_instrumentation_lock = threading.Lock()
+_NOOP_SPAN = nullcontext()
+
+def get_instrumentation() -> Instrumentation:
+    """Get the process-wide span recorder, starting the metrics endpoint if a port is configured"""
+    global _instrumentation
+    with _instrumentation_lock:
+        if _instrumentation is None:
+            instrumentation = Instrumentation()
+            if INSTRUMENTATION_ENABLED and INSTRUMENTATION_METRICS_PORT:
+                instrumentation.serve_metrics(INSTRUMENTATION_METRICS_PORT)
+            _instrumentation = instrumentation
+        return _instrumentation
+
+def span(name: str):
+    """Time a block as `with span("db.fetch_one"):`; a shared no-op when instrumentation is off"""
+    if not INSTRUMENTATION_ENABLED:
+        return _NOOP_SPAN
+    return get_instrumentation().span(name)
+
+def timed(name: str):
+    """Decorator form of span(); returns the function unchanged when instrumentation is off"""
+    def decorate(fn):
+        if not INSTRUMENTATION_ENABLED:
+            return fn
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with get_instrumentation().span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
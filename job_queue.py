@@ -0,0 +1,431 @@
+import os
+import json
+import logging
+import socket
+import threading
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timedelta
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+from auth_utils import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', '5'))
+JOB_RETRY_BASE = float(os.environ.get('JOB_RETRY_BASE', '5'))
+JOB_CLAIM_TIMEOUT = float(os.environ.get('JOB_CLAIM_TIMEOUT', '300'))
+JOB_POLL_INTERVAL = float(os.environ.get('JOB_POLL_INTERVAL', '1'))
+JOB_RETENTION_HOURS = float(os.environ.get('JOB_RETENTION_HOURS', '24'))
+
+JOB_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS jobs (
+        id BIGSERIAL PRIMARY KEY,
+        kind VARCHAR(64) NOT NULL,
+        payload JSONB NOT NULL DEFAULT '{}',
+        status VARCHAR(16) NOT NULL DEFAULT 'pending',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        run_at TIMESTAMP NOT NULL DEFAULT NOW(),
+        claimed_at TIMESTAMP,
+        claimed_by VARCHAR(128),
+        last_error TEXT,
+        created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+        finished_at TIMESTAMP
+    );
+
+    -- Workers only ever scan unfinished jobs; finished ones are kept briefly for latency stats
+    CREATE INDEX IF NOT EXISTS idx_jobs_due ON jobs (run_at) WHERE status IN ('pending', 'running');
+    CREATE INDEX IF NOT EXISTS idx_jobs_finished_at ON jobs (finished_at) WHERE finished_at IS NOT NULL;
+"""
+
+JOB_COLUMNS = ("id", "kind", "payload", "attempts", "created_at")
+
+# SKIP LOCKED lets any number of worker threads, processes and nodes claim jobs without blocking each other.
+# Jobs whose worker died mid-run are reclaimed once their claim times out, unless they are out of attempts.
+CLAIM_JOBS_QUERY = f"""
+    UPDATE jobs AS j
+    SET status = 'running', attempts = j.attempts + 1, claimed_at = NOW(), claimed_by = %s
+    FROM (
+        SELECT id FROM jobs
+        WHERE kind = ANY(%s) AND (
+            (status = 'pending' AND run_at <= NOW())
+            OR (status = 'running' AND claimed_at < NOW() - %s * INTERVAL '1 second' AND attempts < %s)
+        )
+        ORDER BY run_at
+        LIMIT %s
+        FOR UPDATE SKIP LOCKED
+    ) AS due
+    WHERE j.id = due.id
+    RETURNING {', '.join('j.' + column for column in JOB_COLUMNS)}
+"""
+
+# A job that keeps killing its worker would otherwise be reclaimed forever
+FAIL_STALE_JOBS_QUERY = """
+    UPDATE jobs SET status = 'failed', finished_at = NOW(),
+        last_error = 'Claim timed out after ' || attempts || ' attempts'
+    WHERE id IN (
+        SELECT id FROM jobs
+        WHERE kind = ANY(%s) AND status = 'running' AND claimed_at < NOW() - %s * INTERVAL '1 second' AND attempts >= %s
+        FOR UPDATE SKIP LOCKED
+    )
+"""
+
+QUEUE_STATS_QUERY = """
+    SELECT status, COUNT(*), EXTRACT(EPOCH FROM NOW() - MIN(run_at)) FROM jobs
+    WHERE status IN ('pending', 'running') GROUP BY status
+"""
+
+LATENCY_STATS_QUERY = """
+    SELECT
+        COUNT(*) FILTER (WHERE status = 'done'),
+        COUNT(*) FILTER (WHERE status = 'failed'),
+        percentile_cont(ARRAY[0.5, 0.95]) WITHIN GROUP (ORDER BY EXTRACT(EPOCH FROM finished_at - created_at))
+    FROM jobs WHERE finished_at > NOW() - %s * INTERVAL '1 second'
+"""
+
+@dataclass
+class Job:
+    kind: str
+    payload: Dict[str, Any]
+    id: Optional[int] = None
+    attempts: int = 0
+    status: str = "pending"
+    run_at: datetime = field(default_factory=datetime.now)
+    claimed_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+    created_at: datetime = field(default_factory=datetime.now)
+    finished_at: Optional[datetime] = None
+
+@dataclass
+class QueueStats:
+    pending: int
+    running: int
+    oldest_pending_seconds: float
+    done_last_hour: int
+    failed_last_hour: int
+    p50_latency: Optional[float]
+    p95_latency: Optional[float]
+
+@dataclass
+class JobKindStats:
+    completed: int
+    failed: int
+    p50_run: float
+    p95_run: float
+    p95_wait: float
+
+def _percentile(values: Sequence[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+class JobQueue:
+    """Durable job queue in PostgreSQL, or in memory in demo mode"""
+
+    def __init__(self, db: Optional[DatabaseManager] = None, max_attempts: int = JOB_MAX_ATTEMPTS,
+                 retry_base: float = JOB_RETRY_BASE, claim_timeout: float = JOB_CLAIM_TIMEOUT):
+        self.db = db or DatabaseManager()
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.claim_timeout = claim_timeout
+        self._lock = threading.Lock()
+        self._mock: Dict[int, Job] = {}
+        self._mock_sequence = 0
+        self._listeners: List[Callable[[], None]] = []
+
+    def create_schema(self):
+        if self.db.use_database:
+            with self.db.get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(JOB_SCHEMA)
+
+    def add_listener(self, listener: Callable[[], None]):
+        """Register a callback invoked after this process enqueues a job, e.g. to wake local workers"""
+        self._listeners.append(listener)
+
+    def enqueue(self, kind: str, payload: Optional[Dict[str, Any]] = None, delay: float = 0) -> Job:
+        """Add a job; this is a single insert and returns without waiting for the job to run"""
+        job = Job(kind=kind, payload=payload or {}, run_at=datetime.now() + timedelta(seconds=delay))
+        if self.db.use_database:
+            with self.db.get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(
+                        "INSERT INTO jobs (kind, payload, run_at) VALUES (%s, %s, NOW() + %s * INTERVAL '1 second') RETURNING id",
+                        (kind, json.dumps(job.payload), delay)
+                    )
+                    job.id = cursor.fetchone()[0]
+        else:
+            with self._lock:
+                self._mock_sequence += 1
+                job.id = self._mock_sequence
+                self._mock[job.id] = job
+        for listener in list(self._listeners):
+            listener()
+        return job
+
+    def claim(self, kinds: Sequence[str], worker_id: str, limit: int = 1) -> List[Job]:
+        """Mark up to limit due jobs of the given kinds as running and return them"""
+        if self.db.use_database:
+            with self.db.get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(FAIL_STALE_JOBS_QUERY, (list(kinds), self.claim_timeout, self.max_attempts))
+                    if cursor.rowcount:
+                        logger.warning("Failed %d jobs whose claims timed out after %d attempts", cursor.rowcount, self.max_attempts)
+                    cursor.execute(CLAIM_JOBS_QUERY, (worker_id, list(kinds), self.claim_timeout, self.max_attempts, limit))
+                    rows = cursor.fetchall()
+            now = datetime.now()
+            jobs = []
+            for row in rows:
+                values = dict(zip(JOB_COLUMNS, row))
+                if isinstance(values["payload"], str):
+                    values["payload"] = json.loads(values["payload"])
+                jobs.append(Job(status="running", claimed_at=now, **values))
+            return jobs
+        now = datetime.now()
+        stale = now - timedelta(seconds=self.claim_timeout)
+        claimed = []
+        with self._lock:
+            for job in self._mock.values():
+                if (job.kind in kinds and job.status == "running" and job.claimed_at and job.claimed_at < stale
+                        and job.attempts >= self.max_attempts):
+                    job.status = "failed"
+                    job.finished_at = now
+                    job.last_error = f"Claim timed out after {job.attempts} attempts"
+            due = sorted(
+                (job for job in self._mock.values() if job.kind in kinds and (
+                    (job.status == "pending" and job.run_at <= now)
+                    or (job.status == "running" and job.claimed_at and job.claimed_at < stale))),
+                key=lambda job: job.run_at
+            )
+            for job in due[:limit]:
+                job.status = "running"
+                job.claimed_at = now
+                job.attempts += 1
+                claimed.append(replace(job))
+        return claimed
+
+    def complete(self, job: Job):
+        if self.db.use_database:
+            with self.db.get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(
+                        "UPDATE jobs SET status = 'done', finished_at = NOW(), last_error = NULL WHERE id = %s",
+                        (job.id,)
+                    )
+            return
+        with self._lock:
+            stored = self._mock[job.id]
+            stored.status = "done"
+            stored.finished_at = datetime.now()
+
+    def fail(self, job: Job, error: str):
+        """Retry with exponential backoff, or mark the job failed after max_attempts"""
+        give_up = job.attempts >= self.max_attempts
+        delay = self.retry_base * (2 ** max(0, job.attempts - 1))
+        if self.db.use_database:
+            with self.db.get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(
+                        """
+                        UPDATE jobs SET status = %s, last_error = %s,
+                            run_at = NOW() + %s * INTERVAL '1 second',
+                            finished_at = CASE WHEN %s THEN NOW() END
+                        WHERE id = %s
+                        """,
+                        ("failed" if give_up else "pending", error[:1000], delay, give_up, job.id)
+                    )
+            return
+        with self._lock:
+            stored = self._mock[job.id]
+            stored.status = "failed" if give_up else "pending"
+            stored.last_error = error
+            stored.run_at = datetime.now() + timedelta(seconds=delay)
+            stored.finished_at = datetime.now() if give_up else None
+
+    def purge_finished(self, older_than_hours: float = JOB_RETENTION_HOURS) -> int:
+        """Delete finished jobs past the retention period"""
+        if self.db.use_database:
+            with self.db.get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(
+                        "DELETE FROM jobs WHERE finished_at < NOW() - %s * INTERVAL '1 hour'",
+                        (older_than_hours,)
+                    )
+                    return cursor.rowcount
+        cutoff = datetime.now() - timedelta(hours=older_than_hours)
+        with self._lock:
+            expired = [job_id for job_id, job in self._mock.items() if job.finished_at and job.finished_at < cutoff]
+            for job_id in expired:
+                del self._mock[job_id]
+        return len(expired)
+
+    def stats(self, window_seconds: float = 3600) -> QueueStats:
+        """Queue depth plus end-to-end latency of jobs finished within the window, across all workers"""
+        if self.db.use_database:
+            with self.db.get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(QUEUE_STATS_QUERY)
+                    depth = {status: (count, age) for status, count, age in cursor.fetchall()}
+                    cursor.execute(LATENCY_STATS_QUERY, (window_seconds,))
+                    done, failed, percentiles = cursor.fetchone()
+            percentiles = percentiles or [None, None]
+            return QueueStats(
+                pending=depth.get("pending", (0, 0))[0], running=depth.get("running", (0, 0))[0],
+                oldest_pending_seconds=max(0.0, float(depth.get("pending", (0, 0))[1] or 0)),
+                done_last_hour=done, failed_last_hour=failed,
+                p50_latency=percentiles[0], p95_latency=percentiles[1]
+            )
+        now = datetime.now()
+        since = now - timedelta(seconds=window_seconds)
+        with self._lock:
+            jobs = list(self._mock.values())
+        pending = [job for job in jobs if job.status == "pending"]
+        finished = [job for job in jobs if job.finished_at and job.finished_at > since]
+        latencies = [(job.finished_at - job.created_at).total_seconds() for job in finished if job.status == "done"]
+        return QueueStats(
+            pending=len(pending), running=sum(job.status == "running" for job in jobs),
+            oldest_pending_seconds=max([(now - job.run_at).total_seconds() for job in pending] + [0.0]),
+            done_last_hour=len(latencies), failed_last_hour=len(finished) - len(latencies),
+            p50_latency=_percentile(latencies, 0.5) if latencies else None,
+            p95_latency=_percentile(latencies, 0.95) if latencies else None
+        )
+
+class JobWorker:
+    """Pool of threads that claim and run jobs, plus periodic maintenance tasks"""
+
+    def __init__(self, queue: JobQueue, handlers: Dict[str, Callable[[Dict[str, Any]], None]],
+                 concurrency: int = 1, poll_interval: float = JOB_POLL_INTERVAL, samples: int = 1000):
+        self.queue = queue
+        self.handlers = dict(handlers)
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._wakeup = threading.Condition()
+        self._pending_wakeups = 0
+        self._stopped = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._periodic: List[Tuple[str, float, Callable[[], Any]]] = []
+        self._stats_lock = threading.Lock()
+        self._completed: Dict[str, int] = defaultdict(int)
+        self._failed: Dict[str, int] = defaultdict(int)
+        self._run_times: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=samples))
+        self._wait_times: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=samples))
+        self.schedule("purge_finished_jobs", 3600, queue.purge_finished)
+
+    def schedule(self, name: str, interval: float, task: Callable[[], Any]):
+        """Run a maintenance task every interval seconds on the worker's scheduler thread"""
+        self._periodic.append((name, interval, task))
+
+    def start(self):
+        if self._threads:
+            return
+        for number in range(self.concurrency):
+            thread = threading.Thread(target=self._run, name=f"job-worker-{number}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        scheduler = threading.Thread(target=self._run_periodic, name="job-scheduler", daemon=True)
+        scheduler.start()
+        self._threads.append(scheduler)
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop claiming jobs and wait for running ones to finish"""
+        self._stopped.set()
+        self.wake(len(self._threads))
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def wake(self, count: int = 1):
+        """Wake idle worker threads to check the queue now instead of at the next poll"""
+        with self._wakeup:
+            self._pending_wakeups += count
+            self._wakeup.notify(count)
+
+    def _idle(self):
+        with self._wakeup:
+            if not self._pending_wakeups:
+                self._wakeup.wait(self.poll_interval)
+            self._pending_wakeups = max(0, self._pending_wakeups - 1)
+
+    def _run(self):
+        kinds = list(self.handlers)
+        while not self._stopped.is_set():
+            try:
+                jobs = self.queue.claim(kinds, self.worker_id)
+            except Exception as e:
+                logger.warning("Could not claim jobs: %s", e)
+                jobs = []
+            if not jobs:
+                self._idle()
+                continue
+            for job in jobs:
+                self.run_job(job)
+
+    def run_job(self, job: Job):
+        wait = ((job.claimed_at or datetime.now()) - job.created_at).total_seconds()
+        started = time.perf_counter()
+        try:
+            self.handlers[job.kind](job.payload)
+        except Exception as e:
+            logger.exception("Job %s (%s) failed on attempt %d", job.id, job.kind, job.attempts)
+            try:
+                self.queue.fail(job, f"{type(e).__name__}: {e}")
+            except Exception:
+                logger.exception("Could not record failure of job %s", job.id)
+            with self._stats_lock:
+                self._failed[job.kind] += 1
+            return
+        elapsed = time.perf_counter() - started
+        try:
+            self.queue.complete(job)
+        except Exception:
+            # The claim times out and the job runs again, so handlers must be idempotent
+            logger.exception("Could not mark job %s done", job.id)
+        with self._stats_lock:
+            self._completed[job.kind] += 1
+            self._run_times[job.kind].append(elapsed)
+            self._wait_times[job.kind].append(max(0.0, wait))
+
+    def _run_periodic(self):
+        next_runs = {name: time.monotonic() + interval for name, interval, _ in self._periodic}
+        while not self._stopped.is_set():
+            now = time.monotonic()
+            for name, interval, task in self._periodic:
+                if now < next_runs[name]:
+                    continue
+                next_runs[name] = now + interval
+                try:
+                    result = task()
+                    logger.info("Maintenance task %s finished: %s", name, result)
+                except Exception:
+                    logger.exception("Maintenance task %s failed", name)
+            wait = min(next_runs.values(), default=now + self.poll_interval) - time.monotonic()
+            self._stopped.wait(max(0.1, wait))
+
+    def stats(self) -> Dict[str, JobKindStats]:
+        """Per-kind counts and run/wait latencies for jobs run by this process"""
+        with self._stats_lock:
+            return {
+                kind: JobKindStats(
+                    completed=self._completed[kind],
+                    failed=self._failed[kind],
+                    p50_run=_percentile(self._run_times[kind], 0.5),
+                    p95_run=_percentile(self._run_times[kind], 0.95),
+                    p95_wait=_percentile(self._wait_times[kind], 0.95)
+                )
+                for kind in sorted(set(self._completed) | set(self._failed))
+            }
+
+_queue: Optional[JobQueue] = None
+_queue_lock = threading.Lock()
+
+def get_job_queue() -> JobQueue:
+    """Get the process-wide job queue, creating the jobs table on first use"""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            queue = JobQueue()
+            queue.create_schema()
+            _queue = queue
+        return _queue
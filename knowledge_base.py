@@ -0,0 +1,250 @@
+import os
+import csv
+import heapq
+import logging
+import math
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ticket_classifier import normalize_text, tokenize
+from ticket_events import TicketEvent, get_ticket_event_bus
+from ticket_store import RESOLVED_STATUSES, Ticket, TicketChange, get_ticket_repository
+
+logger = logging.getLogger(__name__)
+
+KB_ARTICLES_PATH = os.environ.get(
+    'KB_ARTICLES_PATH', str(Path(__file__).resolve().parent / 'data' / 'kb_articles.csv')
+)
+KB_SYNC_INTERVAL = float(os.environ.get('KB_SYNC_INTERVAL', '30'))
+KB_MIN_SCORE = float(os.environ.get('KB_MIN_SCORE', '2.0'))
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Title words count this many times, since titles are short and on-topic
+TITLE_WEIGHT = 2
+# Terms in more than this share of documents (and at least COMMON_TERM_MIN_DF) add little to
+# the ranking, so they only rescore documents already matched by rarer query terms
+COMMON_TERM_FRACTION = 0.02
+COMMON_TERM_MIN_DF = 1000
+
+@dataclass(frozen=True)
+class KnowledgeDocument:
+    doc_id: str
+    kind: str  # "article" or "ticket"
+    title: str
+    body: str
+    category: Optional[str] = None
+    fix: Optional[str] = None
+
+@dataclass(frozen=True)
+class KnowledgeMatch:
+    document: KnowledgeDocument
+    score: float
+
+class BM25Index:
+    """In-memory inverted index with Okapi BM25 ranking and incremental add/remove
+
+    Documents live in slots; each term maps to {slot: term frequency}. Length
+    normalisation factors are cached per slot and only recomputed when the
+    average document length drifts noticeably.
+    """
+
+    def __init__(self, k1: float = BM25_K1, b: float = BM25_B):
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        self._slots: Dict[str, int] = {}
+        self._docs: List[Optional[KnowledgeDocument]] = []
+        self._doc_terms: List[Optional[Dict[str, int]]] = []
+        self._lengths: List[int] = []
+        self._norms: List[float] = []
+        self._norm_avgdl = 1.0
+        self._free: List[int] = []
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._slots
+
+    @staticmethod
+    def _term_counts(document: KnowledgeDocument) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for token in tokenize(normalize_text(document.title)):
+            counts[token] = counts.get(token, 0) + TITLE_WEIGHT
+        for token in tokenize(normalize_text(document.body)):
+            counts[token] = counts.get(token, 0) + 1
+        return counts
+
+    def _norm(self, length: int) -> float:
+        return self.k1 * (1 - self.b + self.b * length / self._norm_avgdl)
+
+    def add(self, document: KnowledgeDocument):
+        """Index a document, replacing any previous version with the same ID"""
+        counts = self._term_counts(document)
+        length = sum(counts.values())
+        with self._lock:
+            self._remove(document.doc_id)
+            if self._free:
+                slot = self._free.pop()
+            else:
+                slot = len(self._docs)
+                self._docs.append(None)
+                self._doc_terms.append(None)
+                self._lengths.append(0)
+                self._norms.append(0.0)
+            self._slots[document.doc_id] = slot
+            self._docs[slot] = document
+            self._doc_terms[slot] = counts
+            self._lengths[slot] = length
+            self._total_length += length
+            self._norms[slot] = self._norm(length)
+            for term, count in counts.items():
+                self._postings.setdefault(term, {})[slot] = count
+
+    def _remove(self, doc_id: str) -> bool:
+        slot = self._slots.pop(doc_id, None)
+        if slot is None:
+            return False
+        for term in self._doc_terms[slot]:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(slot, None)
+                if not postings:
+                    del self._postings[term]
+        self._total_length -= self._lengths[slot]
+        self._docs[slot] = None
+        self._doc_terms[slot] = None
+        self._lengths[slot] = 0
+        self._free.append(slot)
+        return True
+
+    def remove(self, doc_id: str) -> bool:
+        with self._lock:
+            return self._remove(doc_id)
+
+    def _refresh_norms(self):
+        count = len(self._slots)
+        avgdl = self._total_length / count if count else 1.0
+        if avgdl and abs(avgdl - self._norm_avgdl) / avgdl > 0.05:
+            self._norm_avgdl = avgdl
+            self._norms = [self._norm(length) for length in self._lengths]
+
+    def search(self, query: str, k: int = 5, min_score: float = 0.0) -> List[KnowledgeMatch]:
+        """Top-k documents for a free-text query"""
+        terms = set(tokenize(normalize_text(query)))
+        if not terms:
+            return []
+        k1 = self.k1
+        with self._lock:
+            self._refresh_norms()
+            count = len(self._slots)
+            norms = self._norms
+            # Rarest terms first: they decide the ranking, and common terms then only refine their candidates
+            term_postings = sorted((p for p in map(self._postings.get, terms) if p), key=len)
+            common_df = max(COMMON_TERM_MIN_DF, int(count * COMMON_TERM_FRACTION))
+            scores: Dict[int, float] = {}
+            for postings in term_postings:
+                df = len(postings)
+                weight = math.log(1 + (count - df + 0.5) / (df + 0.5)) * (k1 + 1)
+                if scores and df > common_df:
+                    for slot in scores:
+                        tf = postings.get(slot)
+                        if tf:
+                            scores[slot] += weight * tf / (tf + norms[slot])
+                    continue
+                get = scores.get
+                for slot, tf in postings.items():
+                    scores[slot] = get(slot, 0.0) + weight * tf / (tf + norms[slot])
+            top = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+            return [KnowledgeMatch(self._docs[slot], score) for slot, score in top if score >= min_score]
+
+def _ticket_document(ticket: Ticket) -> KnowledgeDocument:
+    return KnowledgeDocument(
+        doc_id=ticket.ticket_id, kind="ticket", title=ticket.title,
+        body=f"{ticket.description}\n{ticket.resolution}", category=ticket.category, fix=ticket.resolution
+    )
+
+def load_articles(path: str = KB_ARTICLES_PATH) -> List[KnowledgeDocument]:
+    """Read knowledge base articles (article_id, title, category, body) from a CSV file"""
+    if not os.path.exists(path):
+        return []
+    with open(path, newline='', encoding='utf-8') as f:
+        return [
+            KnowledgeDocument(doc_id=row['article_id'], kind="article", title=row['title'],
+                              body=row['body'], category=row.get('category') or None, fix=row['body'])
+            for row in csv.DictReader(f)
+        ]
+
+class KnowledgeBase:
+    """Self-service search over KB articles and resolved tickets' resolution notes"""
+
+    def __init__(self, repository=None, index: Optional[BM25Index] = None, sync_interval: float = KB_SYNC_INTERVAL):
+        self.repository = repository or get_ticket_repository()
+        self.index = index or BM25Index()
+        self.sync_interval = sync_interval
+        self._cursor: Optional[Tuple[datetime, int]] = None
+        self._synced_at = 0.0
+        self._sync_lock = threading.Lock()
+
+    def load_articles(self, articles: Iterable[KnowledgeDocument]):
+        for article in articles:
+            self.index.add(article)
+
+    def sync(self, force: bool = False):
+        """Index tickets resolved since the last sync, e.g. by other processes"""
+        if not force and time.monotonic() - self._synced_at < self.sync_interval:
+            return
+        with self._sync_lock:
+            while True:
+                tickets = self.repository.list_resolved(after=self._cursor, limit=1000)
+                for ticket in tickets:
+                    self.index.add(_ticket_document(ticket))
+                    self._cursor = (ticket.resolved_at, ticket.id or 0)
+                if len(tickets) < 1000:
+                    break
+            self._synced_at = time.monotonic()
+
+    def suggest(self, title: str, description: str = "", k: int = 3, min_score: float = KB_MIN_SCORE) -> List[KnowledgeMatch]:
+        """Best articles and past fixes for a ticket being written"""
+        try:
+            self.sync()
+        except Exception as e:
+            logger.warning("Knowledge base sync failed: %s", e)
+        return self.index.search(f"{title} {description}", k=k, min_score=min_score)
+
+    def apply_change(self, change: TicketChange):
+        """Index tickets as they are resolved and drop them if they are reopened"""
+        ticket = change.ticket
+        if ticket is None or change.action != "updated":
+            return
+        if ticket.status in RESOLVED_STATUSES and ticket.resolution:
+            self.index.add(_ticket_document(ticket))
+        else:
+            self.index.remove(ticket.ticket_id)
+
+    def on_event(self, event: TicketEvent):
+        if event.action == "resync":
+            self._synced_at = 0.0
+
+_knowledge_base: Optional[KnowledgeBase] = None
+_knowledge_base_lock = threading.Lock()
+
+def get_knowledge_base() -> KnowledgeBase:
+    """Get the process-wide knowledge base, indexing articles and resolved tickets on first use"""
+    global _knowledge_base
+    with _knowledge_base_lock:
+        if _knowledge_base is None:
+            knowledge_base = KnowledgeBase()
+            knowledge_base.load_articles(load_articles())
+            knowledge_base.sync(force=True)
+            knowledge_base.repository.add_listener(knowledge_base.apply_change)
+            get_ticket_event_bus().subscribe(knowledge_base.on_event)
+            _knowledge_base = knowledge_base
+        return _knowledge_base
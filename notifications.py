@@ -0,0 +1,580 @@
+import os
+import json
+import atexit
+import logging
+import random
+import smtplib
+import threading
+import time
+import urllib.request
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from typing import Dict, List, Optional, Sequence
+
+from auth_utils import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_BATCH_SIZE = int(os.environ.get('NOTIFY_BATCH_SIZE', '50'))
+NOTIFY_POLL_INTERVAL = float(os.environ.get('NOTIFY_POLL_INTERVAL', '2'))
+NOTIFY_MAX_ATTEMPTS = int(os.environ.get('NOTIFY_MAX_ATTEMPTS', '5'))
+NOTIFY_RETRY_BASE = float(os.environ.get('NOTIFY_RETRY_BASE', '30'))
+NOTIFY_RETRY_MAX = float(os.environ.get('NOTIFY_RETRY_MAX', '3600'))
+NOTIFY_CLAIM_TIMEOUT = float(os.environ.get('NOTIFY_CLAIM_TIMEOUT', '300'))
+NOTIFY_RETENTION_HOURS = float(os.environ.get('NOTIFY_RETENTION_HOURS', '168'))
+NOTIFY_EMAIL_RATE = float(os.environ.get('NOTIFY_EMAIL_RATE', '5'))
+NOTIFY_SMS_RATE = float(os.environ.get('NOTIFY_SMS_RATE', '1'))
+NOTIFY_SMS_ONCALL = os.environ.get('NOTIFY_SMS_ONCALL')
+
+EMAIL = "email"
+SMS = "sms"
+CHANNELS = (EMAIL, SMS)
+
+NOTIFICATION_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS notification_outbox (
+        id BIGSERIAL PRIMARY KEY,
+        channel VARCHAR(16) NOT NULL,
+        recipient VARCHAR(255) NOT NULL,
+        subject VARCHAR(255) NOT NULL DEFAULT '',
+        body TEXT NOT NULL,
+        status VARCHAR(16) NOT NULL DEFAULT 'pending',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        next_attempt_at TIMESTAMP NOT NULL DEFAULT NOW(),
+        claimed_at TIMESTAMP,
+        last_error TEXT,
+        created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+        sent_at TIMESTAMP
+    );
+
+    -- Only undelivered rows are indexed, so the index stays small as sent mail accumulates
+    CREATE INDEX IF NOT EXISTS idx_notification_outbox_due
+        ON notification_outbox (channel, next_attempt_at) WHERE status IN ('pending', 'sending');
+    -- Covers the retention purge and the sent/failed counts without touching the heap
+    CREATE INDEX IF NOT EXISTS idx_notification_outbox_finished
+        ON notification_outbox (status, created_at) WHERE status IN ('sent', 'failed');
+"""
+
+NOTIFICATION_COLUMNS = ("id", "channel", "recipient", "subject", "body", "attempts")
+
+# SKIP LOCKED lets several app or worker processes drain the same outbox without double-sending
+CLAIM_NOTIFICATIONS_QUERY = f"""
+    UPDATE notification_outbox AS o
+    SET status = 'sending', claimed_at = NOW(), attempts = o.attempts + 1
+    FROM (
+        SELECT id FROM notification_outbox
+        WHERE channel = %s AND (
+            (status = 'pending' AND next_attempt_at <= NOW())
+            OR (status = 'sending' AND claimed_at < NOW() - %s * INTERVAL '1 second')
+        )
+        ORDER BY next_attempt_at
+        LIMIT %s
+        FOR UPDATE SKIP LOCKED
+    ) AS due
+    WHERE o.id = due.id
+    RETURNING {', '.join('o.' + column for column in NOTIFICATION_COLUMNS)}
+"""
+
+# Each branch matches one partial index, so the count never scans the whole outbox
+OUTBOX_COUNTS_QUERY = """
+    SELECT status, COUNT(*) FROM notification_outbox
+    WHERE status IN ('pending', 'sending') GROUP BY status
+    UNION ALL
+    SELECT status, COUNT(*) FROM notification_outbox
+    WHERE status IN ('sent', 'failed') AND created_at > NOW() - %s * INTERVAL '1 hour' GROUP BY status
+"""
+
+@dataclass
+class Notification:
+    channel: str
+    recipient: str
+    body: str
+    subject: str = ""
+    id: Optional[int] = None
+    attempts: int = 0
+    status: str = "pending"
+    next_attempt_at: datetime = field(default_factory=datetime.now)
+    claimed_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+    created_at: datetime = field(default_factory=datetime.now)
+    sent_at: Optional[datetime] = None
+
+@dataclass
+class OutboxStats:
+    pending: int
+    sent: int
+    failed: int
+    retries: int
+    batches: int
+
+class BatchInterrupted(Exception):
+    """Raised by a transport that lost its connection part-way through a batch
+
+    results holds an entry for each notification it got to, in order; the rest were never attempted.
+    """
+
+    def __init__(self, message: str, results: List[Optional[str]]):
+        super().__init__(message)
+        self.results = results
+
+class Transport:
+    """Delivers a batch of notifications for one channel
+
+    send_batch returns one entry per notification: None when it was delivered, or
+    an error message. Raising BatchInterrupted keeps the results so far; any other
+    exception fails the whole batch.
+    """
+
+    def send_batch(self, notifications: Sequence[Notification]) -> List[Optional[str]]:
+        raise NotImplementedError
+
+class StubTransport(Transport):
+    """Records notifications in memory instead of sending them; used in demo mode and tests"""
+
+    def __init__(self, fail_recipients: Sequence[str] = ()):
+        self.fail_recipients = set(fail_recipients)
+        self.sent: List[Notification] = []
+        self.batches = 0
+        self._lock = threading.Lock()
+
+    def send_batch(self, notifications: Sequence[Notification]) -> List[Optional[str]]:
+        results = []
+        with self._lock:
+            self.batches += 1
+            for notification in notifications:
+                if notification.recipient in self.fail_recipients:
+                    results.append("stub failure")
+                else:
+                    self.sent.append(notification)
+                    results.append(None)
+        for notification in notifications:
+            logger.info("[stub %s] to %s: %s", notification.channel, notification.recipient,
+                        notification.subject or notification.body[:60])
+        return results
+
+class SmtpTransport(Transport):
+    """Sends email over one SMTP connection per batch"""
+
+    def __init__(self, host: str, port: int = 587, username: Optional[str] = None, password: Optional[str] = None,
+                 sender: str = "aitix@localhost", starttls: bool = True, timeout: float = 30):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.sender = sender
+        self.starttls = starttls
+        self.timeout = timeout
+
+    def send_batch(self, notifications: Sequence[Notification]) -> List[Optional[str]]:
+        results: List[Optional[str]] = []
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            if self.starttls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password or "")
+            for notification in notifications:
+                message = EmailMessage()
+                message["From"] = self.sender
+                message["To"] = notification.recipient
+                message["Subject"] = notification.subject
+                message.set_content(notification.body)
+                try:
+                    smtp.send_message(message)
+                    results.append(None)
+                except smtplib.SMTPRecipientsRefused as e:
+                    results.append(f"recipient refused: {e}")
+                except smtplib.SMTPServerDisconnected as e:
+                    # This message may or may not have gone out; the rest of the batch certainly didn't
+                    results.append(f"{type(e).__name__}: {e}")
+                    raise BatchInterrupted(str(e), results) from e
+                except smtplib.SMTPException as e:
+                    # Refused sender or data: the connection is still usable for the next message
+                    results.append(f"{type(e).__name__}: {e}")
+                except OSError as e:
+                    results.append(f"{type(e).__name__}: {e}")
+                    raise BatchInterrupted(str(e), results) from e
+        return results
+
+class SmsGatewayTransport(Transport):
+    """Posts a batch of text messages as JSON to an HTTP SMS gateway"""
+
+    def __init__(self, url: str, api_key: Optional[str] = None, sender: Optional[str] = None, timeout: float = 30):
+        self.url = url
+        self.api_key = api_key
+        self.sender = sender
+        self.timeout = timeout
+
+    def send_batch(self, notifications: Sequence[Notification]) -> List[Optional[str]]:
+        payload = {"sender": self.sender, "messages": [
+            {"to": notification.recipient, "text": notification.body} for notification in notifications
+        ]}
+        request = urllib.request.Request(self.url, data=json.dumps(payload).encode("utf-8"), method="POST",
+                                         headers={"Content-Type": "application/json"})
+        if self.api_key:
+            request.add_header("Authorization", f"Bearer {self.api_key}")
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            body = json.loads(response.read() or b"{}")
+        # Gateways that report per-message results return {"results": [{"error": ...}, ...]}
+        results = body.get("results") if isinstance(body, dict) else None
+        if not isinstance(results, list) or len(results) != len(notifications):
+            return [None] * len(notifications)
+        return [(result or {}).get("error") for result in results]
+
+def transports_from_env() -> Dict[str, Transport]:
+    """SMTP and SMS gateway transports configured from the environment, falling back to stubs"""
+    transports: Dict[str, Transport] = {EMAIL: StubTransport(), SMS: StubTransport()}
+    if os.environ.get('SMTP_HOST'):
+        transports[EMAIL] = SmtpTransport(
+            host=os.environ['SMTP_HOST'],
+            port=int(os.environ.get('SMTP_PORT', '587')),
+            username=os.environ.get('SMTP_USER'),
+            password=os.environ.get('SMTP_PASSWORD'),
+            sender=os.environ.get('SMTP_FROM', 'aitix@localhost'),
+            starttls=os.environ.get('SMTP_STARTTLS', 'true').lower() == 'true'
+        )
+    if os.environ.get('SMS_GATEWAY_URL'):
+        transports[SMS] = SmsGatewayTransport(
+            url=os.environ['SMS_GATEWAY_URL'],
+            api_key=os.environ.get('SMS_API_KEY'),
+            sender=os.environ.get('SMS_SENDER')
+        )
+    return transports
+
+class RateLimiter:
+    """Token bucket: sustained `rate` sends per second with bursts up to `burst`"""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, count: int, stop: Optional[threading.Event] = None) -> bool:
+        """Wait until count tokens are available; returns False if stopped first"""
+        if self.rate <= 0:
+            return True
+        needed = float(count)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                # A batch larger than the burst takes what there is and waits for the rest
+                take = min(needed, self._tokens)
+                self._tokens -= take
+                needed -= take
+                if needed <= 0:
+                    return True
+                wait = needed / self.rate
+            if stop is None:
+                time.sleep(wait)
+            elif stop.wait(wait):
+                return False
+
+def retry_delay(attempts: int, base: float = NOTIFY_RETRY_BASE, cap: float = NOTIFY_RETRY_MAX) -> float:
+    """Exponential backoff with jitter after the given number of failed attempts"""
+    delay = min(cap, base * (2 ** max(0, attempts - 1)))
+    return delay * random.uniform(0.8, 1.2)
+
+class NotificationOutbox:
+    """Durable outbox of pending notifications, in PostgreSQL or in memory in demo mode"""
+
+    def __init__(self, db: Optional[DatabaseManager] = None, max_attempts: int = NOTIFY_MAX_ATTEMPTS):
+        self.db = db or DatabaseManager()
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._mock: Dict[int, Notification] = {}
+        self._mock_sequence = 0
+
+    def create_schema(self):
+        if self.db.use_database:
+            with self.db.get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(NOTIFICATION_SCHEMA)
+
+    def add(self, notification: Notification) -> Notification:
+        """Queue a notification; this is a single insert and never talks to a transport"""
+        if self.db.use_database:
+            with self.db.get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(
+                        "INSERT INTO notification_outbox (channel, recipient, subject, body) VALUES (%s, %s, %s, %s) RETURNING id",
+                        (notification.channel, notification.recipient, notification.subject, notification.body)
+                    )
+                    notification.id = cursor.fetchone()[0]
+            return notification
+        with self._lock:
+            self._mock_sequence += 1
+            notification.id = self._mock_sequence
+            self._mock[notification.id] = notification
+        return notification
+
+    def claim(self, channel: str, limit: int, claim_timeout: float = NOTIFY_CLAIM_TIMEOUT) -> List[Notification]:
+        """Mark up to limit due notifications as sending and return them"""
+        if self.db.use_database:
+            with self.db.get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(CLAIM_NOTIFICATIONS_QUERY, (channel, claim_timeout, limit))
+                    rows = cursor.fetchall()
+            return [Notification(**dict(zip(NOTIFICATION_COLUMNS, row))) for row in rows]
+        now = datetime.now()
+        stale = now - timedelta(seconds=claim_timeout)
+        claimed = []
+        with self._lock:
+            due = sorted(
+                (n for n in self._mock.values() if n.channel == channel and (
+                    (n.status == "pending" and n.next_attempt_at <= now)
+                    or (n.status == "sending" and n.claimed_at and n.claimed_at < stale))),
+                key=lambda n: n.next_attempt_at
+            )
+            for notification in due[:limit]:
+                notification.status = "sending"
+                notification.claimed_at = now
+                notification.attempts += 1
+                claimed.append(replace(notification))
+        return claimed
+
+    def mark_sent(self, ids: Sequence[int]):
+        if not ids:
+            return
+        if self.db.use_database:
+            with self.db.get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(
+                        "UPDATE notification_outbox SET status = 'sent', sent_at = NOW(), last_error = NULL WHERE id = ANY(%s)",
+                        (list(ids),)
+                    )
+            return
+        with self._lock:
+            for notification_id in ids:
+                notification = self._mock[notification_id]
+                notification.status = "sent"
+                notification.sent_at = datetime.now()
+
+    def mark_failed(self, notification: Notification, error: str):
+        """Schedule a retry with backoff, or give up after max_attempts"""
+        give_up = notification.attempts >= self.max_attempts
+        delay = retry_delay(notification.attempts)
+        if self.db.use_database:
+            with self.db.get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(
+                        """
+                        UPDATE notification_outbox
+                        SET status = %s, last_error = %s, next_attempt_at = NOW() + %s * INTERVAL '1 second'
+                        WHERE id = %s
+                        """,
+                        ("failed" if give_up else "pending", error[:1000], delay, notification.id)
+                    )
+            return
+        with self._lock:
+            stored = self._mock[notification.id]
+            stored.status = "failed" if give_up else "pending"
+            stored.last_error = error
+            stored.next_attempt_at = datetime.now() + timedelta(seconds=delay)
+
+    def requeue(self, notifications: Sequence[Notification], error: str):
+        """Put claimed notifications that were never attempted back, without using up an attempt"""
+        if not notifications:
+            return
+        delay = retry_delay(1)
+        if self.db.use_database:
+            with self.db.get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(
+                        """
+                        UPDATE notification_outbox
+                        SET status = 'pending', attempts = attempts - 1, last_error = %s,
+                            next_attempt_at = NOW() + %s * INTERVAL '1 second'
+                        WHERE id = ANY(%s)
+                        """,
+                        (error[:1000], delay, [notification.id for notification in notifications])
+                    )
+            return
+        with self._lock:
+            for notification in notifications:
+                stored = self._mock[notification.id]
+                stored.status = "pending"
+                stored.attempts -= 1
+                stored.last_error = error
+                stored.next_attempt_at = datetime.now() + timedelta(seconds=delay)
+
+    def purge_finished(self, older_than_hours: float = NOTIFY_RETENTION_HOURS) -> int:
+        """Delete sent and failed notifications past the retention period"""
+        if self.db.use_database:
+            with self.db.get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(
+                        "DELETE FROM notification_outbox WHERE status IN ('sent', 'failed') "
+                        "AND created_at < NOW() - %s * INTERVAL '1 hour'",
+                        (older_than_hours,)
+                    )
+                    return cursor.rowcount
+        cutoff = datetime.now() - timedelta(hours=older_than_hours)
+        with self._lock:
+            expired = [notification_id for notification_id, notification in self._mock.items()
+                       if notification.status in ("sent", "failed") and notification.created_at < cutoff]
+            for notification_id in expired:
+                del self._mock[notification_id]
+        return len(expired)
+
+    def counts(self, window_hours: float = NOTIFY_RETENTION_HOURS) -> Dict[str, int]:
+        """Undelivered notifications per status, plus sent and failed ones created within the window"""
+        if self.db.use_database:
+            with self.db.get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(OUTBOX_COUNTS_QUERY, (window_hours,))
+                    return dict(cursor.fetchall())
+        since = datetime.now() - timedelta(hours=window_hours)
+        counts: Dict[str, int] = {}
+        with self._lock:
+            for notification in self._mock.values():
+                if notification.status in ("sent", "failed") and notification.created_at <= since:
+                    continue
+                counts[notification.status] = counts.get(notification.status, 0) + 1
+        return counts
+
+class NotificationDispatcher:
+    """Background thread that drains the outbox per channel in rate-limited batches"""
+
+    def __init__(self, outbox: NotificationOutbox, transports: Dict[str, Transport],
+                 rates: Optional[Dict[str, float]] = None, batch_size: int = NOTIFY_BATCH_SIZE,
+                 poll_interval: float = NOTIFY_POLL_INTERVAL):
+        self.outbox = outbox
+        self.transports = transports
+        rates = rates or {EMAIL: NOTIFY_EMAIL_RATE, SMS: NOTIFY_SMS_RATE}
+        self.limiters = {channel: RateLimiter(rates.get(channel, 0)) for channel in transports}
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stats_lock = threading.Lock()
+        self.sent = 0
+        self.failures = 0
+        self.batches = 0
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="notification-dispatcher", daemon=True)
+            self._thread.start()
+            atexit.register(self.stop)
+
+    def stop(self):
+        self._stopped.set()
+        self._wakeup.set()
+
+    def wake(self):
+        """Check the outbox now instead of at the next poll"""
+        self._wakeup.set()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                busy = self.dispatch_once()
+            except Exception as e:
+                logger.warning("Notification dispatch failed: %s", e)
+                busy = False
+            if not busy:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+
+    def dispatch_once(self) -> bool:
+        """Send one batch per channel; returns True if anything was due"""
+        busy = False
+        for channel, transport in self.transports.items():
+            if self._stopped.is_set():
+                break
+            batch = self.outbox.claim(channel, self.batch_size)
+            if not batch:
+                continue
+            busy = True
+            if not self.limiters[channel].acquire(len(batch), self._stopped):
+                # Shutting down: the claim expires and another dispatcher picks the batch up
+                break
+            unsent: Sequence[Notification] = ()
+            try:
+                errors = transport.send_batch(batch)
+            except BatchInterrupted as e:
+                # Keep what was delivered; only the messages never attempted go back in the queue
+                errors = e.results[:len(batch)]
+                unsent = batch[len(errors):]
+                logger.warning("%s batch interrupted after %d of %d messages: %s", channel, len(errors), len(batch), e)
+            except Exception as e:
+                errors = [f"{type(e).__name__}: {e}"] * len(batch)
+            sent = [n.id for n, error in zip(batch, errors) if error is None]
+            self.outbox.mark_sent(sent)
+            for notification, error in zip(batch, errors):
+                if error is not None:
+                    logger.warning("Notification %s to %s failed (attempt %d): %s",
+                                   notification.id, notification.recipient, notification.attempts, error)
+                    self.outbox.mark_failed(notification, error)
+            self.outbox.requeue(unsent, "batch interrupted before this message was sent")
+            with self._stats_lock:
+                self.batches += 1
+                self.sent += len(sent)
+                self.failures += len(errors) - len(sent)
+        return busy
+
+class Notifier:
+    """Queues notifications for asynchronous delivery"""
+
+    def __init__(self, outbox: NotificationOutbox, dispatcher: Optional[NotificationDispatcher] = None):
+        self.outbox = outbox
+        self.dispatcher = dispatcher
+
+    def enqueue(self, channel: str, recipient: str, body: str, subject: str = "") -> Optional[Notification]:
+        """Add a notification to the outbox and return immediately"""
+        if channel not in CHANNELS:
+            raise ValueError(f"Unknown notification channel: {channel}")
+        if not recipient:
+            return None
+        try:
+            notification = self.outbox.add(Notification(channel=channel, recipient=recipient, subject=subject, body=body))
+        except Exception as e:
+            # Alerts are best-effort from the user's point of view; the ticket itself is already saved
+            logger.error("Could not queue %s notification to %s: %s", channel, recipient, e)
+            return None
+        if self.dispatcher is not None:
+            self.dispatcher.wake()
+        return notification
+
+    def ticket_created(self, ticket, email: Optional[str]):
+        """Confirmation to the submitter, plus an on-call SMS for critical tickets"""
+        self.enqueue(
+            EMAIL, email,
+            subject=f"[{ticket.ticket_id}] {ticket.title}",
+            body=(f"Your ticket {ticket.ticket_id} has been received.\n\n"
+                  f"Title: {ticket.title}\nCategory: {ticket.category}\nPriority: {ticket.priority}\n"
+                  f"Assigned to: {ticket.assigned_to or 'Service Desk'}\n\n"
+                  "We will keep you updated by email.")
+        )
+        if ticket.priority == "Critical" and NOTIFY_SMS_ONCALL:
+            self.enqueue(SMS, NOTIFY_SMS_ONCALL, body=f"CRITICAL {ticket.ticket_id}: {ticket.title[:100]}")
+
+    def stats(self) -> OutboxStats:
+        counts = self.outbox.counts()
+        dispatcher = self.dispatcher
+        return OutboxStats(
+            pending=counts.get("pending", 0) + counts.get("sending", 0),
+            sent=counts.get("sent", 0),
+            failed=counts.get("failed", 0),
+            retries=dispatcher.failures if dispatcher else 0,
+            batches=dispatcher.batches if dispatcher else 0
+        )
+
+_notifier: Optional[Notifier] = None
+_notifier_lock = threading.Lock()
+
+def get_notifier() -> Notifier:
+    """Get the process-wide notifier, starting its dispatcher thread on first use"""
+    global _notifier
+    with _notifier_lock:
+        if _notifier is None:
+            outbox = NotificationOutbox()
+            outbox.create_schema()
+            dispatcher = NotificationDispatcher(outbox, transports_from_env())
+            dispatcher.start()
+            _notifier = Notifier(outbox, dispatcher)
+        return _notifier
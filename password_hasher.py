@@ -0,0 +1,150 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from dataclasses import dataclass
+from typing import Optional, Callable, Any
+
+from instrumentation import timed
+
+# bcrypt is imported on first hash, so pages that never check a password don't load it.
+# It releases the GIL while hashing, so a thread pool gives real parallelism
+BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', '12'))
+AUTH_HASH_WORKERS = int(os.environ.get('AUTH_HASH_WORKERS', str(min(4, os.cpu_count() or 1))))
+AUTH_HASH_MAX_QUEUE = int(os.environ.get('AUTH_HASH_MAX_QUEUE', '64'))
+AUTH_HASH_TIMEOUT = float(os.environ.get('AUTH_HASH_TIMEOUT', '30'))
+
+class HashQueueFull(Exception):
+    """Raised when too many hashing requests are already waiting"""
+
+class HashTimeout(HashQueueFull):
+    """Raised when a queued hashing request doesn't finish within the timeout"""
+
+@dataclass
+class HasherStats:
+    workers: int
+    rounds: int
+    active: int
+    queued: int
+    max_queued: int
+    completed: int
+    rejected: int
+    timed_out: int
+    total_time: float
+
+    @property
+    def avg_time(self) -> float:
+        return self.total_time / self.completed if self.completed else 0.0
+
+def hash_cost(hashed: str) -> Optional[int]:
+    """Extract the work factor from a bcrypt hash such as $2b$12$..."""
+    try:
+        return int(hashed.split('$')[2])
+    except (IndexError, ValueError):
+        return None
+
+class PasswordHasher:
+    """Bounded worker pool for bcrypt hashing and verification"""
+
+    def __init__(self, rounds: int = BCRYPT_ROUNDS, workers: int = AUTH_HASH_WORKERS,
+                 max_queue: int = AUTH_HASH_MAX_QUEUE, timeout: float = AUTH_HASH_TIMEOUT):
+        self.rounds = rounds
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="auth-hash")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._active = 0
+        self._max_queued = 0
+        self._completed = 0
+        self._rejected = 0
+        self._timed_out = 0
+        self._total_time = 0.0
+
+    def _run(self, fn: Callable, args: tuple) -> Any:
+        with self._lock:
+            self._active += 1
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._active -= 1
+                self._pending -= 1
+                self._completed += 1
+                self._total_time += elapsed
+
+    def _submit(self, fn: Callable, *args) -> Any:
+        with self._lock:
+            if self._pending >= self.workers + self.max_queue:
+                self._rejected += 1
+                raise HashQueueFull("Too many concurrent password operations")
+            self._pending += 1
+            self._max_queued = max(self._max_queued, self._pending - self.workers)
+        try:
+            future = self._executor.submit(self._run, fn, args)
+        except RuntimeError:
+            with self._lock:
+                self._pending -= 1
+            raise
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            # Drop it if it never started; one already running finishes and settles _pending in _run
+            if future.cancel():
+                with self._lock:
+                    self._pending -= 1
+            with self._lock:
+                self._timed_out += 1
+            raise HashTimeout(f"Password operation did not finish within {self.timeout:g}s") from None
+
+    @timed("auth.hash_password")
+    def hash(self, password: str) -> str:
+        """Hash a password at the configured work factor"""
+        import bcrypt
+        def _hash(raw: bytes) -> str:
+            return bcrypt.hashpw(raw, bcrypt.gensalt(rounds=self.rounds)).decode('utf-8')
+        return self._submit(_hash, password.encode('utf-8'))
+
+    @timed("auth.verify_password")
+    def verify(self, password: str, hashed: str) -> bool:
+        """Verify a password against its hash"""
+        import bcrypt
+        return self._submit(bcrypt.checkpw, password.encode('utf-8'), hashed.encode('utf-8'))
+
+    def needs_rehash(self, hashed: str) -> bool:
+        """Check whether a stored hash uses a different work factor than configured"""
+        cost = hash_cost(hashed)
+        return cost is not None and cost != self.rounds
+
+    def stats(self) -> HasherStats:
+        """Snapshot of pool usage and queue depth"""
+        with self._lock:
+            return HasherStats(
+                workers=self.workers,
+                rounds=self.rounds,
+                active=self._active,
+                queued=max(0, self._pending - self._active),
+                max_queued=self._max_queued,
+                completed=self._completed,
+                rejected=self._rejected,
+                timed_out=self._timed_out,
+                total_time=self._total_time
+            )
+
+    def shutdown(self):
+        """Stop accepting work and wait for running hashes"""
+        self._executor.shutdown(wait=True)
+
+_hasher: Optional[PasswordHasher] = None
+_hasher_lock = threading.Lock()
+
+def get_password_hasher() -> PasswordHasher:
+    """Get the process-wide password hasher"""
+    global _hasher
+    with _hasher_lock:
+        if _hasher is None:
+            _hasher = PasswordHasher()
+        return _hasher
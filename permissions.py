@@ -0,0 +1,176 @@
+import logging
+import threading
+from enum import IntFlag
+from typing import Dict, Iterable, Optional
+
+from auth_utils import DatabaseManager, User
+from db_pool import create_trigger_sql
+from ticket_events import CONFIG_EVENTS_CHANNEL, TicketEvent, get_ticket_event_bus
+
+logger = logging.getLogger(__name__)
+
+class Permission(IntFlag):
+    VIEW_DASHBOARD = 1 << 0
+    SUBMIT_TICKETS = 1 << 1
+    WORK_TICKETS = 1 << 2
+    VIEW_ALL_TICKETS = 1 << 3
+    MANAGE_USERS = 1 << 4
+    MANAGE_CATEGORIES = 1 << 5
+    MANAGE_ROUTING = 1 << 6
+    VIEW_SYSTEM_STATS = 1 << 7
+    MANAGE_PERMISSIONS = 1 << 8
+
+NO_PERMISSIONS = Permission(0)
+ALL_PERMISSIONS = Permission(sum(Permission))
+ADMIN_PERMISSIONS = (Permission.MANAGE_USERS | Permission.MANAGE_CATEGORIES | Permission.MANAGE_ROUTING
+                     | Permission.VIEW_SYSTEM_STATS | Permission.MANAGE_PERMISSIONS)
+
+# Mirrors the original Employee < IT Support < Admin hierarchy
+DEFAULT_ROLE_PERMISSIONS: Dict[str, Permission] = {
+    "Employee": Permission.VIEW_DASHBOARD | Permission.SUBMIT_TICKETS,
+    "IT Support": Permission.VIEW_DASHBOARD | Permission.SUBMIT_TICKETS | Permission.WORK_TICKETS | Permission.VIEW_ALL_TICKETS,
+    "Admin": ALL_PERMISSIONS,
+}
+
+# Edits are announced on the config feed so every process recompiles its masks
+ROLE_PERMISSIONS_SCHEMA = f"""
+    CREATE TABLE IF NOT EXISTS role_permissions (
+        role VARCHAR(50) NOT NULL,
+        permission VARCHAR(64) NOT NULL,
+        PRIMARY KEY (role, permission)
+    );
+
+    CREATE OR REPLACE FUNCTION role_permissions_notify() RETURNS trigger AS $$
+    BEGIN
+        PERFORM pg_notify('{CONFIG_EVENTS_CHANNEL}', json_build_object('action', 'role_permissions')::text);
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+
+""" + create_trigger_sql(
+    "role_permissions_notify", "role_permissions", "AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE",
+    "FOR EACH STATEMENT EXECUTE FUNCTION role_permissions_notify()"
+)
+
+def compile_permissions(names: Iterable[str]) -> Permission:
+    """Fold permission names into one bitset, ignoring names this version doesn't know"""
+    mask = NO_PERMISSIONS
+    for name in names:
+        flag = Permission.__members__.get(name)
+        if flag is None:
+            logger.warning("Ignoring unknown permission %r", name)
+        else:
+            mask |= flag
+    return mask
+
+def permission_names(mask: Permission):
+    return [flag.name for flag in Permission if flag & mask]
+
+class PermissionRegistry:
+    """Role -> permission bitset table, loaded from role_permissions and compiled once per change
+
+    A check is a dictionary lookup and a bitwise AND; no query runs per check.
+    """
+
+    def __init__(self, db: Optional[DatabaseManager] = None):
+        self.db = db or DatabaseManager()
+        self._lock = threading.Lock()
+        self._set_masks(DEFAULT_ROLE_PERMISSIONS)
+        self.version = 0
+
+    def _set_masks(self, masks: Dict[str, Permission]):
+        self._masks = dict(masks)
+        self._bits: Dict[str, int] = {role: int(mask) for role, mask in masks.items()}
+
+    def create_schema(self):
+        """Create the role_permissions table, seeding it with the default roles when empty"""
+        if not self.db.use_database:
+            return
+        self.db.execute_query(ROLE_PERMISSIONS_SCHEMA)
+        if not self.db.fetch_one("SELECT 1 FROM role_permissions LIMIT 1"):
+            self._write(DEFAULT_ROLE_PERMISSIONS)
+
+    def _read(self) -> Dict[str, Permission]:
+        rows = self.db.execute_query("SELECT role, permission FROM role_permissions", fetch=True)
+        # execute_query swallows errors and returns 0; an empty table is never valid either
+        if not isinstance(rows, list) or not rows:
+            raise RuntimeError("Could not load role permissions")
+        names: Dict[str, list] = {}
+        for role, permission in rows:
+            names.setdefault(role, []).append(permission)
+        return {role: compile_permissions(permissions) for role, permissions in names.items()}
+
+    def reload(self):
+        """Recompile the role masks from the stored permissions"""
+        if not self.db.use_database:
+            return
+        try:
+            masks = self._read()
+        except Exception as e:
+            # Keep enforcing the last good table rather than locking everyone out
+            logger.warning("Role permissions reload failed: %s", e)
+            return
+        with self._lock:
+            self._set_masks(masks)
+            self.version += 1
+
+    def _write(self, masks: Dict[str, Permission]):
+        with self.db.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("DELETE FROM role_permissions")
+                for role, mask in masks.items():
+                    for name in permission_names(mask):
+                        cursor.execute("INSERT INTO role_permissions (role, permission) VALUES (%s, %s)", (role, name))
+
+    def save(self, masks: Dict[str, Permission]) -> bool:
+        """Replace every role's permissions and recompile; other processes reload from the change feed"""
+        if not any(mask & Permission.MANAGE_PERMISSIONS for mask in masks.values()):
+            raise ValueError("At least one role must keep MANAGE_PERMISSIONS")
+        if self.db.use_database:
+            try:
+                self._write(masks)
+            except Exception as e:
+                logger.error("Saving role permissions failed: %s", e)
+                return False
+            self.reload()
+        else:
+            with self._lock:
+                self._set_masks(masks)
+                self.version += 1
+        return True
+
+    def roles(self) -> Dict[str, Permission]:
+        with self._lock:
+            return dict(self._masks)
+
+    def mask(self, role: str) -> Permission:
+        return Permission(self._bits.get(role, 0))
+
+    # Checks use the plain-int copy of the masks: IntFlag arithmetic is ~10x slower than int
+    def allows(self, user: Optional[User], permission: Permission) -> bool:
+        """True if the user's role grants every flag in permission"""
+        required = int(permission)
+        return user is not None and self._bits.get(user.role, 0) & required == required
+
+    def allows_any(self, user: Optional[User], permissions: Permission) -> bool:
+        """True if the user's role grants at least one flag in permissions"""
+        return user is not None and bool(self._bits.get(user.role, 0) & int(permissions))
+
+    def on_event(self, event: TicketEvent):
+        if event.action in ("role_permissions", "resync"):
+            self.reload()
+
+_registry: Optional[PermissionRegistry] = None
+_registry_lock = threading.Lock()
+
+def get_permission_registry() -> PermissionRegistry:
+    """Get the process-wide permission registry, compiled from the stored roles and kept in sync with edits"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            registry = PermissionRegistry()
+            registry.create_schema()
+            registry.reload()
+            get_ticket_event_bus().subscribe(registry.on_event)
+            _registry = registry
+        return _registry
@@ -0,0 +1,128 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+QUERY_CACHE_TTL = float(os.environ.get('QUERY_CACHE_TTL', '10'))
+QUERY_CACHE_SIZE = int(os.environ.get('QUERY_CACHE_SIZE', '1000'))
+
+@dataclass
+class QueryCacheStats:
+    hits: int
+    misses: int
+    coalesced: int
+    invalidations: int
+    evictions: int
+    size: int
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses + self.coalesced
+        return (self.hits + self.coalesced) / total if total else 0.0
+
+class _Flight:
+    """A load in progress that concurrent callers wait on instead of querying again"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+class QueryCache:
+    """Process-wide TTL cache for read queries with per-key request coalescing
+
+    Keys are grouped into namespaces (e.g. "tickets") so a write can drop every
+    dependent entry at once. Cached values are shared between sessions and must
+    not be mutated by callers.
+    """
+
+    def __init__(self, ttl: float = QUERY_CACHE_TTL, max_size: int = QUERY_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[Tuple[str, Hashable], Tuple[float, Any]]' = OrderedDict()
+        self._inflight: Dict[Tuple[str, Hashable], _Flight] = {}
+        self._generations: Dict[str, int] = {}
+        self._epoch = 0
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._invalidations = 0
+        self._evictions = 0
+
+    def get_or_load(self, namespace: str, key: Hashable, loader: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        """Return the cached value for key, running loader at most once across threads on a miss"""
+        cache_key = (namespace, key)
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is not None:
+                expires_at, value = entry
+                if time.monotonic() < expires_at:
+                    self._entries.move_to_end(cache_key)
+                    self._hits += 1
+                    return value
+                del self._entries[cache_key]
+            flight = self._inflight.get(cache_key)
+            if flight is not None:
+                self._coalesced += 1
+                leader = False
+            else:
+                flight = _Flight()
+                self._inflight[cache_key] = flight
+                self._misses += 1
+                leader = True
+            generation = (self._epoch, self._generations.get(namespace, 0))
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = loader()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(cache_key, None)
+                # A write during the load may have made this result stale; hand it out but don't keep it
+                if flight.error is None and ttl > 0 and (self._epoch, self._generations.get(namespace, 0)) == generation:
+                    self._entries[cache_key] = (time.monotonic() + ttl, flight.value)
+                    self._entries.move_to_end(cache_key)
+                    while len(self._entries) > self.max_size:
+                        self._entries.popitem(last=False)
+                        self._evictions += 1
+            flight.done.set()
+        return flight.value
+
+    def invalidate(self, namespace: str):
+        """Drop every entry in a namespace"""
+        with self._lock:
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            stale = [cache_key for cache_key in self._entries if cache_key[0] == namespace]
+            for cache_key in stale:
+                del self._entries[cache_key]
+            self._invalidations += 1
+
+    def clear(self):
+        """Drop all entries"""
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+
+    def stats(self) -> QueryCacheStats:
+        """Snapshot of cache counters"""
+        with self._lock:
+            return QueryCacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                coalesced=self._coalesced,
+                invalidations=self._invalidations,
+                evictions=self._evictions,
+                size=len(self._entries)
+            )
@@ -0,0 +1,162 @@
+import os
+import csv
+import io
+import json
+import logging
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from typing import Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SLOW_QUERY_THRESHOLD_MS = float(os.environ.get('SLOW_QUERY_THRESHOLD_MS', '200'))
+SLOW_QUERY_LOG_SIZE = int(os.environ.get('SLOW_QUERY_LOG_SIZE', '100'))
+QUERY_STATS_MAX_STATEMENTS = int(os.environ.get('QUERY_STATS_MAX_STATEMENTS', '500'))
+# Where worker.py writes its stats every --stats-interval; {pid} keeps several workers apart
+QUERY_STATS_EXPORT_PATH = os.environ.get('QUERY_STATS_EXPORT_PATH')
+
+# Statements past QUERY_STATS_MAX_STATEMENTS are counted here so one runaway query builder can't grow the table
+OTHER_STATEMENTS = "<other>"
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+
+@lru_cache(maxsize=2048)
+def normalize_sql(query: str) -> str:
+    """Collapse whitespace and replace inline literals with ? so one statement keys one row"""
+    sql = _STRING_LITERAL.sub("?", query)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+def _value_shape(value) -> str:
+    if isinstance(value, (list, tuple)):
+        return f"{type(value).__name__}[{len(value)}]"
+    return type(value).__name__
+
+def param_shape(params) -> str:
+    """Types of the bound parameters, e.g. (str, int, list[40]), never their values"""
+    if params is None:
+        return "()"
+    if isinstance(params, dict):
+        return "{" + ", ".join(f"{name}: {_value_shape(value)}" for name, value in params.items()) + "}"
+    return "(" + ", ".join(_value_shape(value) for value in params) + ")"
+
+@dataclass
+class StatementStats:
+    sql: str
+    calls: int = 0
+    errors: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+    rows: int = 0
+    slow_calls: int = 0
+
+    @property
+    def mean_time(self) -> float:
+        return self.total_time / self.calls if self.calls else 0.0
+
+@dataclass(frozen=True)
+class SlowQuery:
+    sql: str
+    seconds: float
+    params: str
+    rows: int
+    failed: bool
+    at: float
+
+class QueryStats:
+    """Per-statement call counts, timings and row counts, plus a bounded log of slow statements"""
+
+    def __init__(self, slow_threshold_ms: float = SLOW_QUERY_THRESHOLD_MS, slow_log_size: int = SLOW_QUERY_LOG_SIZE,
+                 max_statements: int = QUERY_STATS_MAX_STATEMENTS):
+        self.slow_threshold = slow_threshold_ms / 1000
+        self.max_statements = max_statements
+        self._lock = threading.Lock()
+        self._statements: Dict[str, StatementStats] = {}
+        self._slow: Deque[SlowQuery] = deque(maxlen=slow_log_size)
+        self.since = time.time()
+
+    def record(self, query: str, seconds: float, params=None, rows: int = 0, failed: bool = False):
+        sql = normalize_sql(query)
+        slow = seconds >= self.slow_threshold
+        with self._lock:
+            stats = self._statements.get(sql)
+            if stats is None:
+                if len(self._statements) >= self.max_statements:
+                    sql = OTHER_STATEMENTS
+                stats = self._statements.setdefault(sql, StatementStats(sql))
+            stats.calls += 1
+            stats.total_time += seconds
+            stats.max_time = max(stats.max_time, seconds)
+            stats.rows += max(rows, 0)
+            if failed:
+                stats.errors += 1
+            if slow:
+                stats.slow_calls += 1
+                # Shapes only: parameter values may be passwords, tokens or ticket text
+                entry = SlowQuery(sql, seconds, param_shape(params), rows, failed, time.time())
+                self._slow.append(entry)
+        if slow:
+            logger.warning("Slow query (%.0f ms, %d rows, params %s): %s", seconds * 1000, rows, entry.params, sql)
+
+    def statements(self) -> List[StatementStats]:
+        """Snapshot of every statement, most total time first"""
+        with self._lock:
+            snapshot = [StatementStats(**asdict(stats)) for stats in self._statements.values()]
+        return sorted(snapshot, key=lambda stats: stats.total_time, reverse=True)
+
+    def slow_queries(self) -> List[SlowQuery]:
+        """Logged slow statements, newest first"""
+        with self._lock:
+            return list(reversed(self._slow))
+
+    def reset(self):
+        with self._lock:
+            self._statements.clear()
+            self._slow.clear()
+            self.since = time.time()
+
+    def export(self) -> dict:
+        return {
+            "since": self.since,
+            "exported_at": time.time(),
+            "slow_threshold_ms": self.slow_threshold * 1000,
+            "statements": [dict(asdict(stats), mean_time=stats.mean_time) for stats in self.statements()],
+            "slow_queries": [asdict(entry) for entry in self.slow_queries()],
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.export(), indent=2)
+
+    def write(self, path: str):
+        """Export to a JSON file, replacing it atomically so readers never see half a file"""
+        path = path.format(pid=os.getpid())
+        with open(path + ".tmp", "w") as f:
+            f.write(self.to_json())
+        os.replace(path + ".tmp", path)
+
+    def to_csv(self) -> str:
+        """Statement stats as CSV, one row per normalized statement"""
+        out = io.StringIO()
+        writer = csv.writer(out)
+        writer.writerow(["sql", "calls", "errors", "total_ms", "mean_ms", "max_ms", "rows", "slow_calls"])
+        for stats in self.statements():
+            writer.writerow([stats.sql, stats.calls, stats.errors, round(stats.total_time * 1000, 3),
+                             round(stats.mean_time * 1000, 3), round(stats.max_time * 1000, 3), stats.rows, stats.slow_calls])
+        return out.getvalue()
+
+_query_stats: Optional[QueryStats] = None
+_query_stats_lock = threading.Lock()
+
+def get_query_stats() -> QueryStats:
+    """Get the process-wide statement statistics"""
+    global _query_stats
+    with _query_stats_lock:
+        if _query_stats is None:
+            _query_stats = QueryStats()
+        return _query_stats
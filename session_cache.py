@@ -0,0 +1,122 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional, Dict, Set, Any
+
+SESSION_CACHE_SIZE = int(os.environ.get('SESSION_CACHE_SIZE', '10000'))
+SESSION_CACHE_TTL = float(os.environ.get('SESSION_CACHE_TTL', '60'))
+
+@dataclass
+class CacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    invalidations: int
+    size: int
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+@dataclass
+class _CacheEntry:
+    user: Any
+    fresh_until: float
+    expires_at: Optional[float]
+
+class SessionCache:
+    """Bounded LRU cache of session token -> User with a freshness TTL"""
+
+    def __init__(self, max_size: int = SESSION_CACHE_SIZE, ttl: float = SESSION_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[str, _CacheEntry]' = OrderedDict()
+        self._tokens_by_user: Dict[int, Set[str]] = {}
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+
+    def _remove(self, token: str):
+        """Drop an entry and its user index; caller must hold the lock"""
+        entry = self._entries.pop(token, None)
+        if entry is None:
+            return
+        tokens = self._tokens_by_user.get(entry.user.id)
+        if tokens:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[entry.user.id]
+
+    def get(self, token: str):
+        """Get the cached user for a token while the entry is fresh and unexpired"""
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self._misses += 1
+                return None
+            if time.monotonic() >= entry.fresh_until or (entry.expires_at is not None and time.time() >= entry.expires_at):
+                self._remove(token)
+                self._expirations += 1
+                self._misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self._hits += 1
+            return entry.user
+
+    def put(self, token: str, user, expires_at: Optional[datetime] = None):
+        """Cache a user for a token until the TTL or the session expiry, whichever is sooner"""
+        if self.max_size <= 0 or self.ttl <= 0:
+            return
+        entry = _CacheEntry(
+            user=user,
+            fresh_until=time.monotonic() + self.ttl,
+            expires_at=expires_at.timestamp() if expires_at else None
+        )
+        with self._lock:
+            self._remove(token)
+            self._entries[token] = entry
+            self._tokens_by_user.setdefault(user.id, set()).add(token)
+            while len(self._entries) > self.max_size:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._evictions += 1
+
+    def invalidate(self, token: str):
+        """Forget a single session token"""
+        with self._lock:
+            if token in self._entries:
+                self._remove(token)
+                self._invalidations += 1
+
+    def invalidate_user(self, user_id: int):
+        """Forget every cached session belonging to a user"""
+        with self._lock:
+            for token in list(self._tokens_by_user.get(user_id, ())):
+                self._remove(token)
+                self._invalidations += 1
+
+    def clear(self):
+        """Drop all cached sessions"""
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_user.clear()
+
+    def stats(self) -> CacheStats:
+        """Snapshot of cache counters"""
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                expirations=self._expirations,
+                invalidations=self._invalidations,
+                size=len(self._entries)
+            )
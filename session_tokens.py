@@ -0,0 +1,224 @@
+import os
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import secrets
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# "database" stores opaque tokens in user_sessions; "signed" issues HMAC-signed tokens verified in memory
+SESSION_TOKEN_MODE = os.environ.get('SESSION_TOKEN_MODE', 'database')
+SESSION_SIGNING_KEY = os.environ.get('SESSION_SIGNING_KEY')
+SESSION_TOKEN_TTL = float(os.environ.get('SESSION_TOKEN_TTL', str(24 * 3600)))
+SESSION_REVOCATION_REFRESH = float(os.environ.get('SESSION_REVOCATION_REFRESH', '10'))
+
+SIGNED_TOKEN_PREFIX = "v1."
+
+# TIMESTAMPTZ so to_timestamp() and EXTRACT(EPOCH ...) round-trip Unix times whatever the session TimeZone is
+REVOCATION_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS revoked_session_tokens (
+        id BIGSERIAL PRIMARY KEY,
+        token_id VARCHAR(32),
+        user_id INTEGER,
+        revoked_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+        expires_at TIMESTAMPTZ NOT NULL
+    );
+
+    -- Tables created with plain TIMESTAMP columns hold session-local times; convert them once
+    DO $$
+    BEGIN
+        IF EXISTS (
+            SELECT 1 FROM information_schema.columns
+            WHERE table_schema = current_schema() AND table_name = 'revoked_session_tokens'
+                AND column_name = 'revoked_at' AND data_type = 'timestamp without time zone'
+        ) THEN
+            ALTER TABLE revoked_session_tokens
+                ALTER COLUMN revoked_at TYPE TIMESTAMPTZ USING revoked_at AT TIME ZONE current_setting('TimeZone'),
+                ALTER COLUMN expires_at TYPE TIMESTAMPTZ USING expires_at AT TIME ZONE current_setting('TimeZone');
+        END IF;
+    END $$;
+    CREATE INDEX IF NOT EXISTS idx_revoked_session_tokens_revoked_at ON revoked_session_tokens (revoked_at, id);
+"""
+
+@dataclass(frozen=True)
+class SessionClaims:
+    token_id: str
+    user_id: int
+    username: str
+    email: str
+    role: str
+    full_name: str
+    department: Optional[str]
+    issued_at: float
+    expires_at: float
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+def is_signed_token(token: str) -> bool:
+    return token.startswith(SIGNED_TOKEN_PREFIX)
+
+class RevocationList:
+    """Revoked token IDs and per-user revocation times, mirrored in memory from the database
+
+    Revocations made by this process apply immediately; those made by other
+    replicas are picked up by an incremental read every refresh_interval seconds.
+    """
+
+    def __init__(self, db, refresh_interval: float = SESSION_REVOCATION_REFRESH):
+        self.db = db
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._tokens: Dict[str, float] = {}
+        self._users: Dict[int, float] = {}
+        self._last_id = 0
+        self._refreshed_at = 0.0
+
+    def create_schema(self):
+        if self.db.use_database:
+            with self.db.get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(REVOCATION_SCHEMA)
+
+    def _record(self, token_id: Optional[str], user_id: Optional[int], revoked_at: float, expires_at: float):
+        if token_id:
+            self._tokens[token_id] = expires_at
+        if user_id is not None:
+            self._users[user_id] = max(self._users.get(user_id, 0.0), revoked_at)
+
+    def revoke(self, token_id: Optional[str] = None, user_id: Optional[int] = None,
+               expires_at: Optional[float] = None):
+        """Revoke one token, or every token issued to a user up to now"""
+        now = time.time()
+        expires_at = expires_at or now + SESSION_TOKEN_TTL
+        with self._lock:
+            self._record(token_id, user_id, now, expires_at)
+        if self.db.use_database:
+            with self.db.get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(
+                        "INSERT INTO revoked_session_tokens (token_id, user_id, revoked_at, expires_at) "
+                        "VALUES (%s, %s, to_timestamp(%s), to_timestamp(%s))",
+                        (token_id, user_id, now, expires_at)
+                    )
+
+    def refresh(self, force: bool = False):
+        """Load revocations added by other processes since the last refresh"""
+        if not self.db.use_database:
+            return
+        if not force and time.monotonic() - self._refreshed_at < self.refresh_interval:
+            return
+        self._refreshed_at = time.monotonic()
+        try:
+            with self.db.get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(
+                        """
+                        SELECT id, token_id, user_id, EXTRACT(EPOCH FROM revoked_at), EXTRACT(EPOCH FROM expires_at)
+                        FROM revoked_session_tokens WHERE id > %s AND expires_at > NOW() ORDER BY id
+                        """,
+                        (self._last_id,)
+                    )
+                    rows = cursor.fetchall()
+        except Exception as e:
+            logger.warning("Could not refresh session revocations: %s", e)
+            return
+        with self._lock:
+            for row_id, token_id, user_id, revoked_at, expires_at in rows:
+                self._record(token_id, user_id, float(revoked_at), float(expires_at))
+                self._last_id = max(self._last_id, row_id)
+
+    def is_revoked(self, claims: SessionClaims) -> bool:
+        self.refresh()
+        with self._lock:
+            if claims.token_id in self._tokens:
+                return True
+            return claims.issued_at <= self._users.get(claims.user_id, 0.0)
+
+    def purge_expired(self) -> int:
+        """Forget revocations of tokens that have expired anyway"""
+        now = time.time()
+        with self._lock:
+            expired = [token_id for token_id, expires_at in self._tokens.items() if expires_at <= now]
+            for token_id in expired:
+                del self._tokens[token_id]
+            # User revocations only matter while tokens issued before them can still be valid
+            stale = [user_id for user_id, revoked_at in self._users.items() if revoked_at + SESSION_TOKEN_TTL <= now]
+            for user_id in stale:
+                del self._users[user_id]
+        if self.db.use_database:
+            with self.db.get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute("DELETE FROM revoked_session_tokens WHERE expires_at < NOW()")
+                    return cursor.rowcount
+        return len(expired)
+
+class SessionTokenSigner:
+    """Issues and verifies HMAC-SHA256 signed session tokens carrying the user's identity and role"""
+
+    def __init__(self, key: bytes, revocations: RevocationList, ttl: float = SESSION_TOKEN_TTL):
+        self._key = key
+        self.revocations = revocations
+        self.ttl = ttl
+
+    def _sign(self, body: str) -> str:
+        return _b64encode(hmac.new(self._key, body.encode("ascii"), hashlib.sha256).digest())
+
+    def issue(self, user) -> str:
+        now = time.time()
+        payload = {
+            "jti": secrets.token_urlsafe(12), "uid": user.id, "usr": user.username, "eml": user.email,
+            "rol": user.role, "nam": user.full_name, "dep": user.department,
+            # Truncated, never rounded up, so a revocation made right after issuing still covers the token
+            "iat": int(now * 1000) / 1000, "exp": int(now + self.ttl),
+        }
+        body = SIGNED_TOKEN_PREFIX + _b64encode(json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+        return f"{body}.{self._sign(body)}"
+
+    def verify(self, token: str) -> Optional[SessionClaims]:
+        """Claims of a valid, unexpired and unrevoked token, or None"""
+        body, _, signature = token.rpartition(".")
+        if not body.startswith(SIGNED_TOKEN_PREFIX) or not hmac.compare_digest(signature, self._sign(body)):
+            return None
+        try:
+            payload = json.loads(_b64decode(body[len(SIGNED_TOKEN_PREFIX):]))
+            claims = SessionClaims(
+                token_id=payload["jti"], user_id=payload["uid"], username=payload["usr"], email=payload["eml"],
+                role=payload["rol"], full_name=payload["nam"], department=payload.get("dep"),
+                issued_at=payload["iat"], expires_at=payload["exp"]
+            )
+        except (ValueError, KeyError, TypeError):
+            return None
+        if claims.expires_at <= time.time() or self.revocations.is_revoked(claims):
+            return None
+        return claims
+
+    def revoke(self, token: str):
+        """Revoke a token this signer issued; tokens that do not verify need no revocation"""
+        claims = self.verify(token)
+        if claims:
+            self.revocations.revoke(token_id=claims.token_id, expires_at=claims.expires_at)
+
+def create_session_signer(db) -> Optional[SessionTokenSigner]:
+    """Signer for SESSION_TOKEN_MODE=signed, or None when sessions are stored in the database"""
+    if SESSION_TOKEN_MODE != "signed":
+        return None
+    if SESSION_SIGNING_KEY:
+        key = SESSION_SIGNING_KEY.encode("utf-8")
+    else:
+        # Tokens then only verify in this process and die with it; replicas need a shared key
+        logger.warning("SESSION_SIGNING_KEY is not set; using a random per-process key")
+        key = secrets.token_bytes(32)
+    revocations = RevocationList(db)
+    revocations.create_schema()
+    revocations.refresh(force=True)
+    return SessionTokenSigner(key, revocations)
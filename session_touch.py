@@ -0,0 +1,110 @@
+import os
+import atexit
+import logging
+import threading
+from datetime import datetime
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+SESSION_TOUCH_FLUSH_INTERVAL = float(os.environ.get('SESSION_TOUCH_FLUSH_INTERVAL', '15'))
+SESSION_TOUCH_FLUSH_SIZE = int(os.environ.get('SESSION_TOUCH_FLUSH_SIZE', '500'))
+SESSION_TOUCH_MAX_STALENESS = float(os.environ.get('SESSION_TOUCH_MAX_STALENESS', '60'))
+
+TOUCH_SESSIONS_QUERY = """
+    UPDATE user_sessions AS s
+    SET last_accessed = GREATEST(s.last_accessed, v.last_accessed)
+    FROM (VALUES %s) AS v(session_token, last_accessed)
+    WHERE s.session_token = v.session_token
+"""
+
+class SessionTouchBuffer:
+    """Write-behind buffer that coalesces last_accessed updates per session token"""
+
+    def __init__(self, db, flush_interval: float = SESSION_TOUCH_FLUSH_INTERVAL,
+                 flush_size: int = SESSION_TOUCH_FLUSH_SIZE, max_staleness: float = SESSION_TOUCH_MAX_STALENESS):
+        self.db = db
+        # max_staleness caps how long a touch may sit in memory, whatever the interval says
+        self.flush_interval = max(0.1, min(flush_interval, max_staleness))
+        self.flush_size = max(1, flush_size)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending: Dict[str, datetime] = {}
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self.touches = 0
+        self.flushes = 0
+        self.rows_flushed = 0
+        self.failed_flushes = 0
+
+    def _start_thread(self):
+        self._thread = threading.Thread(target=self._run, name="session-touch-flusher", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def touch(self, session_token: str):
+        """Record that a session was used; the write happens on the next flush"""
+        if not self.db.use_database:
+            return
+        with self._lock:
+            self._pending[session_token] = datetime.now()
+            self.touches += 1
+            pending = len(self._pending)
+            if self._thread is None:
+                self._start_thread()
+        if pending >= self.flush_size:
+            self._wakeup.set()
+
+    def pending(self) -> int:
+        """Number of sessions waiting to be written"""
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self) -> int:
+        """Write all pending touches as one batched UPDATE"""
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return 0
+                batch, self._pending = self._pending, {}
+            rows = list(batch.items())
+            from psycopg2.extras import execute_values
+            try:
+                with self.db.get_connection() as conn:
+                    with conn.cursor() as cursor:
+                        execute_values(cursor, TOUCH_SESSIONS_QUERY, rows, page_size=len(rows))
+            except Exception as e:
+                logger.warning("Failed to flush %d session touches: %s", len(rows), e)
+                self.failed_flushes += 1
+                self._requeue(batch)
+                return 0
+            self.flushes += 1
+            self.rows_flushed += len(rows)
+            return len(rows)
+
+    def _requeue(self, batch: Dict[str, datetime]):
+        """Put a failed batch back without overwriting newer touches"""
+        with self._lock:
+            for token, touched_at in batch.items():
+                if token not in self._pending:
+                    self._pending[token] = touched_at
+
+    def discard(self, session_token: str):
+        """Drop a pending touch, e.g. when the session is deleted"""
+        with self._lock:
+            self._pending.pop(session_token, None)
+
+    def close(self):
+        """Stop the flusher thread and write anything still pending"""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+        self.flush()
@@ -0,0 +1,135 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from notifications import (
+    EMAIL, BatchInterrupted, Notification, NotificationDispatcher, NotificationOutbox, StubTransport
+)
+
+def make_dispatcher(transport, max_attempts=3, batch_size=10):
+    outbox = NotificationOutbox(db=SimpleNamespace(use_database=False), max_attempts=max_attempts)
+    dispatcher = NotificationDispatcher(outbox, {EMAIL: transport}, rates={EMAIL: 0}, batch_size=batch_size)
+    return outbox, dispatcher
+
+def queue(outbox, *recipients):
+    return [outbox.add(Notification(channel=EMAIL, recipient=recipient, subject="s", body="b")) for recipient in recipients]
+
+def make_due(outbox):
+    for notification in outbox._mock.values():
+        notification.next_attempt_at = datetime.now() - timedelta(seconds=1)
+
+class InterruptingTransport(StubTransport):
+    """Delivers the first `deliver` messages of each batch, then loses the connection on the next one"""
+
+    def __init__(self, deliver):
+        super().__init__()
+        self.deliver = deliver
+
+    def send_batch(self, notifications):
+        results = super().send_batch(notifications[:self.deliver])
+        raise BatchInterrupted("connection lost", results + ["SMTPServerDisconnected: connection lost"])
+
+def test_dispatch_sends_batch_and_marks_sent():
+    transport = StubTransport()
+    outbox, dispatcher = make_dispatcher(transport)
+    queue(outbox, "a@example.com", "b@example.com", "c@example.com")
+
+    assert dispatcher.dispatch_once()
+    assert [n.recipient for n in transport.sent] == ["a@example.com", "b@example.com", "c@example.com"]
+    assert transport.batches == 1
+    assert outbox.counts() == {"sent": 3}
+    assert not dispatcher.dispatch_once()
+
+def test_failed_message_is_retried_then_given_up():
+    transport = StubTransport(fail_recipients=["bad@example.com"])
+    outbox, dispatcher = make_dispatcher(transport, max_attempts=2)
+    good, bad = queue(outbox, "good@example.com", "bad@example.com")
+
+    dispatcher.dispatch_once()
+    stored = outbox._mock[bad.id]
+    assert outbox._mock[good.id].status == "sent"
+    assert (stored.status, stored.attempts, stored.last_error) == ("pending", 1, "stub failure")
+    assert stored.next_attempt_at > datetime.now()
+
+    # Not due yet: nothing is claimed before the backoff expires
+    assert not dispatcher.dispatch_once()
+    make_due(outbox)
+    dispatcher.dispatch_once()
+    assert (stored.status, stored.attempts) == ("failed", 2)
+    assert dispatcher.sent == 1 and dispatcher.failures == 2
+
+def test_interrupted_batch_keeps_sent_and_requeues_the_rest():
+    transport = InterruptingTransport(deliver=2)
+    outbox, dispatcher = make_dispatcher(transport)
+    notifications = queue(outbox, *(f"user{i}@example.com" for i in range(5)))
+
+    dispatcher.dispatch_once()
+    stored = [outbox._mock[n.id] for n in notifications]
+    assert [n.status for n in stored] == ["sent", "sent", "pending", "pending", "pending"]
+    # The message in flight when the connection dropped used its attempt; the others never ran
+    assert [n.attempts for n in stored[2:]] == [1, 0, 0]
+    assert dispatcher.sent == 2 and dispatcher.failures == 1
+
+    # The delivered ones are not sent again on the next batch
+    make_due(outbox)
+    transport.deliver = 10
+    dispatcher.dispatch_once()
+    assert sorted(n.recipient for n in transport.sent) == sorted(f"user{i}@example.com" for i in range(5))
+    assert outbox.counts() == {"sent": 5}
+
+def test_whole_batch_fails_when_transport_raises():
+    class BrokenTransport(StubTransport):
+        def send_batch(self, notifications):
+            raise ConnectionRefusedError("no server")
+
+    outbox, dispatcher = make_dispatcher(BrokenTransport())
+    queue(outbox, "a@example.com", "b@example.com")
+
+    dispatcher.dispatch_once()
+    assert [(n.status, n.attempts) for n in outbox._mock.values()] == [("pending", 1), ("pending", 1)]
+    assert all("ConnectionRefusedError" in n.last_error for n in outbox._mock.values())
+
+def test_purge_finished_keeps_undelivered():
+    outbox, dispatcher = make_dispatcher(StubTransport(fail_recipients=["bad@example.com"]), max_attempts=1)
+    queue(outbox, "old@example.com", "bad@example.com")
+    dispatcher.dispatch_once()
+    pending = queue(outbox, "new@example.com")[0]
+    for notification in outbox._mock.values():
+        notification.created_at -= timedelta(hours=48)
+
+    assert outbox.counts(window_hours=24) == {"pending": 1}
+    assert outbox.purge_finished(older_than_hours=24) == 2
+    assert list(outbox._mock) == [pending.id]
+
+def test_smtp_transport_reports_progress_when_connection_drops(monkeypatch):
+    import smtplib
+    from notifications import SmtpTransport
+
+    class FakeSMTP:
+        def __init__(self, *args, **kwargs):
+            self.sent = 0
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def send_message(self, message):
+            self.sent += 1
+            if message["To"] == "refused@example.com":
+                raise smtplib.SMTPRecipientsRefused({message["To"]: (550, b"no such user")})
+            if self.sent == 3:
+                raise smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+
+    monkeypatch.setattr(smtplib, "SMTP", FakeSMTP)
+    batch = [Notification(channel=EMAIL, recipient=recipient, body="b")
+             for recipient in ("a@example.com", "refused@example.com", "c@example.com", "d@example.com")]
+    with pytest.raises(BatchInterrupted) as interrupted:
+        SmtpTransport("smtp.example.com", starttls=False).send_batch(batch)
+    results = interrupted.value.results
+    assert results[0] is None
+    assert results[1].startswith("recipient refused")
+    assert results[2].startswith("SMTPServerDisconnected")
+    assert len(results) == 3
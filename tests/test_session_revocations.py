@@ -0,0 +1,89 @@
+import os
+import time
+from contextlib import contextmanager
+
+import pytest
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+if not TEST_DATABASE_URL:
+    pytest.skip("set TEST_DATABASE_URL to a scratch PostgreSQL database", allow_module_level=True)
+
+psycopg2 = pytest.importorskip("psycopg2")
+
+from session_tokens import SESSION_TOKEN_TTL, RevocationList, SessionClaims
+
+class PostgresDatabase:
+    """Minimal DatabaseManager stand-in whose connections use the given session TimeZone"""
+
+    use_database = True
+
+    def __init__(self, timezone: str):
+        self.timezone = timezone
+
+    @contextmanager
+    def get_connection(self):
+        conn = psycopg2.connect(TEST_DATABASE_URL, options=f"-c TimeZone={self.timezone}")
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+@pytest.fixture
+def drop_revocations():
+    def drop():
+        with PostgresDatabase("UTC").get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("DROP TABLE IF EXISTS revoked_session_tokens")
+    drop()
+    yield
+    drop()
+
+def claims(user_id: int, token_id: str, issued_at: float) -> SessionClaims:
+    return SessionClaims(token_id, user_id, "user", "user@example.com", "employee", "User", None,
+                         issued_at, issued_at + SESSION_TOKEN_TTL)
+
+@pytest.mark.parametrize("writer_zone, reader_zone", [
+    ("Asia/Kolkata", "America/New_York"),
+    ("America/New_York", "Asia/Kolkata"),
+])
+def test_revocation_round_trips_across_session_time_zones(drop_revocations, writer_zone, reader_zone):
+    writer = RevocationList(PostgresDatabase(writer_zone))
+    writer.create_schema()
+    reader = RevocationList(PostgresDatabase(reader_zone))
+
+    before = time.time()
+    writer.revoke(user_id=7)
+    writer.revoke(token_id="logged-out", user_id=None, expires_at=before + 3600)
+    after = time.time()
+    reader.refresh(force=True)
+
+    # Loaded back as the same Unix times, not shifted by either zone's UTC offset
+    assert before - 1 <= reader._users[7] <= after + 1
+    assert abs(reader._tokens["logged-out"] - (before + 3600)) < 1
+    assert reader.is_revoked(claims(7, "old", before - 60))
+    assert not reader.is_revoked(claims(7, "new", after + 1))
+
+    # Neither zone's purge drops a revocation whose token is still valid
+    assert reader.purge_expired() == 0
+    assert writer.purge_expired() == 0
+    reader.refresh(force=True)
+    assert reader.is_revoked(claims(8, "logged-out", before - 60))
+
+def test_plain_timestamp_table_is_converted(drop_revocations):
+    db = PostgresDatabase("Asia/Kolkata")
+    with db.get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                CREATE TABLE revoked_session_tokens (
+                    id BIGSERIAL PRIMARY KEY, token_id VARCHAR(32), user_id INTEGER,
+                    revoked_at TIMESTAMP NOT NULL DEFAULT NOW(), expires_at TIMESTAMP NOT NULL
+                )
+            """)
+            cursor.execute("INSERT INTO revoked_session_tokens (user_id, expires_at) VALUES (9, NOW() + INTERVAL '1 hour')")
+    now = time.time()
+    RevocationList(db).create_schema()
+
+    reader = RevocationList(PostgresDatabase("UTC"))
+    reader.refresh(force=True)
+    assert abs(reader._users[9] - now) < 5
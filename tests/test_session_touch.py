@@ -0,0 +1,184 @@
+import sqlite3
+import sys
+import time
+import types
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytest
+
+import session_touch
+from session_touch import SessionTouchBuffer
+
+class SqliteCursor:
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+class SqliteConnection:
+    def __init__(self, db):
+        self.db = db
+
+    def cursor(self):
+        return SqliteCursor(self.db)
+
+class SqliteDatabase:
+    """Stand-in for DatabaseManager backed by an in-memory SQLite user_sessions table"""
+
+    use_database = True
+
+    def __init__(self):
+        self.conn = sqlite3.connect(":memory:", check_same_thread=False)
+        self.conn.execute("CREATE TABLE user_sessions (session_token TEXT PRIMARY KEY, last_accessed TEXT)")
+        self.fail = False
+        self.before_connect = None
+        self.batches = []
+
+    def add_session(self, token: str, last_accessed: datetime):
+        self.conn.execute("INSERT INTO user_sessions VALUES (?, ?)", (token, last_accessed.isoformat()))
+
+    def last_accessed(self, token: str) -> datetime:
+        row = self.conn.execute("SELECT last_accessed FROM user_sessions WHERE session_token = ?", (token,)).fetchone()
+        return datetime.fromisoformat(row[0])
+
+    @contextmanager
+    def get_connection(self):
+        if self.before_connect:
+            self.before_connect()
+        if self.fail:
+            raise sqlite3.OperationalError("database is unavailable")
+        yield SqliteConnection(self)
+        self.conn.commit()
+
+def sqlite_execute_values(cursor, query, rows, page_size=100):
+    """The batched touch UPDATE, run against SQLite with MAX() standing in for GREATEST()"""
+    assert "GREATEST(s.last_accessed, v.last_accessed)" in query
+    cursor.db.conn.executemany(
+        "UPDATE user_sessions SET last_accessed = MAX(last_accessed, ?) WHERE session_token = ?",
+        [(touched_at.isoformat(), token) for token, touched_at in rows]
+    )
+    cursor.db.batches.append(dict(rows))
+
+@pytest.fixture(autouse=True)
+def sqlite_backend(monkeypatch):
+    extras = types.ModuleType("psycopg2.extras")
+    extras.execute_values = sqlite_execute_values
+    monkeypatch.setitem(sys.modules, "psycopg2", types.ModuleType("psycopg2"))
+    monkeypatch.setitem(sys.modules, "psycopg2.extras", extras)
+
+@pytest.fixture(autouse=True)
+def clock(monkeypatch):
+    """Strictly increasing datetime.now(), one second per call, so a later touch is always newer"""
+    start = datetime(2025, 1, 1, 9, 0, 0)
+    ticks = iter(range(1, 1_000_000))
+
+    class Clock(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return start + timedelta(seconds=next(ticks))
+
+    monkeypatch.setattr(session_touch, "datetime", Clock)
+    return start
+
+@pytest.fixture
+def db():
+    database = SqliteDatabase()
+    for token in ("a", "b", "c"):
+        database.add_session(token, datetime(2025, 1, 1))
+    return database
+
+def make_buffer(db, **kwargs) -> SessionTouchBuffer:
+    # A long interval keeps the background thread out of the way unless a test wakes it
+    kwargs.setdefault("flush_interval", 60)
+    kwargs.setdefault("max_staleness", 60)
+    return SessionTouchBuffer(db, **kwargs)
+
+def wait_for(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.01)
+
+def test_repeated_touches_coalesce_into_one_row(db, clock):
+    buffer = make_buffer(db)
+    for _ in range(5):
+        buffer.touch("a")
+    buffer.touch("b")
+    assert buffer.touches == 6
+    assert buffer.pending() == 2
+
+    assert buffer.flush() == 2
+    assert len(db.batches) == 1
+    assert db.batches[0] == {"a": clock + timedelta(seconds=5), "b": clock + timedelta(seconds=6)}
+    assert db.last_accessed("a") == clock + timedelta(seconds=5)
+    assert buffer.pending() == 0
+    assert buffer.flush() == 0
+    buffer.close()
+
+def test_flush_never_moves_last_accessed_backwards(db, clock):
+    newer = clock + timedelta(days=1)
+    db.conn.execute("UPDATE user_sessions SET last_accessed = ? WHERE session_token = 'a'", (newer.isoformat(),))
+    buffer = make_buffer(db)
+    buffer.touch("a")
+    buffer.close()
+    assert db.last_accessed("a") == newer
+
+def test_reaching_flush_size_wakes_the_flusher(db):
+    buffer = make_buffer(db, flush_size=3)
+    buffer.touch("a")
+    buffer.touch("b")
+    time.sleep(0.05)
+    assert buffer.rows_flushed == 0
+
+    buffer.touch("c")
+    wait_for(lambda: buffer.rows_flushed == 3)
+    assert buffer.pending() == 0
+    assert buffer.flushes == 1
+    buffer.close()
+
+def test_failed_flush_requeues_without_overwriting_newer_touches(db, clock):
+    buffer = make_buffer(db)
+    buffer.touch("a")
+    buffer.touch("b")
+    first_b = buffer._pending["b"]
+
+    # "a" is touched again while the failing flush is in flight
+    def touch_during_flush():
+        db.before_connect = None
+        buffer.touch("a")
+    db.before_connect = touch_during_flush
+    db.fail = True
+    assert buffer.flush() == 0
+    assert buffer.failed_flushes == 1
+    newest_a = clock + timedelta(seconds=3)
+    assert buffer._pending == {"a": newest_a, "b": first_b}
+
+    db.fail = False
+    assert buffer.flush() == 2
+    assert db.last_accessed("a") == newest_a
+    assert db.last_accessed("b") == first_b
+    buffer.close()
+
+def test_close_flushes_pending_touches(db, clock):
+    buffer = make_buffer(db)
+    buffer.touch("a")
+    buffer.touch("c")
+    thread = buffer._thread
+    assert thread.is_alive()
+
+    buffer.close()
+    assert not thread.is_alive()
+    assert buffer.pending() == 0
+    assert db.last_accessed("a") == clock + timedelta(seconds=1)
+    assert db.last_accessed("c") == clock + timedelta(seconds=2)
+
+def test_demo_mode_touches_are_ignored():
+    buffer = SessionTouchBuffer(types.SimpleNamespace(use_database=False))
+    buffer.touch("a")
+    assert buffer.pending() == 0
+    assert buffer._thread is None
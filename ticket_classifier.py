@@ -0,0 +1,194 @@
+import csv
+import math
+import os
+import re
+import threading
+import zlib
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+TRAINING_DATA_PATH = os.environ.get(
+    'CLASSIFIER_TRAINING_DATA', str(Path(__file__).resolve().parent / 'data' / 'ticket_training.csv')
+)
+CLASSIFIER_FEATURES = int(os.environ.get('CLASSIFIER_FEATURES', str(2 ** 18)))
+CLASSIFIER_CACHE_SIZE = int(os.environ.get('CLASSIFIER_CACHE_SIZE', '5000'))
+CLASSIFIER_BATCH_SIZE = int(os.environ.get('CLASSIFIER_BATCH_SIZE', '256'))
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOP_WORDS = frozenset(
+    "a an and are as at be but by for from has have i in is it its my of on or our the this to was we with".split()
+)
+
+@dataclass(frozen=True)
+class Classification:
+    category: str
+    urgency: str
+    category_confidence: float
+    urgency_confidence: float
+
+def normalize_text(title: str, description: str = "") -> str:
+    """Canonical form used both for features and as the memoization key"""
+    return " ".join(_TOKEN_RE.findall(f"{title} {description}".lower()))
+
+def _stem(token: str) -> str:
+    """Strip a common inflection so "printing" and "printer" share more evidence"""
+    for suffix in ("ing", "ed", "es", "s"):
+        if len(token) > len(suffix) + 2 and token.endswith(suffix):
+            return token[:-len(suffix)]
+    return token
+
+def tokenize(text: str) -> List[str]:
+    """Stemmed content words of normalized text"""
+    return [_stem(token) for token in text.split() if token not in _STOP_WORDS]
+
+def hashed_features(text: str, n_features: int = CLASSIFIER_FEATURES) -> Dict[int, int]:
+    """Unigram, bigram and word-prefix counts hashed into a fixed-size sparse vector"""
+    tokens = tokenize(text)
+    grams = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    # Prefixes let unseen variants ("authentication" / "authenticate") still match
+    grams += [f"p:{token[:5]}" for token in tokens if len(token) > 5]
+    features: Dict[int, int] = defaultdict(int)
+    for gram in grams:
+        # crc32 is stable across processes, unlike the salted built-in hash()
+        features[zlib.crc32(gram.encode('utf-8')) % n_features] += 1
+    return features
+
+class NaiveBayesHead:
+    """Multinomial Naive Bayes over hashed features: a linear model in log space"""
+
+    def __init__(self, alpha: float = 0.5, n_features: int = CLASSIFIER_FEATURES):
+        self.alpha = alpha
+        self.n_features = n_features
+        self.labels: List[str] = []
+        self._log_priors: Dict[str, float] = {}
+        self._weights: Dict[str, Dict[int, float]] = {}
+        self._unseen_weight: Dict[str, float] = {}
+
+    def fit(self, vectors: Sequence[Dict[int, int]], labels: Sequence[str]):
+        counts: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+        totals: Dict[str, int] = defaultdict(int)
+        docs: Dict[str, int] = defaultdict(int)
+        for vector, label in zip(vectors, labels):
+            docs[label] += 1
+            for feature, count in vector.items():
+                counts[label][feature] += count
+                totals[label] += count
+        self.labels = sorted(docs)
+        n_docs = sum(docs.values())
+        for label in self.labels:
+            denominator = totals[label] + self.alpha * self.n_features
+            self._log_priors[label] = math.log(docs[label] / n_docs)
+            self._unseen_weight[label] = math.log(self.alpha / denominator)
+            self._weights[label] = {
+                feature: math.log((count + self.alpha) / denominator)
+                for feature, count in counts[label].items()
+            }
+        return self
+
+    def predict(self, vector: Dict[int, int]) -> Tuple[str, float]:
+        """Most likely label and its softmax confidence"""
+        scores = {}
+        for label in self.labels:
+            weights = self._weights[label]
+            unseen = self._unseen_weight[label]
+            scores[label] = self._log_priors[label] + sum(
+                count * weights.get(feature, unseen) for feature, count in vector.items()
+            )
+        best = max(scores, key=scores.get)
+        top = scores[best]
+        confidence = 1.0 / sum(math.exp(score - top) for score in scores.values())
+        return best, confidence
+
+class TicketClassifier:
+    """Predicts ticket category and urgency from title and description"""
+
+    def __init__(self, n_features: int = CLASSIFIER_FEATURES, cache_size: int = CLASSIFIER_CACHE_SIZE):
+        self.n_features = n_features
+        self.cache_size = cache_size
+        self.category_head = NaiveBayesHead(n_features=n_features)
+        self.urgency_head = NaiveBayesHead(n_features=n_features)
+        self._lock = threading.Lock()
+        self._memo: 'OrderedDict[str, Classification]' = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def fit(self, examples: Iterable[Tuple[str, str, str, str]]):
+        """Train on (title, description, category, urgency) examples"""
+        vectors, categories, urgencies = [], [], []
+        for title, description, category, urgency in examples:
+            vectors.append(hashed_features(normalize_text(title, description), self.n_features))
+            categories.append(category)
+            urgencies.append(urgency)
+        self.category_head.fit(vectors, categories)
+        self.urgency_head.fit(vectors, urgencies)
+        with self._lock:
+            self._memo.clear()
+        return self
+
+    def _predict_normalized(self, text: str) -> Classification:
+        vector = hashed_features(text, self.n_features)
+        category, category_confidence = self.category_head.predict(vector)
+        urgency, urgency_confidence = self.urgency_head.predict(vector)
+        return Classification(category, urgency, category_confidence, urgency_confidence)
+
+    def classify(self, title: str, description: str = "") -> Classification:
+        """Classify a single ticket"""
+        return self.classify_batch([(title, description)])[0]
+
+    def classify_batch(self, tickets: Sequence[Tuple[str, str]]) -> List[Classification]:
+        """Classify many tickets at once, computing each distinct text only once"""
+        texts = [normalize_text(title, description) for title, description in tickets]
+        results: Dict[str, Classification] = {}
+        with self._lock:
+            for text in texts:
+                if text in results:
+                    continue
+                cached = self._memo.get(text)
+                if cached is not None:
+                    self._memo.move_to_end(text)
+                    self.cache_hits += 1
+                    results[text] = cached
+        pending = [text for text in dict.fromkeys(texts) if text not in results]
+        computed = {text: self._predict_normalized(text) for text in pending}
+        results.update(computed)
+        if computed and self.cache_size > 0:
+            with self._lock:
+                self.cache_misses += len(computed)
+                for text, classification in computed.items():
+                    self._memo[text] = classification
+                while len(self._memo) > self.cache_size:
+                    self._memo.popitem(last=False)
+        return [results[text] for text in texts]
+
+    def classify_stream(self, tickets: Iterable[Tuple[str, str]],
+                        batch_size: int = CLASSIFIER_BATCH_SIZE) -> Iterator[Classification]:
+        """Classify an arbitrarily long stream in bounded micro-batches"""
+        batch: List[Tuple[str, str]] = []
+        for ticket in tickets:
+            batch.append(ticket)
+            if len(batch) >= batch_size:
+                yield from self.classify_batch(batch)
+                batch = []
+        if batch:
+            yield from self.classify_batch(batch)
+
+def load_training_examples(path: str = TRAINING_DATA_PATH) -> List[Tuple[str, str, str, str]]:
+    """Read labelled (title, description, category, urgency) rows from a CSV file"""
+    with open(path, newline='', encoding='utf-8') as f:
+        return [
+            (row['title'], row['description'], row['category'], row['urgency'])
+            for row in csv.DictReader(f)
+        ]
+
+_classifier: Optional[TicketClassifier] = None
+_classifier_lock = threading.Lock()
+
+def get_ticket_classifier() -> TicketClassifier:
+    """Get the process-wide classifier, training it on first use"""
+    global _classifier
+    with _classifier_lock:
+        if _classifier is None:
+            _classifier = TicketClassifier().fit(load_training_examples())
+        return _classifier
@@ -0,0 +1,179 @@
+import json
+import logging
+import select
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Tuple
+
+from db_pool import create_trigger_sql
+from ticket_store import TicketChange, get_ticket_repository
+
+logger = logging.getLogger(__name__)
+
+TICKET_EVENTS_CHANNEL = 'ticket_events'
+# Routing rule and permission edits; kept off the ticket feed so they don't refresh dashboards or ticket caches
+CONFIG_EVENTS_CHANNEL = 'config_events'
+
+# One notification per statement, so bulk loads don't flood listeners
+TICKET_EVENTS_SCHEMA = f"""
+    CREATE OR REPLACE FUNCTION ticket_events_notify() RETURNS trigger AS $$
+    BEGIN
+        PERFORM pg_notify('{TICKET_EVENTS_CHANNEL}', json_build_object('action', lower(TG_OP))::text);
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+
+""" + create_trigger_sql(
+    "tickets_events_notify", "tickets", "AFTER INSERT OR UPDATE OR DELETE",
+    "FOR EACH STATEMENT EXECUTE FUNCTION ticket_events_notify()"
+)
+
+@dataclass
+class TicketEvent:
+    action: str
+    ticket_id: Optional[str] = None
+    status: Optional[str] = None
+    origin: str = "local"
+    channel: str = TICKET_EVENTS_CHANNEL
+    version: int = 0
+    received_at: float = field(default_factory=time.time)
+
+    @property
+    def is_ticket_change(self) -> bool:
+        """False for configuration events, which leave ticket data untouched"""
+        return self.channel == TICKET_EVENTS_CHANNEL
+
+class TicketEventBus:
+    """In-process pub/sub for ticket changes with a monotonically increasing version"""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._version = 0
+        self._subscribers: List[Callable[[TicketEvent], None]] = []
+
+    @property
+    def version(self) -> int:
+        """Bumped on every ticket event; readers compare it to decide whether to refresh"""
+        with self._cond:
+            return self._version
+
+    def publish(self, event: TicketEvent):
+        """Deliver an event to every subscriber"""
+        with self._cond:
+            if event.is_ticket_change:
+                self._version += 1
+                self._cond.notify_all()
+            event.version = self._version
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber(event)
+            except Exception:
+                logger.exception("Ticket event subscriber failed")
+
+    def publish_change(self, change: TicketChange):
+        """Translate a repository change into an event"""
+        self.publish(TicketEvent(
+            action=change.action,
+            ticket_id=change.ticket.ticket_id if change.ticket else None,
+            status=change.ticket.status if change.ticket else None
+        ))
+
+    def subscribe(self, callback: Callable[[TicketEvent], None]) -> Callable[[], None]:
+        """Register a callback; returns a function that unsubscribes it"""
+        with self._cond:
+            self._subscribers.append(callback)
+
+        def unsubscribe():
+            with self._cond:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+        return unsubscribe
+
+    def wait_for_change(self, since_version: int, timeout: Optional[float] = None) -> int:
+        """Block until the version moves past since_version or the timeout passes"""
+        with self._cond:
+            self._cond.wait_for(lambda: self._version > since_version, timeout)
+            return self._version
+
+class PostgresChangeListener:
+    """Background LISTEN loop that republishes ticket and configuration notifications on the local bus"""
+
+    def __init__(self, dsn: str, bus: TicketEventBus,
+                 channels: Tuple[str, ...] = (TICKET_EVENTS_CHANNEL, CONFIG_EVENTS_CHANNEL)):
+        self.dsn = dsn
+        self.bus = bus
+        self.channels = channels
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="ticket-change-listener", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+
+    def _run(self):
+        import psycopg2
+        import psycopg2.extensions
+        backoff = 1.0
+        while not self._stopped.is_set():
+            conn = None
+            try:
+                # A dedicated connection: LISTEN state must not leak into the shared pool
+                conn = psycopg2.connect(self.dsn)
+                conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                with conn.cursor() as cursor:
+                    for channel in self.channels:
+                        cursor.execute(f"LISTEN {channel}")
+                # Anything may have changed while we were disconnected
+                self.bus.publish(TicketEvent(action="resync", origin="postgres"))
+                backoff = 1.0
+                while not self._stopped.is_set():
+                    if select.select([conn], [], [], 5.0) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notify = conn.notifies.pop(0)
+                        try:
+                            payload = json.loads(notify.payload)
+                        except ValueError:
+                            payload = {}
+                        self.bus.publish(TicketEvent(
+                            action=payload.get('action', 'changed'),
+                            ticket_id=payload.get('ticket_id'),
+                            status=payload.get('status'),
+                            origin="postgres",
+                            channel=notify.channel
+                        ))
+            except Exception as e:
+                logger.warning("Ticket change listener disconnected: %s", e)
+                self._stopped.wait(backoff)
+                backoff = min(backoff * 2, 60.0)
+            finally:
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+
+_bus: Optional[TicketEventBus] = None
+_bus_lock = threading.Lock()
+
+def get_ticket_event_bus() -> TicketEventBus:
+    """Get the process-wide ticket event bus, fed by LISTEN/NOTIFY or the demo repository"""
+    global _bus
+    with _bus_lock:
+        if _bus is None:
+            bus = TicketEventBus()
+            repository = get_ticket_repository()
+            if repository.db.use_database:
+                repository.db.execute_query(TICKET_EVENTS_SCHEMA)
+                PostgresChangeListener(repository.db.connection_string, bus).start()
+            else:
+                repository.add_listener(bus.publish_change)
+            _bus = bus
+        return _bus
@@ -0,0 +1,311 @@
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Optional, Dict
+
+from db_pool import create_trigger_sql
+from ticket_store import (
+    TicketRepository, TicketChange, get_ticket_repository,
+    TICKET_STATUSES
+)
+
+# Counters are maintained by statement-level triggers, so bulk loads update them once per statement
+TICKET_METRICS_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS ticket_counters (
+        metric VARCHAR(64) PRIMARY KEY,
+        value BIGINT NOT NULL DEFAULT 0
+    );
+
+    CREATE TABLE IF NOT EXISTS ticket_daily_stats (
+        day DATE PRIMARY KEY,
+        resolved INTEGER NOT NULL DEFAULT 0,
+        resolution_seconds DOUBLE PRECISION NOT NULL DEFAULT 0,
+        created INTEGER NOT NULL DEFAULT 0
+    );
+
+    -- Installs from before tickets were counted per creation day get the column and a backfill, once
+    DO $do$
+    BEGIN
+        IF NOT EXISTS (
+            SELECT 1 FROM information_schema.columns
+            WHERE table_schema = current_schema() AND table_name = 'ticket_daily_stats' AND column_name = 'created'
+        ) THEN
+            ALTER TABLE ticket_daily_stats ADD COLUMN created INTEGER NOT NULL DEFAULT 0;
+            INSERT INTO ticket_daily_stats (day, created)
+            SELECT created_at::date, COUNT(*) FROM tickets GROUP BY 1
+            ON CONFLICT (day) DO UPDATE SET created = EXCLUDED.created;
+        END IF;
+    END $do$;
+
+    CREATE TABLE IF NOT EXISTS ticket_metric_snapshots (
+        snapshot_date DATE NOT NULL,
+        metric VARCHAR(64) NOT NULL,
+        value DOUBLE PRECISION NOT NULL,
+        PRIMARY KEY (snapshot_date, metric)
+    );
+
+    CREATE OR REPLACE FUNCTION ticket_stats_on_insert() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO ticket_counters (metric, value)
+        SELECT 'status:' || status, COUNT(*) FROM new_rows GROUP BY status
+        ON CONFLICT (metric) DO UPDATE SET value = ticket_counters.value + EXCLUDED.value;
+
+        INSERT INTO ticket_daily_stats (day, created, resolved, resolution_seconds)
+        SELECT day, SUM(created), SUM(resolved), SUM(seconds) FROM (
+            SELECT created_at::date AS day, 1 AS created, 0 AS resolved, 0::double precision AS seconds FROM new_rows
+            UNION ALL
+            SELECT resolved_at::date, 0, 1, EXTRACT(EPOCH FROM resolved_at - created_at)
+            FROM new_rows WHERE resolved_at IS NOT NULL
+        ) changes GROUP BY day
+        ON CONFLICT (day) DO UPDATE SET
+            created = ticket_daily_stats.created + EXCLUDED.created,
+            resolved = ticket_daily_stats.resolved + EXCLUDED.resolved,
+            resolution_seconds = ticket_daily_stats.resolution_seconds + EXCLUDED.resolution_seconds;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    CREATE OR REPLACE FUNCTION ticket_stats_on_update() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO ticket_counters (metric, value)
+        SELECT 'status:' || status, SUM(delta) FROM (
+            SELECT o.status, -1 AS delta FROM old_rows o JOIN new_rows n ON n.id = o.id WHERE o.status <> n.status
+            UNION ALL
+            SELECT n.status, 1 FROM old_rows o JOIN new_rows n ON n.id = o.id WHERE o.status <> n.status
+        ) changes GROUP BY status
+        ON CONFLICT (metric) DO UPDATE SET value = ticket_counters.value + EXCLUDED.value;
+
+        -- A reopened or re-resolved ticket takes its old resolution out before the new one goes in
+        INSERT INTO ticket_daily_stats (day, resolved, resolution_seconds)
+        SELECT day, SUM(resolved), SUM(seconds) FROM (
+            SELECT o.resolved_at::date AS day, -1 AS resolved, -EXTRACT(EPOCH FROM o.resolved_at - o.created_at) AS seconds
+            FROM old_rows o JOIN new_rows n ON n.id = o.id
+            WHERE o.resolved_at IS NOT NULL AND (n.resolved_at, n.created_at) IS DISTINCT FROM (o.resolved_at, o.created_at)
+            UNION ALL
+            SELECT n.resolved_at::date, 1, EXTRACT(EPOCH FROM n.resolved_at - n.created_at)
+            FROM new_rows n JOIN old_rows o ON o.id = n.id
+            WHERE n.resolved_at IS NOT NULL AND (n.resolved_at, n.created_at) IS DISTINCT FROM (o.resolved_at, o.created_at)
+        ) changes GROUP BY day
+        ON CONFLICT (day) DO UPDATE SET
+            resolved = ticket_daily_stats.resolved + EXCLUDED.resolved,
+            resolution_seconds = ticket_daily_stats.resolution_seconds + EXCLUDED.resolution_seconds;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    CREATE OR REPLACE FUNCTION ticket_stats_on_delete() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO ticket_counters (metric, value)
+        SELECT 'status:' || status, -COUNT(*) FROM old_rows GROUP BY status
+        ON CONFLICT (metric) DO UPDATE SET value = ticket_counters.value + EXCLUDED.value;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+
+""" + create_trigger_sql(
+    "tickets_stats_insert", "tickets", "AFTER INSERT",
+    "REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION ticket_stats_on_insert()"
+) + create_trigger_sql(
+    "tickets_stats_update", "tickets", "AFTER UPDATE",
+    "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION ticket_stats_on_update()"
+) + create_trigger_sql(
+    "tickets_stats_delete", "tickets", "AFTER DELETE",
+    "REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION ticket_stats_on_delete()"
+)
+
+# Full recount, used once when the triggers are first installed on an existing tickets table
+REBUILD_COUNTERS_QUERY = """
+    DELETE FROM ticket_counters;
+    INSERT INTO ticket_counters (metric, value)
+    SELECT 'status:' || status, COUNT(*) FROM tickets GROUP BY status;
+    DELETE FROM ticket_daily_stats;
+    INSERT INTO ticket_daily_stats (day, created, resolved, resolution_seconds)
+    SELECT day, SUM(created), SUM(resolved), SUM(seconds) FROM (
+        SELECT created_at::date AS day, 1 AS created, 0 AS resolved, 0::double precision AS seconds FROM tickets
+        UNION ALL
+        SELECT resolved_at::date, 0, 1, EXTRACT(EPOCH FROM resolved_at - created_at) FROM tickets WHERE resolved_at IS NOT NULL
+    ) days GROUP BY day;
+"""
+
+# Point reads on primary keys only: a handful of counter rows plus two days of stats
+DASHBOARD_QUERY = """
+    SELECT 'counter', metric, value::double precision, NULL::double precision, NULL::integer FROM ticket_counters
+    UNION ALL
+    SELECT 'day:' || day::text, 'resolved', resolved, resolution_seconds, created
+    FROM ticket_daily_stats WHERE day IN (%s, %s)
+    UNION ALL
+    SELECT 'snapshot', metric, value, NULL, NULL FROM ticket_metric_snapshots WHERE snapshot_date = %s
+"""
+
+@dataclass
+class DashboardMetrics:
+    open_tickets: int
+    open_delta: int
+    in_progress: int
+    in_progress_delta: int
+    resolved_today: int
+    resolved_delta: int
+    avg_resolution_hours: Optional[float]
+    avg_resolution_delta: Optional[float]
+    total_tickets: int
+    created_today: int
+    resolved_this_month: int
+
+@dataclass
+class _DayStats:
+    resolved: int = 0
+    resolution_seconds: float = 0.0
+    created: int = 0
+
+    @property
+    def avg_hours(self) -> Optional[float]:
+        return self.resolution_seconds / self.resolved / 3600 if self.resolved else None
+
+class TicketMetrics:
+    """Incrementally maintained ticket counters with daily snapshots for deltas"""
+
+    def __init__(self, repository: TicketRepository):
+        self.repository = repository
+        self.db = repository.db
+        self._lock = threading.Lock()
+        # Demo-mode equivalents of the counter tables
+        self._status_counts: Dict[str, int] = defaultdict(int)
+        self._daily: Dict[date, _DayStats] = defaultdict(_DayStats)
+        self._snapshots: Dict[date, Dict[str, float]] = {}
+        if not self.db.use_database:
+            for ticket in repository.all_mock_tickets():
+                self._apply_created(ticket)
+            repository.add_listener(self._on_change)
+
+    def create_schema(self):
+        """Install the counter tables and triggers, backfilling them on first install"""
+        if not self.db.use_database:
+            return
+        installed = self.db.fetch_one("SELECT to_regclass('ticket_counters') IS NOT NULL")
+        self.db.execute_query(TICKET_METRICS_SCHEMA)
+        if installed and not installed[0]:
+            self.rebuild()
+
+    def rebuild(self):
+        """Recount every counter from the tickets table"""
+        if self.db.use_database:
+            self.db.execute_query(REBUILD_COUNTERS_QUERY)
+
+    def _apply_created(self, ticket):
+        self._status_counts[ticket.status] += 1
+        self._daily[ticket.created_at.date()].created += 1
+        if ticket.resolved_at:
+            self._record_resolution(ticket.created_at, ticket.resolved_at)
+
+    def _record_resolution(self, created_at: datetime, resolved_at: datetime, sign: int = 1):
+        day = self._daily[resolved_at.date()]
+        day.resolved += sign
+        day.resolution_seconds += sign * (resolved_at - created_at).total_seconds()
+
+    def _on_change(self, change: TicketChange):
+        with self._lock:
+            if change.action == "created":
+                self._apply_created(change.ticket)
+            elif change.action == "updated":
+                ticket = change.ticket
+                if change.previous_status != ticket.status:
+                    self._status_counts[change.previous_status] -= 1
+                    self._status_counts[ticket.status] += 1
+                # Mirrors the update trigger: reopening removes the resolution, re-resolving moves it
+                if change.previous_resolved_at != ticket.resolved_at:
+                    if change.previous_resolved_at:
+                        self._record_resolution(ticket.created_at, change.previous_resolved_at, sign=-1)
+                    if ticket.resolved_at:
+                        self._record_resolution(ticket.created_at, ticket.resolved_at)
+
+    def _read(self, today: date):
+        """Current counters, today's and yesterday's stats, and today's snapshot"""
+        yesterday = today - timedelta(days=1)
+        if not self.db.use_database:
+            with self._lock:
+                return (
+                    dict(self._status_counts),
+                    {d: _DayStats(s.resolved, s.resolution_seconds, s.created) for d, s in self._daily.items() if d in (today, yesterday)},
+                    dict(self._snapshots.get(today, {}))
+                )
+        counts: Dict[str, int] = {}
+        daily: Dict[date, _DayStats] = {}
+        snapshot: Dict[str, float] = {}
+        for kind, metric, value, extra, created in self.db.execute_query(DASHBOARD_QUERY, (today, yesterday, today), fetch=True) or []:
+            if kind == 'counter':
+                counts[metric.split(':', 1)[1]] = int(value)
+            elif kind == 'snapshot':
+                snapshot[metric] = value
+            else:
+                daily[date.fromisoformat(kind.split(':', 1)[1])] = _DayStats(int(value), extra or 0.0, int(created or 0))
+        return counts, daily, snapshot
+
+    def _take_snapshot(self, today: date, values: Dict[str, float]):
+        """Store start-of-day values the first time metrics are read each day"""
+        if self.db.use_database:
+            self.db.execute_query(
+                "INSERT INTO ticket_metric_snapshots (snapshot_date, metric, value) "
+                "SELECT %s, metric, value FROM unnest(%s::text[], %s::double precision[]) AS v(metric, value) "
+                "ON CONFLICT DO NOTHING",
+                (today, list(values), list(values.values()))
+            )
+        else:
+            with self._lock:
+                self._snapshots.setdefault(today, dict(values))
+
+    def resolved_this_month(self, today: Optional[date] = None) -> int:
+        """Sum of daily resolved counts since the first of the month"""
+        today = today or date.today()
+        first = today.replace(day=1)
+        if self.db.use_database:
+            result = self.db.fetch_one(
+                "SELECT COALESCE(SUM(resolved), 0) FROM ticket_daily_stats WHERE day >= %s",
+                (first,)
+            )
+            return int(result[0]) if result else 0
+        with self._lock:
+            return sum(s.resolved for d, s in self._daily.items() if d >= first)
+
+    def dashboard(self, today: Optional[date] = None) -> DashboardMetrics:
+        """Dashboard tiles and their deltas, read from the maintained aggregates"""
+        today = today or date.today()
+        counts, daily, snapshot = self._read(today)
+        current = {
+            "open": counts.get("Open", 0),
+            "in_progress": counts.get("In Progress", 0),
+            "total": sum(counts.get(status, 0) for status in TICKET_STATUSES),
+        }
+        if not snapshot:
+            self._take_snapshot(today, current)
+            snapshot = current
+
+        today_stats = daily.get(today, _DayStats())
+        yesterday_stats = daily.get(today - timedelta(days=1), _DayStats())
+        avg_today = today_stats.avg_hours
+        avg_yesterday = yesterday_stats.avg_hours
+        return DashboardMetrics(
+            open_tickets=current["open"],
+            open_delta=current["open"] - int(snapshot.get("open", current["open"])),
+            in_progress=current["in_progress"],
+            in_progress_delta=current["in_progress"] - int(snapshot.get("in_progress", current["in_progress"])),
+            resolved_today=today_stats.resolved,
+            resolved_delta=today_stats.resolved - yesterday_stats.resolved,
+            avg_resolution_hours=avg_today,
+            avg_resolution_delta=avg_today - avg_yesterday if avg_today is not None and avg_yesterday is not None else None,
+            total_tickets=current["total"],
+            created_today=today_stats.created,
+            resolved_this_month=self.resolved_this_month(today)
+        )
+
+_metrics: Optional[TicketMetrics] = None
+_metrics_lock = threading.Lock()
+
+def get_ticket_metrics() -> TicketMetrics:
+    """Get the process-wide ticket metrics, installing the aggregate schema on first use"""
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = TicketMetrics(get_ticket_repository())
+            _metrics.create_schema()
+        return _metrics
@@ -0,0 +1,292 @@
+import os
+import itertools
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from db_pool import create_trigger_sql
+from ticket_events import CONFIG_EVENTS_CHANNEL, TicketEvent, get_ticket_event_bus
+from ticket_store import OPEN_STATUSES, TICKET_CATEGORIES, TICKET_PRIORITIES, TicketChange, get_ticket_repository
+
+logger = logging.getLogger(__name__)
+
+ROUTING_LOAD_REFRESH = float(os.environ.get('ROUTING_LOAD_REFRESH', '10'))
+
+WILDCARD = "*"
+DEFAULT_TEAM = "Service Desk"
+
+# Rule edits are announced on the config feed so every process recompiles
+ROUTING_SCHEMA = f"""
+    CREATE TABLE IF NOT EXISTS routing_rules (
+        id SERIAL PRIMARY KEY,
+        category VARCHAR(64) NOT NULL DEFAULT '{WILDCARD}',
+        urgency VARCHAR(16) NOT NULL DEFAULT '{WILDCARD}',
+        team VARCHAR(100) NOT NULL,
+        agents TEXT[] NOT NULL DEFAULT '{{}}',
+        updated_at TIMESTAMP NOT NULL DEFAULT NOW(),
+        UNIQUE (category, urgency)
+    );
+
+    CREATE OR REPLACE FUNCTION routing_rules_notify() RETURNS trigger AS $$
+    BEGIN
+        PERFORM pg_notify('{CONFIG_EVENTS_CHANNEL}', json_build_object('action', 'routing_rules')::text);
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+
+""" + create_trigger_sql(
+    "routing_rules_notify", "routing_rules", "AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE",
+    "FOR EACH STATEMENT EXECUTE FUNCTION routing_rules_notify()"
+)
+
+OPEN_LOAD_QUERY = """
+    SELECT assigned_to, COUNT(*) FROM tickets
+    WHERE status = ANY(%s) AND assigned_to IS NOT NULL
+    GROUP BY assigned_to
+"""
+
+@dataclass(frozen=True)
+class RoutingRule:
+    category: str
+    urgency: str
+    team: str
+    agents: Tuple[str, ...] = ()
+
+    @property
+    def specificity(self) -> int:
+        return (self.category != WILDCARD) * 2 + (self.urgency != WILDCARD)
+
+@dataclass(frozen=True)
+class RoutingDecision:
+    team: str
+    assignee: Optional[str]
+    rule: Optional[RoutingRule]
+
+DEFAULT_ROUTING_RULES = [
+    RoutingRule("Hardware Issues", "High", "Hardware Specialists", ("Raj Kumar",)),
+    RoutingRule("Software Issues", "Medium", "Software Team", ("Priya Sharma",)),
+    RoutingRule("Network Connectivity", "Critical", "Network Team", ("Raj Kumar",)),
+    RoutingRule("Security & Compliance", "Critical", "Security Team", ("Raj Kumar",)),
+    RoutingRule(WILDCARD, WILDCARD, DEFAULT_TEAM, ("Raj Kumar", "Priya Sharma")),
+]
+
+class CompiledRoutes:
+    """Decision table keyed on (category, urgency)
+
+    Every known category/urgency pair is pre-resolved at compile time, so routing
+    a known ticket is a single dict lookup. Unknown values fall back through
+    (category, *), (*, urgency) and (*, *): at most four lookups, never a scan.
+    """
+
+    def __init__(self, rules: Iterable[RoutingRule],
+                 categories: Sequence[str] = TICKET_CATEGORIES, urgencies: Sequence[str] = TICKET_PRIORITIES):
+        self.rules: Dict[Tuple[str, str], RoutingRule] = {}
+        for rule in rules:
+            # Later rules for the same key win, matching an admin editing a row
+            self.rules[(rule.category, rule.urgency)] = rule
+        self._table: Dict[Tuple[str, str], Optional[RoutingRule]] = {
+            (category, urgency): self._resolve(category, urgency)
+            for category in set(categories) | {rule.category for rule in self.rules.values()}
+            for urgency in set(urgencies) | {rule.urgency for rule in self.rules.values()}
+        }
+
+    def _resolve(self, category: str, urgency: str) -> Optional[RoutingRule]:
+        rules = self.rules
+        return (rules.get((category, urgency)) or rules.get((category, WILDCARD))
+                or rules.get((WILDCARD, urgency)) or rules.get((WILDCARD, WILDCARD)))
+
+    def lookup(self, category: str, urgency: str) -> Optional[RoutingRule]:
+        """Most specific rule for a ticket, or None when nothing matches"""
+        key = (category, urgency)
+        if key in self._table:
+            return self._table[key]
+        return self._resolve(category, urgency)
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+class AgentLoad:
+    """Live open-ticket counts per agent, kept current from ticket changes"""
+
+    def __init__(self, repository, refresh_interval: float = ROUTING_LOAD_REFRESH):
+        self.repository = repository
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._counts: Dict[str, int] = {}
+        self._loaded_at = 0.0
+
+    def _load(self) -> Dict[str, int]:
+        if self.repository.db.use_database:
+            rows = self.repository.db.execute_query(OPEN_LOAD_QUERY, (OPEN_STATUSES,), fetch=True)
+            return {assignee: count for assignee, count in rows or []}
+        counts: Dict[str, int] = {}
+        for ticket in self.repository.all_mock_tickets():
+            if ticket.status in OPEN_STATUSES and ticket.assigned_to:
+                counts[ticket.assigned_to] = counts.get(ticket.assigned_to, 0) + 1
+        return counts
+
+    def refresh(self):
+        """Reload counts from the ticket store"""
+        counts = self._load()
+        with self._lock:
+            self._counts = counts
+            self._loaded_at = time.monotonic()
+
+    def mark_stale(self):
+        """Force a reload on next use, e.g. after a bulk import or a change from another process"""
+        with self._lock:
+            self._loaded_at = 0.0
+
+    def counts(self) -> Dict[str, int]:
+        """Current open tickets per agent"""
+        self._ensure_fresh()
+        with self._lock:
+            return dict(self._counts)
+
+    def _ensure_fresh(self):
+        # Local writes are applied as deltas; the periodic reload picks up everything else
+        if time.monotonic() - self._loaded_at > self.refresh_interval:
+            self.refresh()
+
+    def least_loaded(self, agents: Sequence[str], tiebreak: int = 0) -> str:
+        """Agent with the fewest open tickets, rotating between ties"""
+        self._ensure_fresh()
+        with self._lock:
+            counts = self._counts
+            lowest = min(counts.get(agent, 0) for agent in agents)
+            tied = [agent for agent in agents if counts.get(agent, 0) == lowest]
+        return tied[tiebreak % len(tied)]
+
+    def adjust(self, agent: Optional[str], delta: int):
+        if not agent:
+            return
+        with self._lock:
+            self._counts[agent] = max(0, self._counts.get(agent, 0) + delta)
+
+    def apply_change(self, change: TicketChange):
+        """Update counts from a repository write"""
+        if change.action == "bulk_inserted" or change.ticket is None:
+            self.mark_stale()
+            return
+        ticket = change.ticket
+        if change.action == "updated" and change.previous_status in OPEN_STATUSES:
+            self.adjust(change.previous_assignee, -1)
+        if ticket.status in OPEN_STATUSES:
+            self.adjust(ticket.assigned_to, 1)
+
+class TicketRouter:
+    """Routes tickets to a team and the least-loaded agent using a compiled rule table"""
+
+    def __init__(self, repository=None, load: Optional[AgentLoad] = None):
+        self.repository = repository or get_ticket_repository()
+        self.load = load or AgentLoad(self.repository)
+        self._lock = threading.Lock()
+        self._mock_rules: List[RoutingRule] = list(DEFAULT_ROUTING_RULES)
+        self._routes = CompiledRoutes(self._mock_rules)
+        self._rotation = itertools.count()
+        self.version = 0
+
+    @property
+    def db(self):
+        return self.repository.db
+
+    def create_schema(self):
+        """Create the routing_rules table, seeding it with the default rules when empty"""
+        if not self.db.use_database:
+            return
+        self.db.execute_query(ROUTING_SCHEMA)
+        existing = self.db.fetch_one("SELECT 1 FROM routing_rules LIMIT 1")
+        if not existing:
+            self._write_rules(DEFAULT_ROUTING_RULES)
+
+    def rules(self) -> List[RoutingRule]:
+        """Rules as stored, most specific first"""
+        with self._lock:
+            rules = list(self._routes.rules.values())
+        return sorted(rules, key=lambda rule: (-rule.specificity, rule.category, rule.urgency))
+
+    def _read_rules(self) -> List[RoutingRule]:
+        if self.db.use_database:
+            rows = self.db.execute_query(
+                "SELECT category, urgency, team, agents FROM routing_rules ORDER BY id",
+                fetch=True
+            )
+            # execute_query swallows errors and returns 0; save_rules never stores an empty table
+            if not isinstance(rows, list) or not rows:
+                raise RuntimeError("Could not load routing rules")
+            return [RoutingRule(category, urgency, team, tuple(agents or ())) for category, urgency, team, agents in rows]
+        with self._lock:
+            return list(self._mock_rules)
+
+    def reload(self):
+        """Recompile the decision table from the stored rules"""
+        try:
+            routes = CompiledRoutes(self._read_rules())
+        except Exception as e:
+            # Keep routing with the last good table rather than leaving tickets unassigned
+            logger.warning("Routing rules reload failed: %s", e)
+            return
+        with self._lock:
+            self._routes = routes
+            self.version += 1
+
+    def _write_rules(self, rules: Sequence[RoutingRule]):
+        with self.db.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("DELETE FROM routing_rules")
+                for rule in rules:
+                    cursor.execute(
+                        "INSERT INTO routing_rules (category, urgency, team, agents) VALUES (%s, %s, %s, %s)",
+                        (rule.category, rule.urgency, rule.team, list(rule.agents))
+                    )
+
+    def save_rules(self, rules: Sequence[RoutingRule]) -> bool:
+        """Replace every rule and recompile; other processes reload from the change feed"""
+        if not rules:
+            raise ValueError("At least one routing rule is required")
+        keys = [(rule.category, rule.urgency) for rule in rules]
+        if len(set(keys)) != len(keys):
+            raise ValueError("Each category/urgency combination may only have one rule")
+        if self.db.use_database:
+            try:
+                self._write_rules(rules)
+            except Exception as e:
+                logger.error("Saving routing rules failed: %s", e)
+                return False
+        else:
+            with self._lock:
+                self._mock_rules = list(rules)
+        self.reload()
+        return True
+
+    def route(self, category: str, urgency: str) -> RoutingDecision:
+        """Pick the team and least-loaded agent for a ticket"""
+        rule = self._routes.lookup(category, urgency)
+        if rule is None:
+            return RoutingDecision(team=DEFAULT_TEAM, assignee=None, rule=None)
+        assignee = self.load.least_loaded(rule.agents, next(self._rotation)) if rule.agents else None
+        return RoutingDecision(team=rule.team, assignee=assignee, rule=rule)
+
+    def on_event(self, event: TicketEvent):
+        if event.action in ("routing_rules", "resync"):
+            self.reload()
+        if event.action == "resync":
+            self.load.mark_stale()
+
+_router: Optional[TicketRouter] = None
+_router_lock = threading.Lock()
+
+def get_ticket_router() -> TicketRouter:
+    """Get the process-wide router, compiled from the stored rules and kept in sync with edits"""
+    global _router
+    with _router_lock:
+        if _router is None:
+            router = TicketRouter()
+            router.create_schema()
+            router.reload()
+            router.repository.add_listener(router.load.apply_change)
+            get_ticket_event_bus().subscribe(router.on_event)
+            _router = router
+        return _router
@@ -0,0 +1,638 @@
+import csv
+import io
+import logging
+import threading
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timedelta
+from typing import Optional, List, Dict, Any, Iterable, Iterator, Sequence, TextIO, Tuple, Callable
+
+from auth_utils import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+TICKET_CATEGORIES = [
+    "Hardware Issues", "Software Issues", "Network Connectivity",
+    "Account Access", "Email & Communication", "Printer & Peripherals",
+    "Security & Compliance", "Mobile & Remote Access"
+]
+TICKET_PRIORITIES = ["Low", "Medium", "High", "Critical"]
+TICKET_STATUSES = ["Open", "In Progress", "Resolved", "Closed"]
+OPEN_STATUSES = ["Open", "In Progress"]
+RESOLVED_STATUSES = ["Resolved", "Closed"]
+UNASSIGNED = "Unassigned"
+# Category and urgency of a ticket waiting for the triage job to classify it
+UNCLASSIFIED = "Unclassified"
+
+# Keyset sort keys: SQL expression backed by a (key, id) index, plus the in-memory equivalent
+PRIORITY_RANK = {"Low": 1, "Medium": 2, "High": 3, "Critical": 4}
+STATUS_RANK = {"Open": 1, "In Progress": 2, "Resolved": 3, "Closed": 4}
+TICKET_SORT_KEYS = {
+    "created_at": ("created_at", lambda t: t.created_at),
+    "priority": ("priority_rank", lambda t: PRIORITY_RANK.get(t.priority, 0)),
+    "status": ("status_rank", lambda t: STATUS_RANK.get(t.status, 0)),
+    "assigned_to": ("COALESCE(assigned_to, '')", lambda t: t.assigned_to or ""),
+}
+TICKET_SOURCES = ["Web", "Email", "Chatbot", "Mobile App", "GLPI", "Solman"]
+
+TICKET_SCHEMA = """
+    CREATE SEQUENCE IF NOT EXISTS ticket_number_seq;
+
+    CREATE TABLE IF NOT EXISTS tickets (
+        id BIGSERIAL PRIMARY KEY,
+        ticket_id VARCHAR(32) NOT NULL UNIQUE,
+        title VARCHAR(255) NOT NULL,
+        description TEXT NOT NULL,
+        category VARCHAR(64) NOT NULL,
+        urgency VARCHAR(16) NOT NULL,
+        priority VARCHAR(16) NOT NULL,
+        status VARCHAR(16) NOT NULL DEFAULT 'Open',
+        source VARCHAR(32) NOT NULL DEFAULT 'Web',
+        department VARCHAR(100),
+        requester VARCHAR(255),
+        submitted_by INTEGER,
+        assigned_to VARCHAR(100),
+        created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+        updated_at TIMESTAMP NOT NULL DEFAULT NOW(),
+        resolved_at TIMESTAMP
+    );
+"""
+
+# Columns and indexes added since the table was first created, keyed by name and applied in order.
+# ALTER TABLE and CREATE INDEX lock tickets even when IF NOT EXISTS makes them no-ops, so
+# create_schema only runs the ones the catalog doesn't already list.
+TICKET_MIGRATIONS = {
+    "priority_rank": """
+        ALTER TABLE tickets ADD COLUMN IF NOT EXISTS priority_rank SMALLINT GENERATED ALWAYS AS (
+            CASE priority WHEN 'Critical' THEN 4 WHEN 'High' THEN 3 WHEN 'Medium' THEN 2 WHEN 'Low' THEN 1 ELSE 0 END
+        ) STORED""",
+    "status_rank": """
+        ALTER TABLE tickets ADD COLUMN IF NOT EXISTS status_rank SMALLINT GENERATED ALWAYS AS (
+            CASE status WHEN 'Open' THEN 1 WHEN 'In Progress' THEN 2 WHEN 'Resolved' THEN 3 WHEN 'Closed' THEN 4 ELSE 0 END
+        ) STORED""",
+    # Imported tickets keep the ID they had in their source system, which makes re-imports idempotent
+    "source_id": "ALTER TABLE tickets ADD COLUMN IF NOT EXISTS source_id VARCHAR(255)",
+    "idx_tickets_source_id": "CREATE UNIQUE INDEX IF NOT EXISTS idx_tickets_source_id ON tickets (source, source_id) WHERE source_id IS NOT NULL",
+    # Near-duplicates of an ongoing incident point at the first ticket reported for it
+    "parent_ticket_id": "ALTER TABLE tickets ADD COLUMN IF NOT EXISTS parent_ticket_id VARCHAR(32)",
+    "idx_tickets_parent_ticket_id": "CREATE INDEX IF NOT EXISTS idx_tickets_parent_ticket_id ON tickets (parent_ticket_id) WHERE parent_ticket_id IS NOT NULL",
+    # How a ticket was fixed; resolved tickets with notes feed the knowledge base
+    "resolution": "ALTER TABLE tickets ADD COLUMN IF NOT EXISTS resolution TEXT",
+    "idx_tickets_resolved_at_id": "CREATE INDEX IF NOT EXISTS idx_tickets_resolved_at_id ON tickets (resolved_at, id) WHERE resolution IS NOT NULL",
+    "idx_tickets_status": "CREATE INDEX IF NOT EXISTS idx_tickets_status ON tickets (status)",
+    "idx_tickets_priority": "CREATE INDEX IF NOT EXISTS idx_tickets_priority ON tickets (priority)",
+    "idx_tickets_assigned_to": "CREATE INDEX IF NOT EXISTS idx_tickets_assigned_to ON tickets (assigned_to)",
+    "idx_tickets_submitted_by": "CREATE INDEX IF NOT EXISTS idx_tickets_submitted_by ON tickets (submitted_by)",
+    # Composite (sort key, id) indexes serve keyset pagination in either direction
+    "idx_tickets_created_at_id": "CREATE INDEX IF NOT EXISTS idx_tickets_created_at_id ON tickets (created_at, id)",
+    "idx_tickets_priority_rank_id": "CREATE INDEX IF NOT EXISTS idx_tickets_priority_rank_id ON tickets (priority_rank, id)",
+    "idx_tickets_status_rank_id": "CREATE INDEX IF NOT EXISTS idx_tickets_status_rank_id ON tickets (status_rank, id)",
+    "idx_tickets_assignee_key_id": "CREATE INDEX IF NOT EXISTS idx_tickets_assignee_key_id ON tickets ((COALESCE(assigned_to, '')), id)",
+}
+
+# Superseded by idx_tickets_created_at_id
+OBSOLETE_TICKET_INDEXES = ("idx_tickets_created_at",)
+
+TICKET_CATALOG_QUERY = """
+    SELECT attname FROM pg_attribute WHERE attrelid = 'tickets'::regclass AND attnum > 0 AND NOT attisdropped
+    UNION ALL
+    SELECT indexname FROM pg_indexes WHERE schemaname = current_schema() AND tablename = 'tickets'
+"""
+
+TICKET_COLUMNS = (
+    "id", "ticket_id", "title", "description", "category", "urgency", "priority", "status",
+    "source", "source_id", "department", "requester", "submitted_by", "assigned_to", "parent_ticket_id",
+    "resolution", "created_at", "updated_at", "resolved_at"
+)
+INSERT_COLUMNS = TICKET_COLUMNS[1:]
+
+# Bulk inserts COPY into a per-transaction staging table, then merge, so conflicting rows are skipped
+STAGING_QUERY = f"CREATE TEMP TABLE ticket_staging ON COMMIT DROP AS SELECT {', '.join(INSERT_COLUMNS)} FROM tickets WITH NO DATA"
+COPY_STAGING_QUERY = f"COPY ticket_staging ({', '.join(INSERT_COLUMNS)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')"
+MERGE_STAGING_QUERY = f"""
+    INSERT INTO tickets ({', '.join(INSERT_COLUMNS)})
+    SELECT {', '.join(INSERT_COLUMNS)} FROM ticket_staging
+    ON CONFLICT DO NOTHING
+"""
+EXISTING_SOURCE_IDS_QUERY = """
+    SELECT source, source_id FROM tickets
+    WHERE (source, source_id) IN (SELECT * FROM unnest(%s::varchar[], %s::varchar[]))
+"""
+
+@dataclass
+class Ticket:
+    ticket_id: str
+    title: str
+    description: str
+    category: str
+    urgency: str
+    priority: str
+    status: str = "Open"
+    source: str = "Web"
+    source_id: Optional[str] = None
+    department: Optional[str] = None
+    requester: Optional[str] = None
+    submitted_by: Optional[int] = None
+    assigned_to: Optional[str] = None
+    parent_ticket_id: Optional[str] = None
+    resolution: Optional[str] = None
+    created_at: datetime = field(default_factory=datetime.now)
+    updated_at: datetime = field(default_factory=datetime.now)
+    resolved_at: Optional[datetime] = None
+    id: Optional[int] = None
+
+    def insert_values(self) -> tuple:
+        """Values in INSERT_COLUMNS order"""
+        return tuple(getattr(self, column) for column in INSERT_COLUMNS)
+
+@dataclass
+class TicketChange:
+    action: str  # "created", "updated" or "bulk_inserted"
+    ticket: Optional[Ticket] = None
+    previous_status: Optional[str] = None
+    previous_assignee: Optional[str] = None
+    previous_resolved_at: Optional[datetime] = None
+    count: int = 1
+
+@dataclass
+class TicketPage:
+    tickets: List[Ticket]
+    next_cursor: Optional[Tuple[Any, int]]
+
+    @property
+    def has_more(self) -> bool:
+        return self.next_cursor is not None
+
+def format_ticket_id(number: int, year: Optional[int] = None) -> str:
+    """Format a sequence number as a TK-YYYY-NNN ticket ID"""
+    return f"TK-{year or datetime.now().year}-{number:03d}"
+
+def _copy_field(value: Any) -> str:
+    """Encode one value for COPY ... FORMAT csv; quoted values can never be mistaken for NULL"""
+    if value is None:
+        return "\\N"
+    if isinstance(value, int) and not isinstance(value, bool):
+        return str(value)
+    text = value.isoformat(sep=" ") if isinstance(value, datetime) else str(value)
+    return '"' + text.replace('"', '""') + '"'
+
+def _copy_buffer(tickets: Sequence["Ticket"]) -> io.StringIO:
+    buffer = io.StringIO()
+    for ticket in tickets:
+        buffer.write(",".join(_copy_field(value) for value in ticket.insert_values()))
+        buffer.write("\n")
+    buffer.seek(0)
+    return buffer
+
+def _row_to_ticket(row: Sequence) -> Ticket:
+    values = dict(zip(TICKET_COLUMNS, row))
+    return Ticket(**values)
+
+def _sample_tickets() -> List[Ticket]:
+    """Demo tickets used when no database is configured"""
+    now = datetime.now()
+    samples = [
+        ("TK-2025-001", "Network drive access issue", "Cannot open the shared network drive from my workstation.",
+         "Network Connectivity", "High", "Open", "Raj Kumar", "Operations", timedelta(hours=2)),
+        ("TK-2025-002", "Printer not working", "Floor 2 printer shows offline and jobs are stuck in the queue.",
+         "Printer & Peripherals", "Medium", "In Progress", "Priya Sharma", "Finance", timedelta(hours=5)),
+        ("TK-2025-003", "Password reset", "Locked out of my account after too many attempts.",
+         "Account Access", "Low", "Resolved", "Priya Sharma", "Operations", timedelta(hours=9)),
+        ("TK-2025-004", "Laptop overheating", "Laptop fan is loud and the machine shuts down under load.",
+         "Hardware Issues", "High", "In Progress", "Raj Kumar", "Operations", timedelta(days=1)),
+        ("TK-2025-005", "Email sync issue", "Outlook on my phone stopped syncing new mail.",
+         "Email & Communication", "Low", "Open", None, "Finance", timedelta(days=1, hours=3)),
+    ]
+    tickets = []
+    for index, (ticket_id, title, description, category, urgency, status, assignee, department, age) in enumerate(samples, start=1):
+        created_at = now - age
+        tickets.append(Ticket(
+            id=index, ticket_id=ticket_id, title=title, description=description,
+            category=category, urgency=urgency, priority=urgency, status=status,
+            department=department, assigned_to=assignee,
+            created_at=created_at, updated_at=created_at,
+            resolved_at=now - timedelta(hours=1) if status == "Resolved" else None,
+            resolution="Unlocked the account and sent a password reset link; lockouts clear automatically after 30 minutes."
+            if status == "Resolved" else None
+        ))
+    return tickets
+
+class TicketRepository:
+    """Ticket persistence backed by PostgreSQL, or an in-memory store in demo mode"""
+
+    def __init__(self, db: Optional[DatabaseManager] = None):
+        self.db = db or DatabaseManager()
+        self._lock = threading.Lock()
+        # In-memory store shared by every session in this process when no database is configured
+        self._mock_tickets: Dict[str, Ticket] = {}
+        self._mock_sequence = 0
+        self._mock_source_ids: set = set()
+        self._listeners: List[Callable[[TicketChange], None]] = []
+        if not self.db.use_database:
+            for ticket in _sample_tickets():
+                self._mock_tickets[ticket.ticket_id] = ticket
+            self._mock_sequence = len(self._mock_tickets)
+
+    def add_listener(self, listener: Callable[[TicketChange], None]):
+        """Register a callback invoked after tickets are written by this process"""
+        self._listeners.append(listener)
+
+    def _notify(self, change: TicketChange):
+        for listener in list(self._listeners):
+            try:
+                listener(change)
+            except Exception:
+                logger.exception("Ticket change listener failed")
+
+    def create_schema(self):
+        """Create the tickets table, sequence and indexes if missing"""
+        if not self.db.use_database:
+            return
+        self.db.execute_query(TICKET_SCHEMA)
+        rows = self.db.execute_query(TICKET_CATALOG_QUERY, fetch=True)
+        if not isinstance(rows, list):
+            return
+        existing = {name for (name,) in rows}
+        pending = [ddl for name, ddl in TICKET_MIGRATIONS.items() if name not in existing]
+        pending += [f"DROP INDEX IF EXISTS {name}" for name in OBSOLETE_TICKET_INDEXES if name in existing]
+        if pending:
+            logger.info("Applying %d tickets schema changes", len(pending))
+            self.db.execute_query(";\n".join(pending))
+
+    def next_ticket_ids(self, count: int = 1) -> List[str]:
+        """Reserve ticket IDs from the database sequence"""
+        if count <= 0:
+            return []
+        if self.db.use_database:
+            rows = self.db.execute_query(
+                "SELECT nextval('ticket_number_seq') FROM generate_series(1, %s)",
+                (count,), fetch=True
+            )
+            if not rows:
+                raise RuntimeError("Could not reserve ticket IDs")
+            return [format_ticket_id(row[0]) for row in rows]
+        with self._lock:
+            start = self._mock_sequence + 1
+            self._mock_sequence += count
+        return [format_ticket_id(number) for number in range(start, start + count)]
+
+    def create_ticket(self, title: str, description: str, category: str, urgency: str,
+                      source: str = "Web", department: Optional[str] = None,
+                      requester: Optional[str] = None, submitted_by: Optional[int] = None,
+                      priority: Optional[str] = None, assigned_to: Optional[str] = None,
+                      parent_ticket_id: Optional[str] = None) -> Optional[Ticket]:
+        """Create a ticket with a sequence-assigned TK-YYYY-NNN ID"""
+        try:
+            ticket_id = self.next_ticket_ids(1)[0]
+        except RuntimeError:
+            return None
+        now = datetime.now()
+        ticket = Ticket(
+            ticket_id=ticket_id, title=title, description=description,
+            category=category, urgency=urgency, priority=priority or urgency,
+            source=source, department=department, requester=requester,
+            submitted_by=submitted_by, assigned_to=assigned_to, parent_ticket_id=parent_ticket_id,
+            created_at=now, updated_at=now
+        )
+        if self.db.use_database:
+            query = f"""
+                INSERT INTO tickets ({', '.join(INSERT_COLUMNS)})
+                VALUES ({', '.join(['%s'] * len(INSERT_COLUMNS))})
+                RETURNING id
+            """
+            result = self.db.fetch_one(query, ticket.insert_values())
+            if not result:
+                return None
+            ticket.id = result[0]
+        else:
+            with self._lock:
+                ticket.id = len(self._mock_tickets) + 1
+                self._mock_tickets[ticket.ticket_id] = ticket
+        self._notify(TicketChange(action="created", ticket=ticket))
+        return ticket
+
+    def update_ticket(self, ticket_id: str, status: Optional[str] = None,
+                      assigned_to: Optional[str] = None, resolution: Optional[str] = None,
+                      category: Optional[str] = None, urgency: Optional[str] = None,
+                      priority: Optional[str] = None, parent_ticket_id: Optional[str] = None) -> Optional[Ticket]:
+        """Change a ticket's status, assignee, resolution notes or triage fields, stamping resolved_at on resolution"""
+        if self.db.use_database:
+            query = f"""
+                UPDATE tickets AS t SET
+                    status = COALESCE(%s, t.status),
+                    assigned_to = COALESCE(%s, t.assigned_to),
+                    resolution = COALESCE(%s, t.resolution),
+                    category = COALESCE(%s, t.category),
+                    urgency = COALESCE(%s, t.urgency),
+                    priority = COALESCE(%s, t.priority),
+                    parent_ticket_id = COALESCE(%s, t.parent_ticket_id),
+                    updated_at = NOW(),
+                    resolved_at = CASE
+                        WHEN COALESCE(%s, t.status) = ANY(%s) THEN COALESCE(t.resolved_at, NOW())
+                        ELSE NULL
+                    END
+                FROM (SELECT id, status, assigned_to, resolved_at FROM tickets WHERE ticket_id = %s FOR UPDATE) AS previous
+                WHERE t.id = previous.id
+                RETURNING {', '.join('t.' + column for column in TICKET_COLUMNS)},
+                    previous.status, previous.assigned_to, previous.resolved_at
+            """
+            row = self.db.fetch_one(query, (
+                status, assigned_to, resolution, category, urgency, priority, parent_ticket_id,
+                status, RESOLVED_STATUSES, ticket_id
+            ))
+            if not row:
+                return None
+            ticket = _row_to_ticket(row[:len(TICKET_COLUMNS)])
+            previous_status, previous_assignee, previous_resolved_at = row[len(TICKET_COLUMNS):]
+        else:
+            with self._lock:
+                previous = self._mock_tickets.get(ticket_id)
+                if previous is None:
+                    return None
+                now = datetime.now()
+                new_status = status or previous.status
+                ticket = replace(
+                    previous,
+                    status=new_status,
+                    assigned_to=assigned_to or previous.assigned_to,
+                    resolution=resolution or previous.resolution,
+                    category=category or previous.category,
+                    urgency=urgency or previous.urgency,
+                    priority=priority or previous.priority,
+                    parent_ticket_id=parent_ticket_id or previous.parent_ticket_id,
+                    updated_at=now,
+                    resolved_at=(previous.resolved_at or now) if new_status in RESOLVED_STATUSES else None
+                )
+                self._mock_tickets[ticket_id] = ticket
+            previous_status, previous_assignee, previous_resolved_at = previous.status, previous.assigned_to, previous.resolved_at
+        self._notify(TicketChange(
+            action="updated", ticket=ticket, previous_status=previous_status,
+            previous_assignee=previous_assignee, previous_resolved_at=previous_resolved_at
+        ))
+        return ticket
+
+    def bulk_insert(self, tickets: Iterable[Ticket], batch_size: int = 1000) -> int:
+        """Insert many tickets in batches, assigning IDs to those without one and skipping duplicates"""
+        inserted = 0
+        batch: List[Ticket] = []
+        for ticket in tickets:
+            batch.append(ticket)
+            if len(batch) >= batch_size:
+                inserted += self._insert_batch(batch)
+                batch = []
+        if batch:
+            inserted += self._insert_batch(batch)
+        return inserted
+
+    def filter_new_tickets(self, batch: List[Ticket]) -> List[Ticket]:
+        """Skip tickets whose (source, source_id) repeats within the batch or is already stored"""
+        seen = set()
+        unique = []
+        for ticket in batch:
+            if ticket.source_id is not None:
+                key = (ticket.source, ticket.source_id)
+                if key in seen:
+                    continue
+                seen.add(key)
+            unique.append(ticket)
+        if not seen:
+            return unique
+        if self.db.use_database:
+            # Checked up front so duplicates don't consume ticket numbers; ON CONFLICT still covers races
+            sources, source_ids = zip(*seen)
+            rows = self.db.execute_query(EXISTING_SOURCE_IDS_QUERY, (list(sources), list(source_ids)), fetch=True)
+            existing = {tuple(row) for row in rows or []}
+        else:
+            with self._lock:
+                existing = seen & self._mock_source_ids
+        return [ticket for ticket in unique if ticket.source_id is None or (ticket.source, ticket.source_id) not in existing]
+
+    def _insert_batch(self, batch: List[Ticket]) -> int:
+        batch = self.filter_new_tickets(batch)
+        if not batch:
+            return 0
+        missing = [ticket for ticket in batch if not ticket.ticket_id]
+        for ticket, ticket_id in zip(missing, self.next_ticket_ids(len(missing))):
+            ticket.ticket_id = ticket_id
+        if self.db.use_database:
+            with self.db.get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(STAGING_QUERY)
+                    cursor.copy_expert(COPY_STAGING_QUERY, _copy_buffer(batch))
+                    cursor.execute(MERGE_STAGING_QUERY)
+                    inserted = cursor.rowcount
+            if inserted:
+                self._notify(TicketChange(action="bulk_inserted", count=inserted))
+            return inserted
+        inserted_tickets = []
+        with self._lock:
+            for ticket in batch:
+                key = (ticket.source, ticket.source_id)
+                if ticket.ticket_id in self._mock_tickets or key in self._mock_source_ids:
+                    continue
+                ticket.id = len(self._mock_tickets) + 1
+                self._mock_tickets[ticket.ticket_id] = ticket
+                if ticket.source_id is not None:
+                    self._mock_source_ids.add(key)
+                inserted_tickets.append(ticket)
+        for ticket in inserted_tickets:
+            self._notify(TicketChange(action="created", ticket=ticket))
+        return len(inserted_tickets)
+
+    def all_mock_tickets(self) -> List[Ticket]:
+        """Snapshot of the in-memory demo store"""
+        with self._lock:
+            return list(self._mock_tickets.values())
+
+    def get_ticket(self, ticket_id: str) -> Optional[Ticket]:
+        """Get a ticket by its TK-YYYY-NNN ID"""
+        if self.db.use_database:
+            row = self.db.fetch_one(
+                f"SELECT {', '.join(TICKET_COLUMNS)} FROM tickets WHERE ticket_id = %s",
+                (ticket_id,)
+            )
+            return _row_to_ticket(row) if row else None
+        with self._lock:
+            return self._mock_tickets.get(ticket_id)
+
+    @staticmethod
+    def _build_filters(status: Optional[Sequence[str]] = None, priority: Optional[Sequence[str]] = None,
+                       assigned_to: Optional[str] = None, submitted_by: Optional[int] = None,
+                       created_after: Optional[datetime] = None,
+                       created_before: Optional[datetime] = None) -> Tuple[List[str], list]:
+        """Build parameterised WHERE clauses from optional filters"""
+        clauses = []
+        params: List[Any] = []
+        if status:
+            clauses.append("status = ANY(%s)")
+            params.append(list(status))
+        if priority:
+            clauses.append("priority = ANY(%s)")
+            params.append(list(priority))
+        if assigned_to == UNASSIGNED:
+            clauses.append("assigned_to IS NULL")
+        elif assigned_to:
+            clauses.append("assigned_to = %s")
+            params.append(assigned_to)
+        if submitted_by is not None:
+            clauses.append("submitted_by = %s")
+            params.append(submitted_by)
+        if created_after is not None:
+            clauses.append("created_at >= %s")
+            params.append(created_after)
+        if created_before is not None:
+            clauses.append("created_at < %s")
+            params.append(created_before)
+        return clauses, params
+
+    @staticmethod
+    def _where(clauses: List[str]) -> str:
+        return f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+    def _mock_filter(self, status=None, priority=None, assigned_to=None, submitted_by=None,
+                     created_after=None, created_before=None) -> List[Ticket]:
+        with self._lock:
+            tickets = list(self._mock_tickets.values())
+        return [
+            ticket for ticket in tickets
+            if (not status or ticket.status in status)
+            and (not priority or ticket.priority in priority)
+            and (not assigned_to or ticket.assigned_to == (None if assigned_to == UNASSIGNED else assigned_to))
+            and (submitted_by is None or ticket.submitted_by == submitted_by)
+            and (created_after is None or ticket.created_at >= created_after)
+            and (created_before is None or ticket.created_at < created_before)
+        ]
+
+    def list_tickets(self, status: Optional[Sequence[str]] = None, priority: Optional[Sequence[str]] = None,
+                     assigned_to: Optional[str] = None, submitted_by: Optional[int] = None,
+                     created_after: Optional[datetime] = None, limit: int = 50, offset: int = 0) -> List[Ticket]:
+        """List tickets newest first with optional filters and pagination"""
+        filters = dict(status=status, priority=priority, assigned_to=assigned_to,
+                       submitted_by=submitted_by, created_after=created_after)
+        if self.db.use_database:
+            clauses, params = self._build_filters(**filters)
+            query = f"""
+                SELECT {', '.join(TICKET_COLUMNS)} FROM tickets
+                {self._where(clauses)}
+                ORDER BY created_at DESC, id DESC
+                LIMIT %s OFFSET %s
+            """
+            rows = self.db.execute_query(query, tuple(params + [limit, offset]), fetch=True)
+            return [_row_to_ticket(row) for row in rows or []]
+        tickets = sorted(self._mock_filter(**filters), key=lambda t: (t.created_at, t.id or 0), reverse=True)
+        return tickets[offset:offset + limit]
+
+    def list_tickets_page(self, sort_by: str = "created_at", descending: bool = True,
+                          cursor: Optional[Tuple[Any, int]] = None, limit: int = 25,
+                          status: Optional[Sequence[str]] = None, priority: Optional[Sequence[str]] = None,
+                          assigned_to: Optional[str] = None, created_after: Optional[datetime] = None,
+                          created_before: Optional[datetime] = None) -> TicketPage:
+        """Fetch one keyset-paginated page; pass the returned next_cursor to get the following page"""
+        if sort_by not in TICKET_SORT_KEYS:
+            raise ValueError(f"Unsupported sort key: {sort_by}")
+        sort_sql, sort_value = TICKET_SORT_KEYS[sort_by]
+        filters = dict(status=status, priority=priority, assigned_to=assigned_to,
+                       created_after=created_after, created_before=created_before)
+
+        if self.db.use_database:
+            clauses, params = self._build_filters(**filters)
+            if cursor is not None:
+                clauses.append(f"({sort_sql}, id) {'<' if descending else '>'} (%s, %s)")
+                params.extend(cursor)
+            direction = "DESC" if descending else "ASC"
+            query = f"""
+                SELECT {', '.join(TICKET_COLUMNS)} FROM tickets
+                {self._where(clauses)}
+                ORDER BY {sort_sql} {direction}, id {direction}
+                LIMIT %s
+            """
+            rows = self.db.execute_query(query, tuple(params + [limit + 1]), fetch=True) or []
+            tickets = [_row_to_ticket(row) for row in rows]
+        else:
+            def key(ticket: Ticket):
+                return (sort_value(ticket), ticket.id or 0)
+            tickets = sorted(self._mock_filter(**filters), key=key, reverse=descending)
+            if cursor is not None:
+                tickets = [t for t in tickets if (key(t) < tuple(cursor) if descending else key(t) > tuple(cursor))]
+            tickets = tickets[:limit + 1]
+
+        # The extra row only tells us whether another page exists
+        has_more = len(tickets) > limit
+        tickets = tickets[:limit]
+        next_cursor = (sort_value(tickets[-1]), tickets[-1].id) if has_more else None
+        return TicketPage(tickets=tickets, next_cursor=next_cursor)
+
+    def list_resolved(self, after: Optional[Tuple[datetime, int]] = None, limit: int = 1000) -> List[Ticket]:
+        """Resolved tickets with resolution notes in (resolved_at, id) order, starting after a cursor"""
+        if self.db.use_database:
+            clauses = ["resolution IS NOT NULL", "resolved_at IS NOT NULL"]
+            params: List[Any] = []
+            if after is not None:
+                clauses.append("(resolved_at, id) > (%s, %s)")
+                params.extend(after)
+            query = f"""
+                SELECT {', '.join(TICKET_COLUMNS)} FROM tickets
+                {self._where(clauses)}
+                ORDER BY resolved_at, id
+                LIMIT %s
+            """
+            rows = self.db.execute_query(query, tuple(params + [limit]), fetch=True)
+            return [_row_to_ticket(row) for row in rows or []]
+        with self._lock:
+            tickets = [t for t in self._mock_tickets.values() if t.resolution and t.resolved_at]
+        tickets.sort(key=lambda t: (t.resolved_at, t.id or 0))
+        if after is not None:
+            tickets = [t for t in tickets if (t.resolved_at, t.id or 0) > tuple(after)]
+        return tickets[:limit]
+
+    def iter_tickets(self, status: Optional[Sequence[str]] = None, priority: Optional[Sequence[str]] = None,
+                     assigned_to: Optional[str] = None, submitted_by: Optional[int] = None,
+                     created_after: Optional[datetime] = None,
+                     created_before: Optional[datetime] = None) -> Iterator[Ticket]:
+        """Every matching ticket, oldest first, streamed through a server-side cursor"""
+        filters = dict(status=status, priority=priority, assigned_to=assigned_to, submitted_by=submitted_by,
+                       created_after=created_after, created_before=created_before)
+        if self.db.use_database:
+            clauses, params = self._build_filters(**filters)
+            query = f"""
+                SELECT {', '.join(TICKET_COLUMNS)} FROM tickets
+                {self._where(clauses)}
+                ORDER BY created_at, id
+            """
+            for row in self.db.iter_query(query, tuple(params)):
+                yield _row_to_ticket(row)
+            return
+        yield from sorted(self._mock_filter(**filters), key=lambda t: (t.created_at, t.id or 0))
+
+    def export_csv(self, out: TextIO, **filters) -> int:
+        """Write matching tickets to out as CSV with a header row, returning the number written"""
+        writer = csv.writer(out)
+        writer.writerow(TICKET_COLUMNS)
+        count = 0
+        for ticket in self.iter_tickets(**filters):
+            writer.writerow([getattr(ticket, column) for column in TICKET_COLUMNS])
+            count += 1
+        return count
+
+    def count_tickets(self, status: Optional[Sequence[str]] = None, priority: Optional[Sequence[str]] = None,
+                      assigned_to: Optional[str] = None, submitted_by: Optional[int] = None,
+                      created_after: Optional[datetime] = None) -> int:
+        """Count tickets matching the filters"""
+        filters = dict(status=status, priority=priority, assigned_to=assigned_to,
+                       submitted_by=submitted_by, created_after=created_after)
+        if self.db.use_database:
+            clauses, params = self._build_filters(**filters)
+            result = self.db.fetch_one(f"SELECT COUNT(*) FROM tickets {self._where(clauses)}", tuple(params))
+            return result[0] if result else 0
+        return len(self._mock_filter(**filters))
+
+_repository: Optional[TicketRepository] = None
+_repository_lock = threading.Lock()
+
+def get_ticket_repository() -> TicketRepository:
+    """Get the process-wide ticket repository, creating the schema on first use"""
+    global _repository
+    with _repository_lock:
+        if _repository is None:
+            _repository = TicketRepository()
+            _repository.create_schema()
+        return _repository
@@ -0,0 +1,326 @@
+from datetime import datetime
+
+import streamlit as st
+import pandas as pd
+from auth_ui import show_role_indicator
+from auth_utils import get_current_user, get_auth_manager
+from permissions import Permission, NO_PERMISSIONS, compile_permissions, get_permission_registry
+from ticket_metrics import get_ticket_metrics
+from ticket_routing import get_ticket_router, RoutingRule, WILDCARD
+from notifications import get_notifier
+from job_queue import get_job_queue
+from instrumentation import INSTRUMENTATION_ENABLED, INSTRUMENTATION_METRICS_PORT, get_instrumentation
+from query_stats import get_query_stats
+from ticket_store import TICKET_CATEGORIES, TICKET_PRIORITIES
+from views.common import cached_read, get_dashboard_cache
+
+def show_user_management():
+    """User accounts overview"""
+    st.markdown("### 👥 User Management")
+    # Mock user data
+    users_df = pd.DataFrame({
+        "Username": ["admin", "it_support1", "it_support2", "employee1", "employee2"],
+        "Full Name": ["System Admin", "Raj Kumar", "Priya Sharma", "John Doe", "Sarah Wilson"],
+        "Role": ["Admin", "IT Support", "IT Support", "Employee", "Employee"],
+        "Department": ["IT", "IT Support", "IT Support", "Operations", "Finance"],
+        "Status": ["Active", "Active", "Active", "Active", "Active"]
+    })
+    st.dataframe(users_df, use_container_width=True)
+
+def show_category_settings():
+    """Ticket category settings"""
+    st.markdown("### 📁 Ticket Categories")
+    categories_df = pd.DataFrame({
+        "Category": ["Hardware Issues", "Software Issues", "Network Connectivity", "Account Access"],
+        "Priority Weight": [2, 3, 1, 4],
+        "Est. Resolution (min)": [240, 120, 60, 30],
+        "Active": ["✅", "✅", "✅", "✅"]
+    })
+    st.dataframe(categories_df, use_container_width=True)
+
+def show_routing_rules():
+    """Routing rule editor and per-agent load"""
+    st.markdown("### 🔄 Routing Rules")
+    st.caption(f"Most specific rule wins: exact match, then category with {WILDCARD} urgency, "
+               f"then {WILDCARD} category with urgency, then {WILDCARD}/{WILDCARD}. "
+               "Tickets go to the listed agent with the fewest open tickets.")
+    router = get_ticket_router()
+    agents = cached_read("users", "support_agents", get_auth_manager().list_support_agents)
+    rules_df = pd.DataFrame([
+        {"Category": rule.category, "Urgency": rule.urgency, "Assigned Team": rule.team, "Agents": ", ".join(rule.agents)}
+        for rule in router.rules()
+    ], columns=["Category", "Urgency", "Assigned Team", "Agents"])
+    edited_rules = st.data_editor(
+        rules_df,
+        num_rows="dynamic",
+        use_container_width=True,
+        key=f"routing_rules_{router.version}",
+        column_config={
+            "Category": st.column_config.SelectboxColumn(options=[WILDCARD] + TICKET_CATEGORIES, required=True),
+            "Urgency": st.column_config.SelectboxColumn(options=[WILDCARD] + TICKET_PRIORITIES, required=True),
+            "Assigned Team": st.column_config.TextColumn(required=True),
+            "Agents": st.column_config.TextColumn(help="Comma-separated: " + ", ".join(agents))
+        }
+    )
+    if st.button("💾 Save Routing Rules"):
+        rules = [
+            RoutingRule(
+                category=row["Category"], urgency=row["Urgency"], team=row["Assigned Team"],
+                agents=tuple(agent.strip() for agent in (row["Agents"] or "").split(",") if agent.strip())
+            )
+            for row in edited_rules.to_dict("records")
+            if row["Category"] and row["Urgency"] and row["Assigned Team"]
+        ]
+        unknown = sorted({agent for rule in rules for agent in rule.agents} - set(agents))
+        if unknown:
+            st.error("Unknown agents: " + ", ".join(unknown))
+        else:
+            try:
+                saved = router.save_rules(rules)
+            except ValueError as e:
+                st.error(str(e))
+            else:
+                if saved:
+                    st.success(f"Saved {len(rules)} routing rules")
+                    st.rerun()
+                else:
+                    st.error("Could not save routing rules")
+    
+    st.markdown("#### 📥 Open Tickets per Agent")
+    load = router.load.counts()
+    st.dataframe(pd.DataFrame({
+        "Agent": agents,
+        "Open Tickets": [load.get(agent, 0) for agent in agents]
+    }), use_container_width=True)
+
+def show_system_stats():
+    """Database, cache, job queue and notification statistics"""
+    st.markdown("### 📊 System Statistics")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Total Users", "146", "+8")
+        st.metric("Active Sessions", "23", "+3")
+    with col2:
+        ticket_metrics = cached_read("tickets", "dashboard_metrics", get_ticket_metrics().dashboard)
+        st.metric("Total Tickets", f"{ticket_metrics.total_tickets:,}", f"{ticket_metrics.created_today:+,d} today")
+        st.metric("Resolved This Month", f"{ticket_metrics.resolved_this_month:,}", f"{ticket_metrics.resolved_today:+,d} today")
+    with col3:
+        st.metric("System Uptime", "99.9%", "0%")
+        st.metric("Response Time", "0.8s", "-0.1s")
+    
+    auth_manager = get_auth_manager()
+    pool_stats = auth_manager.db.pool_stats()
+    if pool_stats:
+        st.markdown("#### 🗄️ Database Connection Pool")
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Connections In Use", f"{pool_stats.in_use}/{pool_stats.max_size}")
+        with col2:
+            st.metric("Idle Connections", pool_stats.idle)
+        with col3:
+            st.metric("Checkout Waits", pool_stats.waits)
+        with col4:
+            avg_wait = pool_stats.wait_time / pool_stats.waits if pool_stats.waits else 0.0
+            st.metric("Avg Wait", f"{avg_wait * 1000:.1f} ms")
+        
+        cache_stats = auth_manager.session_cache.stats()
+        st.markdown("#### 🔑 Session Cache")
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Hit Ratio", f"{cache_stats.hit_ratio:.1%}")
+        with col2:
+            st.metric("Hits", cache_stats.hits)
+        with col3:
+            st.metric("Misses", cache_stats.misses)
+        with col4:
+            st.metric("Cached Sessions", cache_stats.size)
+        
+        if st.button("🧹 Purge Expired Sessions"):
+            report = auth_manager.cleanup_expired_sessions()
+            if report.skipped:
+                st.info("A cleanup is already running in another process.")
+            else:
+                st.success(f"Purged {report.rows_purged:,} expired sessions in {report.batches} batches "
+                           f"({report.seconds:.2f}s)" + ("" if report.complete else "; more remain for the next run"))
+    
+    query_cache_stats = get_dashboard_cache().stats()
+    st.markdown("#### ⚡ Shared Query Cache")
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Hit Ratio", f"{query_cache_stats.hit_ratio:.1%}")
+    with col2:
+        st.metric("Coalesced Loads", query_cache_stats.coalesced)
+    with col3:
+        st.metric("Invalidations", query_cache_stats.invalidations)
+    with col4:
+        st.metric("Cached Queries", query_cache_stats.size)
+    
+    hasher_stats = auth_manager.hasher.stats()
+    st.markdown("#### 🔐 Password Hashing Pool")
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Active / Workers", f"{hasher_stats.active}/{hasher_stats.workers}")
+    with col2:
+        st.metric("Queued (Peak)", f"{hasher_stats.queued} ({hasher_stats.max_queued})")
+    with col3:
+        st.metric("Avg Hash Time", f"{hasher_stats.avg_time * 1000:.0f} ms")
+    with col4:
+        st.metric("Rejected", hasher_stats.rejected, f"{hasher_stats.timed_out} timed out", delta_color="off")
+    
+    queue_stats = get_job_queue().stats()
+    st.markdown("#### 🧵 Background Jobs")
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Queue Depth", queue_stats.pending, f"{queue_stats.running} running", delta_color="off")
+    with col2:
+        st.metric("Oldest Waiting", f"{queue_stats.oldest_pending_seconds:.0f} s")
+    with col3:
+        st.metric("Done / Failed (1h)", f"{queue_stats.done_last_hour}/{queue_stats.failed_last_hour}")
+    with col4:
+        st.metric("Latency p50 / p95", "-" if queue_stats.p50_latency is None
+                  else f"{queue_stats.p50_latency:.1f} / {queue_stats.p95_latency:.1f} s")
+    
+    outbox_stats = get_notifier().stats()
+    st.markdown("#### 📨 Notification Outbox")
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Pending", outbox_stats.pending)
+    with col2:
+        st.metric("Sent", outbox_stats.sent)
+    with col3:
+        st.metric("Failed", outbox_stats.failed)
+    with col4:
+        st.metric("Retries / Batches", f"{outbox_stats.retries}/{outbox_stats.batches}")
+
+def show_role_permissions():
+    """Editor for the permissions granted to each role"""
+    current_user = get_current_user()
+    st.markdown("### 🔐 Roles & Permissions")
+    st.caption("Changes apply to every signed-in user on their next page load.")
+    registry = get_permission_registry()
+    flags = list(Permission)
+    roles_df = pd.DataFrame([
+        {"Role": role, **{flag.name: bool(mask & flag) for flag in flags}}
+        for role, mask in sorted(registry.roles().items())
+    ], columns=["Role"] + [flag.name for flag in flags])
+    edited_roles = st.data_editor(
+        roles_df,
+        num_rows="dynamic",
+        use_container_width=True,
+        key=f"role_permissions_{registry.version}",
+        column_config={
+            "Role": st.column_config.TextColumn(required=True),
+            **{flag.name: st.column_config.CheckboxColumn(flag.name.replace("_", " ").title(), default=False) for flag in flags}
+        }
+    )
+    if st.button("💾 Save Permissions"):
+        masks = {
+            row["Role"].strip(): compile_permissions(flag.name for flag in flags if row.get(flag.name))
+            for row in edited_roles.to_dict("records")
+            if row["Role"] and row["Role"].strip()
+        }
+        if not masks.get(current_user.role, NO_PERMISSIONS) & Permission.MANAGE_PERMISSIONS:
+            st.error(f"The {current_user.role} role must keep MANAGE_PERMISSIONS, or you would lock yourself out")
+        else:
+            try:
+                saved = registry.save(masks)
+            except ValueError as e:
+                st.error(str(e))
+            else:
+                if saved:
+                    st.success(f"Saved permissions for {len(masks)} roles")
+                    st.rerun()
+                else:
+                    st.error("Could not save role permissions")
+
+def show_performance():
+    """Slowest instrumented spans and database statements in this process"""
+    st.markdown("### ⏱️ Performance")
+    if INSTRUMENTATION_ENABLED:
+        show_span_timings()
+    else:
+        st.info("Span timing is off. Set INSTRUMENTATION_ENABLED=1 to time page renders, database calls and password hashing.")
+    show_statement_stats()
+
+def show_span_timings():
+    instrumentation = get_instrumentation()
+    st.caption("Timings since this server process started or was last reset"
+               + (f"; Prometheus metrics are served on port {INSTRUMENTATION_METRICS_PORT} at /metrics."
+                  if INSTRUMENTATION_METRICS_PORT else "."))
+    
+    st.markdown("#### 📈 Spans by p95")
+    st.dataframe(pd.DataFrame([
+        {"Span": stats.name, "Count": stats.count, "p50 (ms)": stats.p50 * 1000, "p95 (ms)": stats.p95 * 1000,
+         "Mean (ms)": stats.mean * 1000, "Max (ms)": stats.max * 1000, "Total (s)": stats.total}
+        for stats in instrumentation.stats()
+    ], columns=["Span", "Count", "p50 (ms)", "p95 (ms)", "Mean (ms)", "Max (ms)", "Total (s)"]), use_container_width=True)
+    
+    st.markdown("#### 🐢 Slowest Spans")
+    st.dataframe(pd.DataFrame([
+        {"Span": slow.name, "Duration (ms)": slow.seconds * 1000, "Finished": datetime.fromtimestamp(slow.finished_at)}
+        for slow in instrumentation.slowest()
+    ], columns=["Span", "Duration (ms)", "Finished"]), use_container_width=True)
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.download_button("⬇️ Prometheus Metrics", instrumentation.prometheus_text(), file_name="aitix_metrics.prom",
+                           mime="text/plain", use_container_width=True)
+    with col2:
+        if st.button("🔄 Reset Timings", use_container_width=True):
+            instrumentation.reset()
+            st.rerun()
+
+def show_statement_stats():
+    query_stats = get_query_stats()
+    st.markdown("#### 🗄️ Database Statements")
+    if not get_auth_manager().db.use_database:
+        st.info("Statement stats are collected once DATABASE_URL is set.")
+        return
+    st.caption(f"Since {datetime.fromtimestamp(query_stats.since):%Y-%m-%d %H:%M}, by total time. "
+               f"Statements slower than {query_stats.slow_threshold * 1000:.0f} ms are logged below.")
+    st.dataframe(pd.DataFrame([
+        {"Statement": stats.sql, "Calls": stats.calls, "Errors": stats.errors, "Total (s)": stats.total_time,
+         "Mean (ms)": stats.mean_time * 1000, "Max (ms)": stats.max_time * 1000, "Rows": stats.rows, "Slow": stats.slow_calls}
+        for stats in query_stats.statements()
+    ], columns=["Statement", "Calls", "Errors", "Total (s)", "Mean (ms)", "Max (ms)", "Rows", "Slow"]), use_container_width=True)
+    
+    st.markdown("#### 🐌 Slow Query Log")
+    st.dataframe(pd.DataFrame([
+        {"At": datetime.fromtimestamp(entry.at), "Duration (ms)": entry.seconds * 1000, "Statement": entry.sql,
+         "Parameters": entry.params, "Rows": entry.rows, "Failed": entry.failed}
+        for entry in query_stats.slow_queries()
+    ], columns=["At", "Duration (ms)", "Statement", "Parameters", "Rows", "Failed"]), use_container_width=True)
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.download_button("⬇️ Statements CSV", query_stats.to_csv(), file_name="aitix_statements.csv",
+                           mime="text/csv", use_container_width=True)
+    with col2:
+        st.download_button("⬇️ Full Export JSON", query_stats.to_json(), file_name="aitix_query_stats.json",
+                           mime="application/json", use_container_width=True)
+    with col3:
+        if st.button("🔄 Reset Statement Stats", use_container_width=True):
+            query_stats.reset()
+            st.rerun()
+
+ADMIN_TABS = [
+    ("👥 Users", Permission.MANAGE_USERS, show_user_management),
+    ("📁 Categories", Permission.MANAGE_CATEGORIES, show_category_settings),
+    ("🔄 Routing Rules", Permission.MANAGE_ROUTING, show_routing_rules),
+    ("🔐 Roles", Permission.MANAGE_PERMISSIONS, show_role_permissions),
+    ("📊 System Stats", Permission.VIEW_SYSTEM_STATS, show_system_stats),
+    ("⏱️ Performance", Permission.VIEW_SYSTEM_STATS, show_performance),
+]
+
+def show_admin_panel():
+    """Show admin panel for system management"""
+    current_user = get_current_user()
+    show_role_indicator()
+    
+    st.markdown('<div class="section-header">⚙️ Admin Panel</div>', unsafe_allow_html=True)
+    
+    permissions = get_permission_registry()
+    tabs = [(label, render) for label, permission, render in ADMIN_TABS if permissions.allows(current_user, permission)]
+    for tab, (label, render) in zip(st.tabs([label for label, _ in tabs]), tabs):
+        with tab:
+            render()
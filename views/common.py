@@ -0,0 +1,53 @@
+from datetime import datetime
+
+import streamlit as st
+import pandas as pd
+from auth_utils import get_current_user
+from instrumentation import timed
+from query_cache import QueryCache
+from ticket_events import get_ticket_event_bus
+from ticket_store import get_ticket_repository
+
+def format_age(timestamp: datetime) -> str:
+    """Format a timestamp as a short relative age such as '2 hours ago'"""
+    seconds = max(0, int((datetime.now() - timestamp).total_seconds()))
+    if seconds < 60:
+        return "just now"
+    for unit, size in (("day", 86400), ("hour", 3600), ("minute", 60)):
+        if seconds >= size:
+            count = seconds // size
+            return f"{count} {unit}{'s' if count != 1 else ''} ago"
+
+@timed("render.tickets_dataframe")
+def tickets_to_dataframe(tickets, columns: dict) -> pd.DataFrame:
+    """Build a display DataFrame from tickets using {label: attribute} columns"""
+    rows = []
+    for ticket in tickets:
+        row = {}
+        for label, attribute in columns.items():
+            if attribute == "age":
+                row[label] = format_age(ticket.created_at)
+            else:
+                row[label] = getattr(ticket, attribute)
+                if attribute == "assigned_to" and not row[label]:
+                    row[label] = "Unassigned"
+        rows.append(row)
+    return pd.DataFrame(rows, columns=list(columns))
+
+@st.cache_resource
+def get_dashboard_cache() -> QueryCache:
+    """Process-wide cache for dashboard and panel reads, invalidated by ticket writes"""
+    cache = QueryCache()
+    # Local writes invalidate synchronously; the change feed covers writes from other processes
+    get_ticket_repository().add_listener(lambda change: cache.invalidate("tickets"))
+
+    def on_event(event):
+        # Routing and permission edits don't touch ticket rows
+        if event.is_ticket_change:
+            cache.invalidate("tickets")
+    get_ticket_event_bus().subscribe(on_event)
+    return cache
+
+def cached_read(namespace: str, name: str, loader, *args):
+    """Read through the shared cache, keyed by query name, the viewer's role and arguments"""
+    return get_dashboard_cache().get_or_load(namespace, (name, get_current_user().role) + args, loader)
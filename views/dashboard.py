@@ -0,0 +1,57 @@
+import os
+
+import streamlit as st
+from auth_ui import show_role_indicator
+from ticket_events import get_ticket_event_bus
+from ticket_metrics import get_ticket_metrics
+from ticket_store import get_ticket_repository
+from views.common import cached_read, tickets_to_dataframe
+
+DASHBOARD_REFRESH_SECONDS = float(os.environ.get('DASHBOARD_REFRESH_SECONDS', '5'))
+
+def show_dashboard():
+    """Show real-time dashboard with current ticket metrics"""
+    show_role_indicator()
+    
+    st.markdown('<div class="section-header">📊 Real-Time Dashboard</div>', unsafe_allow_html=True)
+    
+    show_live_ticket_panel()
+
+@st.fragment(run_every=DASHBOARD_REFRESH_SECONDS)
+def show_live_ticket_panel():
+    """Metrics and recent tickets, redrawn alone each tick and reloaded only when a ticket change has arrived"""
+    # An idle tick is a version compare and a redraw of this fragment from session state, with no reads
+    version = get_ticket_event_bus().version
+    if st.session_state.get("dashboard_version") != version or "dashboard_data" not in st.session_state:
+        metrics = cached_read("tickets", "dashboard_metrics", get_ticket_metrics().dashboard)
+        recent_tickets = cached_read("tickets", "recent_tickets", lambda: get_ticket_repository().list_tickets(limit=10))
+        st.session_state["dashboard_data"] = (metrics, tickets_to_dataframe(recent_tickets, {
+            "Ticket ID": "ticket_id",
+            "Title": "title",
+            "Status": "status",
+            "Priority": "priority",
+            "Assigned To": "assigned_to"
+        }))
+        st.session_state["dashboard_version"] = version
+    metrics, recent_tickets_df = st.session_state["dashboard_data"]
+    
+    # Quick stats from the incrementally maintained aggregates
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric("Open Tickets", metrics.open_tickets, f"{metrics.open_delta:+d}", delta_color="inverse")
+    with col2:
+        st.metric("In Progress", metrics.in_progress, f"{metrics.in_progress_delta:+d}", delta_color="off")
+    with col3:
+        st.metric("Resolved Today", metrics.resolved_today, f"{metrics.resolved_delta:+d}")
+    with col4:
+        st.metric(
+            "Avg Resolution",
+            f"{metrics.avg_resolution_hours:.1f} hrs" if metrics.avg_resolution_hours is not None else "—",
+            f"{metrics.avg_resolution_delta:+.1f} hrs" if metrics.avg_resolution_delta is not None else None,
+            delta_color="inverse"
+        )
+    
+    # Recent tickets table
+    st.markdown("### 🎫 Recent Tickets")
+    st.dataframe(recent_tickets_df, use_container_width=True)
@@ -0,0 +1,249 @@
+from typing import Dict
+
+import streamlit as st
+import plotly.graph_objects as go
+from instrumentation import span
+from views.static_content import compact_html
+
+WORKFLOW_STEPS = [
+    {"step": 1, "title": "User Input", "description": "Employee raises ticket via Chatbot, Email, GLPI, or Solman.", "icon": "📝"},
+    {"step": 2, "title": "Unified Ingestion", "description": "AITix captures the ticket from any source into a unified record.", "icon": "📥"},
+    {"step": 3, "title": "Automated Classification", "description": "NLP engine categorizes the issue and urgency.", "icon": "🏷️"},
+    {"step": 4, "title": "Self-Service Check", "description": "If common, chatbot auto-resolves; else moves forward.", "icon": "🤖"},
+    {"step": 5, "title": "Intelligent Routing", "description": "AI assigns to the most suitable support team.", "icon": "🎯"},
+    {"step": 6, "title": "Resolution & Knowledge Update", "description": "Team resolves issue, solution logged in knowledge base.", "icon": "✅"},
+    {"step": 7, "title": "Notification & Feedback", "description": "Employee notified and feedback collected for retraining AI.", "icon": "📨"}
+]
+
+CHALLENGES = [
+    {"challenge": "Integration with Legacy Systems", "solution": "API connectors + phased integration", "icon": "🔗"},
+    {"challenge": "AI Model Accuracy", "solution": "Human-in-loop correction & retraining", "icon": "🎯"},
+    {"challenge": "Data Security & Privacy", "solution": "Private cloud/on-premise, RBAC, encryption", "icon": "🔒"},
+    {"challenge": "User Adoption", "solution": "Intuitive UI, workshops, documentation", "icon": "👥"}
+]
+
+KPI_DATA = {
+    "Metric": ["Avg. Ticket Resolution Time (hrs)", "First Contact Resolution Rate (%)", "% Tickets Solved by Automation", "Employee Satisfaction (CSAT %)"],
+    "Before": [80, 45, 0, 60],
+    "After": [30, 75, 40, 90]
+}
+
+KPI_METRICS = [
+    {"title": "Resolution Time", "before": "80hrs", "after": "30hrs", "improvement": "63%"},
+    {"title": "First Contact Resolution", "before": "45%", "after": "75%", "improvement": "67%"},
+    {"title": "Automation Rate", "before": "0%", "after": "40%", "improvement": "New"},
+    {"title": "Employee Satisfaction", "before": "60%", "after": "90%", "improvement": "50%"}
+]
+
+def _list_card(items) -> str:
+    entries = "\n".join(f'<li style="color: #1F2937;">{item}</li>' for item in items)
+    return f"""
+    <div class="card">
+        <ul style="color: #1F2937;">
+            {entries}
+        </ul>
+    </div>
+    """
+
+def _tech_card(title: str, stack: str) -> str:
+    return f"""
+    <div class="tech-category">
+        <h4 style="color: #1F2937;">{title}</h4>
+        <p style="color: #1F2937;">{stack}</p>
+    </div>
+    """
+
+def _challenge_card(challenge: dict) -> str:
+    return f"""
+    <div class="card">
+        <h4 style="color: #1F2937;">{challenge['icon']} {challenge['challenge']}</h4>
+        <p style="color: #1F2937;"><strong style="color: #1F2937;">Solution:</strong> {challenge['solution']}</p>
+    </div>
+    """
+
+def _section_header(title: str) -> str:
+    return f'<div class="section-header">{title}</div>'
+
+def build_overview_html() -> Dict[str, str]:
+    """Every HTML block of the overview page, keyed by where it is placed"""
+    sections = {
+        "hero": """
+        <div class="hero-section">
+            <div class="hero-title">💡 AITix: Smart Helpdesk Ticketing Solution</div>
+            <div class="hero-subtitle">AI-powered, centralized ticketing for POWERGRID to boost employee satisfaction and streamline IT support.</div>
+            <div class="hero-details">
+                <strong>Organization:</strong> POWERGRID |
+                <strong>Theme:</strong> Enterprise Software / AI & ML |
+                <strong>Team:</strong> 404 Sanity Not Found
+            </div>
+        </div>
+        """,
+        "architecture_header": _section_header("🏗️ System Architecture"),
+        "input_channels": _list_card(["🤖 Chatbot", "📧 Email", "🖥️ GLPI System", "⚙️ Solman System", "📱 Mobile App"]),
+        "core_system": _list_card([
+            "🔄 Unified Ingestion Layer", "🧠 NLP Processing Engine", "🎯 Intelligent Routing AI",
+            "🤖 Self-Service & Resolution Bot", "📚 Knowledge Base Hub", "🚨 Alerting Module (Email & SMS)"
+        ]),
+        "stakeholders": _list_card(["🛠️ IT Support Teams", "👨‍💼 Employees", "📖 Knowledge Base"]),
+        "workflow_header": _section_header("🔄 Workflow Process"),
+        # The steps stack vertically, so they go out as one block instead of one per step
+        "workflow": "".join(f"""
+        <div class="workflow-step">
+            <strong style="color: #1F2937;">{step['icon']} Step {step['step']}: {step['title']}</strong><br>
+            <span style="color: #1F2937;">{step['description']}</span>
+        </div>
+        """ for step in WORKFLOW_STEPS),
+        "tech_header": _section_header("💻 Technology Stack"),
+        "frontend": _tech_card("🎨 Frontend", "React.js • Tailwind CSS • React Native"),
+        "backend": _tech_card("🧠 Backend & AI", "Python (Flask/Django) • Hugging Face Transformers • spaCy • Node.js • Socket.IO"),
+        "database": _tech_card("🗄️ Database", "PostgreSQL • Elasticsearch"),
+        "infrastructure": _tech_card("☁️ Infrastructure", "Docker • Kubernetes • AWS / Azure"),
+        "integrations": _tech_card("🔗 Integrations & Alerts", "SendGrid • Twilio API"),
+        "challenges_header": _section_header("🎯 Challenges & Solutions"),
+        "challenges_left": "".join(_challenge_card(challenge) for challenge in CHALLENGES[0::2]),
+        "challenges_right": "".join(_challenge_card(challenge) for challenge in CHALLENGES[1::2]),
+        "impact_header": _section_header("🎯 Impact & Benefits"),
+        "impact_employees": _list_card(["✨ Improved Experience", "⚡ Faster Resolutions", "👁️ Transparency"]),
+        "impact_it": _list_card(["📈 Efficiency", "📉 Reduced Workload", "💡 Insights"]),
+        "impact_powergrid": _list_card(["🚀 Higher Productivity", "💰 Cost Savings", "🎛️ Central Governance"]),
+        "kpi_header": _section_header("📊 Key Performance Indicators"),
+        "footer": """
+        <div class="footer">
+            <h3>🚀 InnovateAI Solutions</h3>
+            <p><strong>Project:</strong> AITix for POWERGRID | <strong>Year:</strong> 2025</p>
+            <p>Transforming IT Support with Intelligent Automation</p>
+        </div>
+        """,
+    }
+    for i, metric in enumerate(KPI_METRICS):
+        sections[f"kpi_{i}"] = f"""
+        <div class="card" style="text-align: center;">
+            <h4 style="color: #1F2937;">{metric['title']}</h4>
+            <p style="color: #DC2626;">Before: {metric['before']}</p>
+            <p style="color: #22C55E;">After: {metric['after']}</p>
+            <p style="color: #1E3A8A; font-weight: bold;">↗️ +{metric['improvement']} improvement</p>
+        </div>
+        """
+    return sections
+
+def build_kpi_figure() -> go.Figure:
+    """Before/after comparison chart of the headline KPIs"""
+    fig = go.Figure()
+
+    fig.add_trace(go.Bar(
+        name='Before AITix',
+        x=KPI_DATA['Metric'],
+        y=KPI_DATA['Before'],
+        marker_color='#DC2626',
+        text=KPI_DATA['Before'],
+        textposition='auto',
+    ))
+
+    fig.add_trace(go.Bar(
+        name='After AITix',
+        x=KPI_DATA['Metric'],
+        y=KPI_DATA['After'],
+        marker_color='#22C55E',
+        text=KPI_DATA['After'],
+        textposition='auto',
+    ))
+
+    fig.update_layout(
+        title='AITix Impact: Before vs After Implementation',
+        xaxis_title='Metrics',
+        yaxis_title='Values',
+        barmode='group',
+        height=500,
+        font=dict(size=12),
+        showlegend=True,
+        legend=dict(x=0.7, y=1),
+        plot_bgcolor='white',
+        paper_bgcolor='white'
+    )
+    return fig
+
+# The page is fully static: build it once per process and share it across sessions.
+# Cached objects are shared, so callers must not mutate them.
+@st.cache_resource
+def get_overview_html() -> Dict[str, str]:
+    return {name: compact_html(markup) for name, markup in build_overview_html().items()}
+
+@st.cache_resource
+def get_kpi_figure() -> go.Figure:
+    return build_kpi_figure()
+
+def show_system_overview():
+    """Display the original AITix system overview presentation"""
+    html = get_overview_html()
+
+    def block(name: str):
+        st.markdown(html[name], unsafe_allow_html=True)
+
+    # Hero Section
+    block("hero")
+
+    # System Architecture Section
+    block("architecture_header")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.markdown("### 📥 Input Channels")
+        block("input_channels")
+    with col2:
+        st.markdown("### ⚡ Core AITix System")
+        block("core_system")
+    with col3:
+        st.markdown("### 👥 Stakeholders & Outputs")
+        block("stakeholders")
+
+    # Workflow Section
+    block("workflow_header")
+    block("workflow")
+
+    # Technology Stack Section
+    block("tech_header")
+    tech_col1, tech_col2, tech_col3 = st.columns(3)
+    with tech_col1:
+        block("frontend")
+    with tech_col2:
+        block("backend")
+    with tech_col3:
+        block("database")
+    tech_col4, tech_col5 = st.columns(2)
+    with tech_col4:
+        block("infrastructure")
+    with tech_col5:
+        block("integrations")
+
+    # Challenges & Solutions Section
+    block("challenges_header")
+    challenge_col1, challenge_col2 = st.columns(2)
+    with challenge_col1:
+        block("challenges_left")
+    with challenge_col2:
+        block("challenges_right")
+
+    # Impact Benefits Section
+    block("impact_header")
+    impact_col1, impact_col2, impact_col3 = st.columns(3)
+    with impact_col1:
+        st.markdown("### 👨‍💼 For Employees")
+        block("impact_employees")
+    with impact_col2:
+        st.markdown("### 🛠️ For IT Teams")
+        block("impact_it")
+    with impact_col3:
+        st.markdown("### 🏢 For POWERGRID")
+        block("impact_powergrid")
+
+    # KPI Metrics Section
+    block("kpi_header")
+    with span("render.plotly_chart"):
+        st.plotly_chart(get_kpi_figure(), use_container_width=True)
+
+    # Individual KPI Cards
+    for i, col in enumerate(st.columns(len(KPI_METRICS))):
+        with col:
+            block(f"kpi_{i}")
+
+    # Footer Section
+    block("footer")
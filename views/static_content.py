@@ -0,0 +1,23 @@
+import re
+from pathlib import Path
+
+import streamlit as st
+
+STATIC_DIR = Path(__file__).resolve().parent.parent / "static"
+
+def compact_html(markup: str) -> str:
+    """Drop the source indentation and blank lines from an HTML fragment"""
+    return "\n".join(line.strip() for line in markup.splitlines() if line.strip())
+
+def minify_css(css: str) -> str:
+    """Strip comments and insignificant whitespace from a stylesheet"""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    return re.sub(r":\s+", ":", css).replace(";}", "}").strip()
+
+@st.cache_resource
+def stylesheet(name: str) -> str:
+    """A stylesheet from static/ as a minified <style> block, read once per process"""
+    return f"<style>{minify_css((STATIC_DIR / name).read_text(encoding='utf-8'))}</style>"
+
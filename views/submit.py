@@ -0,0 +1,70 @@
+import streamlit as st
+from auth_ui import show_role_indicator
+from auth_utils import get_current_user
+from duplicate_detection import get_duplicate_index
+from knowledge_base import get_knowledge_base
+from ticket_store import get_ticket_repository, TICKET_CATEGORIES, TICKET_PRIORITIES, UNCLASSIFIED
+from worker import enqueue_triage
+
+AUTO_DETECT = "🤖 Auto-detect"
+
+def show_submit_ticket():
+    """Show ticket submission form for employees"""
+    current_user = get_current_user()
+    show_role_indicator()
+    
+    st.markdown('<div class="section-header">🎫 Submit New Ticket</div>', unsafe_allow_html=True)
+    
+    # Outside the form so suggestions update as soon as the title is entered
+    title = st.text_input("Issue Title*", placeholder="Brief description of your issue")
+    if title:
+        suggestions = get_knowledge_base().suggest(title)
+        if suggestions:
+            st.markdown("#### 💡 These might fix it right away")
+            for match in suggestions:
+                document = match.document
+                label = f"📘 {document.title}" if document.kind == "article" else f"✅ {document.title} (solved in {document.doc_id})"
+                with st.expander(label):
+                    st.write(document.fix)
+    
+    with st.form("ticket_form"):
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            category = st.selectbox("Category", [AUTO_DETECT] + TICKET_CATEGORIES)
+            urgency = st.selectbox("Urgency Level", [AUTO_DETECT] + TICKET_PRIORITIES)
+        
+        with col2:
+            source = st.selectbox("How are you submitting this?", ["Web", "Email", "Chatbot", "Mobile App"])
+            department = st.text_input("Your Department", value=current_user.department or "")
+        
+        description = st.text_area("Detailed Description*", placeholder="Please provide as much detail as possible about the issue...")
+        
+        submitted = st.form_submit_button("🚀 Submit Ticket", use_container_width=True)
+        
+        if submitted:
+            if title and description:
+                # Classification, routing and incident linking run in the background triage job
+                ticket = get_ticket_repository().create_ticket(
+                    title=title, description=description,
+                    category=UNCLASSIFIED if category == AUTO_DETECT else category,
+                    urgency=UNCLASSIFIED if urgency == AUTO_DETECT else urgency,
+                    source=source, department=department or None,
+                    requester=current_user.full_name, submitted_by=current_user.id
+                )
+                if ticket:
+                    enqueue_triage(ticket, current_user.email)
+                    st.success("✅ Ticket submitted successfully! You will receive a confirmation email shortly.")
+                    st.info("Your ticket ID is: " + ticket.ticket_id)
+                    # The new ticket is already indexed and matches itself best, so look one further
+                    matches = [match for match in get_duplicate_index().find(title, description, limit=3, open_only=True)
+                               if ticket.ticket_id not in (match.ticket_id, match.incident_id)]
+                    if matches:
+                        st.warning(f"🔁 This looks like ongoing incident **{matches[0].incident_id}**: "
+                                   f"{matches[0].title}. Your ticket will be linked to it.")
+                    else:
+                        st.info("🎯 Your ticket is being categorised and routed to the right team.")
+                else:
+                    st.error("Could not save your ticket. Please try again.")
+            else:
+                st.error("Please fill in all required fields marked with *")
@@ -0,0 +1,141 @@
+from datetime import datetime, time
+
+import streamlit as st
+from auth_ui import show_role_indicator
+from auth_utils import get_current_user, get_auth_manager
+from permissions import Permission, get_permission_registry
+from ticket_store import get_ticket_repository, TICKET_PRIORITIES, TICKET_STATUSES, OPEN_STATUSES, UNASSIGNED
+from views.common import cached_read, tickets_to_dataframe
+
+ALL_TICKETS_SORT_OPTIONS = {
+    "Date": "created_at",
+    "Priority": "priority",
+    "Status": "status",
+    "Assignee": "assigned_to"
+}
+
+def show_all_tickets_browser():
+    """Filtered, keyset-paginated ticket table that only loads the visible page"""
+    agents = cached_read("users", "support_agents", get_auth_manager().list_support_agents)
+    
+    filter_col1, filter_col2, filter_col3, filter_col4 = st.columns(4)
+    with filter_col1:
+        statuses = st.multiselect("Status", TICKET_STATUSES, default=OPEN_STATUSES, key="all_tickets_status")
+    with filter_col2:
+        priorities = st.multiselect("Priority", TICKET_PRIORITIES, key="all_tickets_priority")
+    with filter_col3:
+        assignee = st.selectbox("Assignee", ["All", UNASSIGNED] + agents, key="all_tickets_assignee")
+    with filter_col4:
+        since = st.date_input("Created Since", value=None, key="all_tickets_since")
+    
+    sort_col1, sort_col2, sort_col3 = st.columns([2, 2, 1])
+    with sort_col1:
+        sort_label = st.selectbox("Sort By", list(ALL_TICKETS_SORT_OPTIONS), key="all_tickets_sort")
+    with sort_col2:
+        descending = st.radio("Order", ["Descending", "Ascending"], horizontal=True, key="all_tickets_order") == "Descending"
+    with sort_col3:
+        page_size = st.selectbox("Page Size", [25, 50, 100], key="all_tickets_page_size")
+    
+    query = dict(
+        sort_by=ALL_TICKETS_SORT_OPTIONS[sort_label],
+        descending=descending,
+        limit=page_size,
+        status=statuses or None,
+        priority=priorities or None,
+        assigned_to=None if assignee == "All" else assignee,
+        created_after=datetime.combine(since, time.min) if since else None
+    )
+    
+    # Cursors of the pages visited so far; any change to the query starts again at page one
+    if st.session_state.get("all_tickets_query") != query:
+        st.session_state["all_tickets_query"] = query
+        st.session_state["all_tickets_cursors"] = [None]
+    cursors = st.session_state["all_tickets_cursors"]
+    
+    query_key = tuple((name, tuple(value) if isinstance(value, list) else value) for name, value in sorted(query.items()))
+    page = cached_read(
+        "tickets", "all_tickets_page",
+        lambda: get_ticket_repository().list_tickets_page(cursor=cursors[-1], **query),
+        query_key, cursors[-1]
+    )
+    st.dataframe(tickets_to_dataframe(page.tickets, {
+        "ID": "ticket_id",
+        "Title": "title",
+        "Priority": "priority",
+        "Status": "status",
+        "Assigned To": "assigned_to",
+        "Submitted": "age"
+    }), use_container_width=True)
+    
+    def previous_page():
+        cursors.pop()
+    
+    def next_page():
+        cursors.append(page.next_cursor)
+    
+    nav_col1, nav_col2, nav_col3 = st.columns([1, 2, 1])
+    with nav_col1:
+        st.button("◀ Previous", on_click=previous_page, disabled=len(cursors) == 1, use_container_width=True)
+    with nav_col2:
+        st.markdown(f"<div style='text-align: center;'>Page {len(cursors)}</div>", unsafe_allow_html=True)
+    with nav_col3:
+        st.button("Next ▶", on_click=next_page, disabled=not page.has_more, use_container_width=True)
+
+def show_support_panel():
+    """Show IT Support panel for managing tickets"""
+    current_user = get_current_user()
+    show_role_indicator()
+    
+    st.markdown('<div class="section-header">🛠️ IT Support Panel</div>', unsafe_allow_html=True)
+    
+    tab1, tab2, tab3 = st.tabs(["📋 My Tickets", "🔍 All Tickets", "📊 Analytics"])
+    
+    with tab1:
+        st.markdown("### 🎫 Tickets Assigned to You")
+        assigned_tickets = cached_read(
+            "tickets", "assigned_tickets",
+            lambda: get_ticket_repository().list_tickets(status=OPEN_STATUSES, assigned_to=current_user.full_name),
+            current_user.full_name
+        )
+        st.dataframe(tickets_to_dataframe(assigned_tickets, {
+            "ID": "ticket_id",
+            "Title": "title",
+            "Priority": "priority",
+            "Status": "status",
+            "Submitted": "age"
+        }), use_container_width=True)
+        
+        if assigned_tickets:
+            with st.form("update_ticket_status"):
+                col1, col2, col3 = st.columns([2, 2, 1])
+                with col1:
+                    ticket_id = st.selectbox("Ticket", [ticket.ticket_id for ticket in assigned_tickets])
+                with col2:
+                    new_status = st.selectbox("New Status", TICKET_STATUSES)
+                with col3:
+                    st.markdown("<br>", unsafe_allow_html=True)
+                    update = st.form_submit_button("Update", use_container_width=True)
+                resolution = st.text_area("Resolution Notes", placeholder="How was it fixed? Notes on resolved tickets are suggested to users reporting similar issues.")
+                if update:
+                    if get_ticket_repository().update_ticket(ticket_id, status=new_status, resolution=resolution.strip() or None):
+                        st.success(f"{ticket_id} is now {new_status}")
+                        st.rerun()
+                    else:
+                        st.error(f"Could not update {ticket_id}")
+    
+    with tab2:
+        st.markdown("### 🔍 All Tickets")
+        if get_permission_registry().allows(current_user, Permission.VIEW_ALL_TICKETS):
+            show_all_tickets_browser()
+        else:
+            st.info("Your role can only see tickets assigned to you.")
+    
+    with tab3:
+        st.markdown("### 📊 Support Analytics")
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("Tickets Resolved This Week", "23", "+5")
+            st.metric("Average Resolution Time", "3.2 hours", "-0.8 hours")
+        with col2:
+            st.metric("Customer Satisfaction", "4.7/5", "+0.2")
+            st.metric("First Call Resolution", "78%", "+12%")
@@ -0,0 +1,142 @@
+"""Background worker for ticket triage and maintenance jobs
+
+Usage:
+    python worker.py
+    python worker.py --concurrency 8 --stats-interval 30
+
+Claims jobs from the PostgreSQL `jobs` table with FOR UPDATE SKIP LOCKED, so any
+number of worker processes can run side by side on one or more nodes. Each
+process also dispatches queued notifications and runs the periodic maintenance
+tasks (expired session, finished job and sent notification cleanup). Set JOB_INLINE_WORKERS=0 on the
+Streamlit servers once dedicated workers are running.
+"""
+import argparse
+import logging
+import os
+import signal
+import threading
+from typing import Any, Dict, Optional
+
+from auth_utils import SESSION_CLEANUP_INTERVAL, get_auth_manager
+from duplicate_detection import get_duplicate_index
+from job_queue import JobWorker, get_job_queue
+from notifications import get_notifier
+from query_stats import QUERY_STATS_EXPORT_PATH, get_query_stats
+from ticket_classifier import get_ticket_classifier
+from ticket_routing import get_ticket_router
+from ticket_store import OPEN_STATUSES, UNCLASSIFIED, Ticket, get_ticket_repository
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKER_CONCURRENCY = int(os.environ.get('JOB_WORKER_CONCURRENCY', '4'))
+JOB_INLINE_WORKERS = int(os.environ.get('JOB_INLINE_WORKERS', '1'))
+
+TRIAGE_TICKET = "triage_ticket"
+
+def enqueue_triage(ticket: Ticket, email: Optional[str] = None):
+    """Queue classification, routing, incident linking and the confirmation for a new ticket"""
+    get_job_queue().enqueue(TRIAGE_TICKET, {"ticket_id": ticket.ticket_id, "email": email})
+
+def triage_ticket(payload: Dict[str, Any]):
+    """Classify, route and link a submitted ticket, then notify the submitter
+
+    Safe to run twice: a retried job recomputes the same fields and only the
+    confirmation may be sent again.
+    """
+    repository = get_ticket_repository()
+    ticket = repository.get_ticket(payload["ticket_id"])
+    if ticket is None:
+        raise LookupError(f"Ticket {payload['ticket_id']} not found")
+    category, urgency = ticket.category, ticket.urgency
+    if UNCLASSIFIED in (category, urgency):
+        prediction = get_ticket_classifier().classify(ticket.title, ticket.description)
+        if category == UNCLASSIFIED:
+            category = prediction.category
+        if urgency == UNCLASSIFIED:
+            urgency = prediction.urgency
+    routing = get_ticket_router().route(category, urgency)
+    assignee = ticket.assigned_to or routing.assignee
+    # Join an ongoing incident instead of opening a parallel one; the index may lag other processes
+    parent_ticket_id = None
+    for match in get_duplicate_index().find(ticket.title, ticket.description, limit=4, open_only=True,
+                                            around=ticket.created_at):
+        if ticket.ticket_id in (match.ticket_id, match.incident_id):
+            continue
+        incident = repository.get_ticket(match.incident_id)
+        if incident and incident.status in OPEN_STATUSES:
+            parent_ticket_id = incident.ticket_id
+            assignee = incident.assigned_to or assignee
+            break
+    updated = repository.update_ticket(
+        ticket.ticket_id, category=category, urgency=urgency,
+        priority=urgency if ticket.priority == UNCLASSIFIED else None,
+        assigned_to=assignee, parent_ticket_id=parent_ticket_id
+    )
+    if updated is None:
+        raise RuntimeError(f"Could not update ticket {ticket.ticket_id}")
+    get_notifier().ticket_created(updated, payload.get("email"))
+
+JOB_HANDLERS = {
+    TRIAGE_TICKET: triage_ticket,
+}
+
+def create_worker(concurrency: int) -> JobWorker:
+    queue = get_job_queue()
+    worker = JobWorker(queue, JOB_HANDLERS, concurrency=concurrency)
+    auth_manager = get_auth_manager()
+    worker.schedule("cleanup_expired_sessions", SESSION_CLEANUP_INTERVAL, auth_manager.cleanup_expired_sessions)
+    if auth_manager.token_signer:
+        worker.schedule("purge_session_revocations", SESSION_CLEANUP_INTERVAL,
+                        auth_manager.token_signer.revocations.purge_expired)
+    worker.schedule("purge_finished_notifications", 3600, get_notifier().outbox.purge_finished)
+    queue.add_listener(worker.wake)
+    return worker
+
+_inline_worker: Optional[JobWorker] = None
+_inline_worker_lock = threading.Lock()
+
+def get_inline_worker() -> Optional[JobWorker]:
+    """Start JOB_INLINE_WORKERS job threads inside this (Streamlit) process, or None if disabled"""
+    global _inline_worker
+    with _inline_worker_lock:
+        if _inline_worker is None and JOB_INLINE_WORKERS > 0:
+            worker = create_worker(JOB_INLINE_WORKERS)
+            worker.start()
+            _inline_worker = worker
+        return _inline_worker
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=JOB_WORKER_CONCURRENCY, help="Jobs run at once")
+    parser.add_argument("--stats-interval", type=float, default=60, help="Seconds between metrics log lines")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+
+    stopping = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stopping.set())
+    signal.signal(signal.SIGINT, lambda *_: stopping.set())
+
+    worker = create_worker(args.concurrency)
+    get_auth_manager().create_session_indexes()
+    get_notifier()
+    worker.start()
+    logger.info("Worker %s running %d job threads", worker.worker_id, args.concurrency)
+    while not stopping.wait(args.stats_interval):
+        queue_stats = worker.queue.stats()
+        logger.info("Queue: %d pending (oldest %.0fs), %d running, %d done / %d failed in the last hour",
+                    queue_stats.pending, queue_stats.oldest_pending_seconds, queue_stats.running,
+                    queue_stats.done_last_hour, queue_stats.failed_last_hour)
+        for kind, kind_stats in worker.stats().items():
+            logger.info("%s: %d done, %d failed, run p50 %.0f ms / p95 %.0f ms, wait p95 %.0f ms",
+                        kind, kind_stats.completed, kind_stats.failed, kind_stats.p50_run * 1000,
+                        kind_stats.p95_run * 1000, kind_stats.p95_wait * 1000)
+        if QUERY_STATS_EXPORT_PATH:
+            try:
+                get_query_stats().write(QUERY_STATS_EXPORT_PATH)
+            except OSError as e:
+                logger.warning("Could not export query stats: %s", e)
+    logger.info("Stopping; waiting for running jobs")
+    worker.stop()
+
+if __name__ == "__main__":
+    main()